@@ -1,12 +1,13 @@
 from app.models.canonization_models import CanonizationRequest, CanonizationLLMResponse, CanonizationState
 from app.shared_services.db import get_postgres_connection
-from app.shared_services.llm import call_llm_api
+from app.shared_services.async_db import run_db
+from app.shared_services.llm import call_llm_api, call_llm_api_async
 from app.prompts.canonization import canonize_statement as get_canonization_prompt
 
 import asyncio
 import os
 import logging
-from typing import Optional, List, Dict, Any, Literal, Annotated
+from typing import Optional, List, Dict, Any, Literal, Annotated, Tuple
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 import pprint
@@ -58,6 +59,92 @@ def save_to_db(state: CanonizationState) -> None:
         logger.error(f"Error saving canonization state to database: {e}")
         raise  # Re-raise the exception for proper error handling
 
+def _already_exists_state(state: Dict[str, Any]) -> CanonizationState:
+    """Build the state for a statement that already has a canonical ID."""
+    # Create a minimal request with the correct statement
+    request = CanonizationRequest(
+        statement=state.get("statement", ""),
+        review_id=state.get("review_id", ""),
+        review_section=state.get("review_section", ""),
+        existing_pairs=[]  # Empty since we already know it exists
+    )
+    
+    # Create response object
+    response = CanonizationLLMResponse(
+        canonical_id=state.get("canonical_id"),
+        reasoning=f"Statement already exists with canonical ID: {state.get('canonical_id')}",
+        error=None
+    )
+    
+    return CanonizationState(
+        canonization_request=request,
+        canonization_response=response,
+        canonization_status="already_exists",
+        current_step="canonization_skipped",
+        canonization_attempt=0,
+        canonical_id=state.get("canonical_id")
+    )
+
+def _prepare_canonization(state: Dict[str, Any]) -> Tuple[CanonizationState, List[Dict[str, str]]]:
+    """Build the canonization state and LLM messages for a new statement."""
+    canonization_state = CanonizationState(**state)
+    canonization_state.current_step = "canonization_requested"
+    canonization_state.canonization_attempt = 0
+    canonization_state.canonization_response = None
+
+    # Get the canonization request
+    canonization_request = canonization_state.canonization_request
+    if not canonization_request:
+        raise ValueError("Canonization request is missing from the state")
+        
+    # Heuristic: reduce existing_pairs to top-N nearest textual candidates
+    # to keep the prompt small and focused.
+    candidates = canonization_request.existing_pairs
+    try:
+        # naive sort by token overlap length (fallback when no embedding service)
+        base = canonization_request.statement.lower()
+        def score(pair):
+            s = pair.statement.lower()
+            overlap = len(set(base.split()) & set(s.split()))
+            return (overlap, -abs(len(s) - len(base)))
+        candidates = sorted(candidates, key=score, reverse=True)[:12]
+    except Exception:
+        candidates = candidates[:12]
+
+    # Get the system prompt with context (strengthened few-shot prompt)
+    user_prompt = get_canonization_prompt(
+        statement=canonization_request.statement,
+        existing_statements=candidates
+    )
+    
+    messages = [
+        {"role": "system", "content": "You are a canonization agent. Return response in JSON format."},
+        {"role": "user", "content": user_prompt}
+    ]
+    return canonization_state, messages
+
+def _apply_canonization_response(canonization_state: CanonizationState, response: CanonizationLLMResponse) -> CanonizationState:
+    """Record the LLM's canonization result in the state."""
+    if response.is_successful:
+        canonization_state.current_step = "canonization_completed"
+        canonization_state.canonization_attempt += 1
+        canonization_state.canonization_response = response
+        canonization_state.canonization_status = "completed"
+    else:
+        canonization_state.current_step = "canonization_failed"
+        canonization_state.canonization_attempt += 1
+        canonization_state.canonization_status = "failed"
+        canonization_state.canonization_result = response.reasoning
+    return canonization_state
+
+def _canonization_failed(e: Exception) -> Dict[str, Any]:
+    logger.error(f"Error in canonize_statement_node: {e}")
+    return {
+        "canonization_status": "failed",
+        "current_step": "canonization_failed",
+        "error": str(e)
+    }
+
 def canonize_statement_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Canonize a statement
@@ -65,69 +152,13 @@ def canonize_statement_node(state: Dict[str, Any]) -> Dict[str, Any]:
     try:
         # For existing statements, create a minimal state
         if state.get("canonization_status") == "already_exists":
-            # Create a minimal request with the correct statement
-            request = CanonizationRequest(
-                statement=state.get("statement", ""),
-                review_id=state.get("review_id", ""),
-                review_section=state.get("review_section", ""),
-                existing_pairs=[]  # Empty since we already know it exists
-            )
-            
-            # Create response object
-            response = CanonizationLLMResponse(
-                canonical_id=state.get("canonical_id"),
-                reasoning=f"Statement already exists with canonical ID: {state.get('canonical_id')}",
-                error=None
-            )
-            
-            canonization_state = CanonizationState(
-                canonization_request=request,
-                canonization_response=response,
-                canonization_status="already_exists",
-                current_step="canonization_skipped",
-                canonization_attempt=0,
-                canonical_id=state.get("canonical_id")
-            )
-            
+            canonization_state = _already_exists_state(state)
             # Save to db with already_exists status
             save_to_db(canonization_state)
             return canonization_state
 
         # For new statements, proceed with normal flow
-        canonization_state = CanonizationState(**state)
-        canonization_state.current_step = "canonization_requested"
-        canonization_state.canonization_attempt = 0
-        canonization_state.canonization_response = None
-
-        # Get the canonization request
-        canonization_request = canonization_state.canonization_request
-        if not canonization_request:
-            raise ValueError("Canonization request is missing from the state")
-            
-        # Heuristic: reduce existing_pairs to top-N nearest textual candidates
-        # to keep the prompt small and focused.
-        candidates = canonization_request.existing_pairs
-        try:
-            # naive sort by token overlap length (fallback when no embedding service)
-            base = canonization_request.statement.lower()
-            def score(pair):
-                s = pair.statement.lower()
-                overlap = len(set(base.split()) & set(s.split()))
-                return (overlap, -abs(len(s) - len(base)))
-            candidates = sorted(candidates, key=score, reverse=True)[:12]
-        except Exception:
-            candidates = candidates[:12]
-
-        # Get the system prompt with context (strengthened few-shot prompt)
-        user_prompt = get_canonization_prompt(
-            statement=canonization_request.statement,
-            existing_statements=candidates
-        )
-        
-        messages = [
-            {"role": "system", "content": "You are a canonization agent. Return response in JSON format."},
-            {"role": "user", "content": user_prompt}
-        ]
+        canonization_state, messages = _prepare_canonization(state)
         
         # Get response from LLM
         try:
@@ -140,25 +171,44 @@ def canonize_statement_node(state: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"Error calling LLM: {e}")
             raise e
         
-        if response.is_successful:
-            canonization_state.current_step = "canonization_completed"
-            canonization_state.canonization_attempt += 1
-            canonization_state.canonization_response = response
-            canonization_state.canonization_status = "completed"
-        else:
-            canonization_state.current_step = "canonization_failed"
-            canonization_state.canonization_attempt += 1
-            canonization_state.canonization_status = "failed"
-            canonization_state.canonization_result = response.reasoning
+        canonization_state = _apply_canonization_response(canonization_state, response)
 
         # Save to db
         save_to_db(canonization_state)
         return canonization_state
         
     except Exception as e:
-        logger.error(f"Error in canonize_statement_node: {e}")
-        return {
-            "canonization_status": "failed",
-            "current_step": "canonization_failed",
-            "error": str(e)
-        }
\ No newline at end of file
+        return _canonization_failed(e)
+
+async def canonize_statement_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of canonize_statement_node: the LLM call and the database save
+    don't block the event loop.
+    """
+    try:
+        # For existing statements, create a minimal state
+        if state.get("canonization_status") == "already_exists":
+            canonization_state = _already_exists_state(state)
+            await run_db(save_to_db, canonization_state)
+            return canonization_state
+
+        canonization_state, messages = _prepare_canonization(state)
+        
+        # Get response from LLM
+        try:
+            response = await call_llm_api_async(
+                messages=messages,
+                temperature=0.2,  # more deterministic for taxonomy mapping
+                response_format=CanonizationLLMResponse
+            )
+        except Exception as e:
+            logger.error(f"Error calling LLM: {e}")
+            raise e
+        
+        canonization_state = _apply_canonization_response(canonization_state, response)
+
+        await run_db(save_to_db, canonization_state)
+        return canonization_state
+        
+    except Exception as e:
+        return _canonization_failed(e)
@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 import pprint
 
 #Shared Services
-from app.shared_services.llm import call_llm_api
+from app.shared_services.llm import call_llm_api_async
 
 #Models
 from app.models.summary_models import DailySummaryState, DailySummary, DailySummaryError
@@ -38,7 +38,7 @@ async def daily_summary_node(state: Dict[str, Any]) -> Dict[str, Any]:
             {"role": "user", "content": user_prompt}
         ]
         
-        daily_summary = call_llm_api(
+        daily_summary = await call_llm_api_async(
             messages=messages,
             temperature=0.7,
             response_format=DailySummary
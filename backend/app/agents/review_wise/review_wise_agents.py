@@ -4,16 +4,17 @@
 import asyncio
 import os
 import logging
-from typing import Optional, List, Dict, Any, Literal, Annotated
+from typing import Optional, List, Dict, Any, Literal, Annotated, Tuple
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import pprint
 
 #Shared Services
-from app.shared_services.llm import call_llm_api
+from app.shared_services.llm import call_llm_api, call_llm_api_async
 
 #Models
 from app.models.review_analysis_models import MainState, ReviewAnalysisRequest, AspectAnalysis, Error, SentimentAnalysis, ProductStrengths, Opportunities, Roadmap, ResponseRecommendation, IssueAnalysis
+from app.models.fused_review_analysis_models import FusedReviewAnalysis, BatchedReviewAnalysis, BatchedReviewAnalysisItem
 
 #Prompts
 from app.prompts.review_wise.aspect_analysis_prompt import get_aspect_analysis_prompt
@@ -23,6 +24,10 @@ from app.prompts.review_wise.roadmap_analysis_prompt import get_roadmap_analysis
 from app.prompts.review_wise.response_recommendations_prompt import get_response_recommendations_prompt
 from app.prompts.review_wise.issue_analysis_prompt import get_issue_analysis_prompt
 from app.prompts.review_wise.positives_analysis_prompt import get_positives_analysis_prompt
+from app.prompts.review_wise.fused_analysis_prompt import get_fused_analysis_prompt
+from app.prompts.review_wise.batched_analysis_prompt import get_batched_analysis_prompt, format_batched_reviews
+
+from app.prompts.registry import prompt_registry, PromptTemplate
 
 # Load environment variables
 load_dotenv()
@@ -30,118 +35,225 @@ load_dotenv()
 #logger
 logger = logging.getLogger(__name__)
 
+# Prompts - static parts (instructions, schema, examples) are rendered once here;
+# only the review content is filled in per call
+aspect_analysis_prompt = prompt_registry.register("aspect_analysis", get_aspect_analysis_prompt)
+sentiment_analysis_prompt = prompt_registry.register("sentiment_analysis", get_sentiment_analysis_prompt)
+opportunities_analysis_prompt = prompt_registry.register("opportunities_analysis", get_opportunities_analysis_prompt)
+roadmap_analysis_prompt = prompt_registry.register("roadmap_analysis", get_roadmap_analysis_prompt)
+response_recommendations_prompt = prompt_registry.register("response_recommendations", get_response_recommendations_prompt)
+issue_analysis_prompt = prompt_registry.register("issue_analysis", get_issue_analysis_prompt)
+positives_analysis_prompt = prompt_registry.register("positives_analysis", get_positives_analysis_prompt)
+fused_analysis_prompt = prompt_registry.register("fused_analysis", get_fused_analysis_prompt)
+batched_analysis_prompt = prompt_registry.register("batched_analysis", get_batched_analysis_prompt)
+
 # Node Functions
 # Aspect Analysis Agent
 def aspect_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "aspect_analysis_node", get_aspect_analysis_prompt, AspectAnalysis)
+    state = review_wise_agent(state, "aspect_analysis_node", aspect_analysis_prompt, AspectAnalysis)
     return state
 
 # Sentiment Analysis Agent
 def sentiment_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "sentiment_analysis_node", get_sentiment_analysis_prompt, SentimentAnalysis)
+    state = review_wise_agent(state, "sentiment_analysis_node", sentiment_analysis_prompt, SentimentAnalysis)
     return state
 
 # Opportunities Analysis Agent
 def opportunities_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "opportunities_analysis_node", get_opportunities_analysis_prompt, Opportunities)
+    state = review_wise_agent(state, "opportunities_analysis_node", opportunities_analysis_prompt, Opportunities)
     return state
 
 # Roadmap Analysis Agent
 def roadmap_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "roadmap_analysis_node", get_roadmap_analysis_prompt, Roadmap)
+    state = review_wise_agent(state, "roadmap_analysis_node", roadmap_analysis_prompt, Roadmap)
     return state
 
 # Response Recommendations Agent
 def response_recommendations_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "response_recommendations_node", get_response_recommendations_prompt, ResponseRecommendation)
+    state = review_wise_agent(state, "response_recommendations_node", response_recommendations_prompt, ResponseRecommendation)
     return state
 
 # Issue Analysis Agent
 def issue_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "issue_analysis_node", get_issue_analysis_prompt, IssueAnalysis)
+    state = review_wise_agent(state, "issue_analysis_node", issue_analysis_prompt, IssueAnalysis)
     return state
 
 # Positives Analysis Agent
 def positives_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    state = review_wise_agent(state, "positives_analysis_node", get_positives_analysis_prompt, ProductStrengths)
+    state = review_wise_agent(state, "positives_analysis_node", positives_analysis_prompt, ProductStrengths)
     return state
 
-def review_wise_agent(state: Dict[str, Any], agent_name: str, prompt: str, response_model: BaseModel) -> Dict[str, Any]:
-    """Analyze aspects of a review."""
-    
-    # Convert state dict to MainState, ensuring nested objects are properly converted
+# Async node functions - used by the review analysis graph so many reviews can be in flight at once
+async def sentiment_analysis_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    return await review_wise_agent_async(state, "sentiment_analysis_node", sentiment_analysis_prompt, SentimentAnalysis)
+
+async def issue_analysis_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    return await review_wise_agent_async(state, "issue_analysis_node", issue_analysis_prompt, IssueAnalysis)
+
+async def positives_analysis_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    return await review_wise_agent_async(state, "positives_analysis_node", positives_analysis_prompt, ProductStrengths)
+
+async def response_recommendations_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    return await review_wise_agent_async(state, "response_recommendations_node", response_recommendations_prompt, ResponseRecommendation)
+
+# Fused Analysis Agent - sentiment, issues, positives and response recommendation in one LLM call
+async def fused_analysis_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    return await review_wise_agent_async(state, "fused_analysis_node", fused_analysis_prompt, FusedReviewAnalysis)
+
+# Batched Analysis Agent - several short reviews in one LLM call
+async def batched_analysis_async(reviews: List[Tuple[str, str]]) -> Dict[str, FusedReviewAnalysis]:
+    """
+    Analyze several reviews, given as (review_id, content) pairs, with one LLM call.
+
+    Each returned item is validated on its own. Only the analyses that came back valid are
+    returned, keyed by review_id; missing or malformed items are left out so the caller can
+    fall back to single-review calls for them. LLM errors are raised.
+    """
+    messages = [
+        {"role": "system", "content": "You are a batched_analysis_node agent. Return response in JSON format."},
+        {"role": "user", "content": batched_analysis_prompt(format_batched_reviews(reviews))}
+    ]
+
+    response = await call_llm_api_async(
+        messages=messages,
+        temperature=0.7,
+        response_format=BatchedReviewAnalysis,
+        prompt_version=batched_analysis_prompt.version
+    )
+
+    expected_ids = {review_id for review_id, _ in reviews}
+    analyses = {}
+    for item in response.analyses:
+        try:
+            parsed = BatchedReviewAnalysisItem.model_validate(item)
+        except ValidationError as e:
+            logger.warning(f"Invalid item in batched analysis (review_id={item.get('review_id') if isinstance(item, dict) else None}): {e}")
+            continue
+        if parsed.review_id not in expected_ids:
+            logger.warning(f"Batched analysis returned unknown review_id {parsed.review_id}")
+            continue
+        analyses.setdefault(parsed.review_id, parsed.analysis)
+
+    return analyses
+
+def apply_fused_analysis(state: Dict[str, Any], analysis: FusedReviewAnalysis) -> Dict[str, Any]:
+    """Fill a review's state from a fused analysis obtained outside the agent (e.g. from a batched call)."""
+    return _apply_agent_response(_prepare_agent_state(state), "fused_analysis_node", analysis, batched_analysis_prompt.version)
+
+def _prepare_agent_state(state: Dict[str, Any]) -> MainState:
+    """Convert a state dict to MainState, ensuring nested objects are properly converted."""
     if isinstance(state, MainState):
-        current_state = state
-    else:
-        # Convert the review analysis request first
-        review_analysis_request = ReviewAnalysisRequest(**state.get("review_analysis_request", {}))
+        return state
+    # Convert the review analysis request first
+    review_analysis_request = ReviewAnalysisRequest(**state.get("review_analysis_request", {}))
+    
+    # Create MainState with the converted request
+    state["review_analysis_request"] = review_analysis_request
+    return MainState(**state)
+
+def _build_agent_messages(current_state: MainState, agent_name: str, prompt: PromptTemplate) -> List[Dict[str, str]]:
+    """Build the LLM messages for an agent from the review in the state."""
+    # Get the review content
+    review_content = current_state.review_analysis_request.review_content
+    if not review_content:
+        raise ValueError("Review content is missing from the state")
         
-        # Create MainState with the converted request
-        state["review_analysis_request"] = review_analysis_request
-        current_state = MainState(**state)
+    logger.debug(f"Processing review content: {review_content[:100]}...")
+    
+    # Get the system prompt with context - just pass review_content
+    user_prompt = prompt(review_content=review_content)
+    
+    return [
+        {"role": "system", "content": f"You are an {agent_name} agent. Return response in JSON format."},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def _apply_agent_response(current_state: MainState, agent_name: str, response: Any, prompt_version: Optional[str] = None) -> Dict[str, Any]:
+    """Store an agent's response in its section of the analysis and in the node history."""
+    # Update state with the response based on agent name
+    if agent_name == "aspect_analysis_node":
+        current_state.review_analysis.aspects = response
+    elif agent_name == "sentiment_analysis_node":
+        current_state.review_analysis.sentiment = response
+    elif agent_name == "opportunities_analysis_node":
+        current_state.review_analysis.opportunities = response
+    elif agent_name == "roadmap_analysis_node":
+        current_state.review_analysis.roadmap = response
+    elif agent_name == "response_recommendations_node":
+        current_state.review_analysis.response_recommendation = response
+    elif agent_name == "issue_analysis_node":
+        current_state.review_analysis.issues = response
+    elif agent_name == "positives_analysis_node":
+        current_state.review_analysis.positive_feedback = response
+    elif agent_name == "fused_analysis_node":
+        current_state.review_analysis.sentiment = response.sentiment
+        current_state.review_analysis.issues = response.issues
+        current_state.review_analysis.positive_feedback = response.positive_feedback
+        current_state.review_analysis.response_recommendation = response.response_recommendation
+
+    # Add to node history
+    current_state.node_history.append({
+        "node_name": agent_name,
+        "prompt_version": prompt_version,
+        "response": response.model_dump() if hasattr(response, 'model_dump') else response
+    })
+
+    return current_state.model_dump()
+
+def _apply_agent_error(current_state: MainState, agent_name: str, e: Exception) -> Dict[str, Any]:
+    """Record an agent failure in the state."""
+    error_msg = f"Error in {agent_name} node: {str(e)}"
+    logger.error(error_msg)
+    
+    current_state.error = Error(
+        agent=agent_name,
+        error_message=error_msg
+    )
+
+    current_state.node_history.append({
+        "node_name": agent_name,
+        "error": {
+            "agent": agent_name,
+            "error_message": error_msg
+        }
+    })
+    
+    return current_state.model_dump()
+
+def review_wise_agent(state: Dict[str, Any], agent_name: str, prompt: PromptTemplate, response_model: BaseModel) -> Dict[str, Any]:
+    """Analyze aspects of a review."""
+    current_state = _prepare_agent_state(state)
     
     try:
-        # Get the review content
-        review_content = current_state.review_analysis_request.review_content
-        if not review_content:
-            raise ValueError("Review content is missing from the state")
-            
-        logger.debug(f"Processing review content: {review_content[:100]}...")
-        
-        # Get the system prompt with context - just pass review_content
-        user_prompt = prompt(review_content=review_content)
-        
-        messages = [
-            {"role": "system", "content": f"You are an {agent_name} agent. Return response in JSON format."},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = _build_agent_messages(current_state, agent_name, prompt)
         
         response = call_llm_api(
             messages=messages,
             temperature=0.7,
-            response_format=response_model
+            response_format=response_model,
+            prompt_version=prompt.version
         )
 
-        # Update state with the response based on agent name
-        if agent_name == "aspect_analysis_node":
-            current_state.review_analysis.aspects = response
-        elif agent_name == "sentiment_analysis_node":
-            current_state.review_analysis.sentiment = response
-        elif agent_name == "opportunities_analysis_node":
-            current_state.review_analysis.opportunities = response
-        elif agent_name == "roadmap_analysis_node":
-            current_state.review_analysis.roadmap = response
-        elif agent_name == "response_recommendations_node":
-            current_state.review_analysis.response_recommendation = response
-        elif agent_name == "issue_analysis_node":
-            current_state.review_analysis.issues = response
-        elif agent_name == "positives_analysis_node":
-            current_state.review_analysis.positive_feedback = response
-
-        # Add to node history
-        current_state.node_history.append({
-            "node_name": agent_name,
-            "response": response.model_dump() if hasattr(response, 'model_dump') else response
-        })
-
-        return current_state.model_dump()
+        return _apply_agent_response(current_state, agent_name, response, prompt.version)
     
     except Exception as e:
-        error_msg = f"Error in {agent_name} node: {str(e)}"
-        logger.error(error_msg)
-        
-        current_state.error = Error(
-            agent=agent_name,
-            error_message=error_msg
-        )
+        return _apply_agent_error(current_state, agent_name, e)
 
-        current_state.node_history.append({
-            "node_name": agent_name,
-            "error": {
-                "agent": agent_name,
-                "error_message": error_msg
-            }
-        })
+async def review_wise_agent_async(state: Dict[str, Any], agent_name: str, prompt: PromptTemplate, response_model: BaseModel) -> Dict[str, Any]:
+    """Async version of review_wise_agent; the LLM call doesn't block the event loop."""
+    current_state = _prepare_agent_state(state)
+    
+    try:
+        messages = _build_agent_messages(current_state, agent_name, prompt)
         
-        return current_state.model_dump()
+        response = await call_llm_api_async(
+            messages=messages,
+            temperature=0.7,
+            response_format=response_model,
+            prompt_version=prompt.version
+        )
 
+        return _apply_agent_response(current_state, agent_name, response, prompt.version)
+    
+    except Exception as e:
+        return _apply_agent_error(current_state, agent_name, e)
@@ -0,0 +1,44 @@
+-- Analytics response cache (see app/shared_services/analytics_cache.py).
+-- analytics_cache_generations holds one counter per app, bumped whenever analysis data
+-- or newly ingested reviews for the app are written; cached responses built at an older generation are ignored.
+-- analytics_response_cache is the optional shared layer (ANALYTICS_CACHE_SHARED).
+
+CREATE TABLE IF NOT EXISTS analytics_cache_generations (
+    app_id TEXT PRIMARY KEY,
+    generation BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS analytics_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,  -- app_id, or '*' for endpoints aggregating across all apps
+    generation BIGINT NOT NULL,
+    etag TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_response_cache_scope ON analytics_response_cache(scope);
+CREATE INDEX IF NOT EXISTS idx_analytics_response_cache_expires_at ON analytics_response_cache(expires_at);
+
+-- Called by invalidate_analytics_cache(); returns the app's new generation
+CREATE OR REPLACE FUNCTION bump_analytics_cache_generation(p_app_id TEXT)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_generation BIGINT;
+BEGIN
+    INSERT INTO analytics_cache_generations (app_id, generation, updated_at)
+    VALUES (p_app_id, 1, NOW())
+    ON CONFLICT (app_id) DO UPDATE SET
+        generation = analytics_cache_generations.generation + 1,
+        updated_at = NOW()
+    RETURNING generation INTO v_generation;
+
+    DELETE FROM analytics_response_cache WHERE scope IN (p_app_id, '*');
+
+    RETURN v_generation;
+END;
+$$;
@@ -0,0 +1,29 @@
+-- Change detection for app details (see AppDetailsScraper.save_app_details).
+-- A new app_details_history row is written only when the hash of the tracked (slowly
+-- changing) fields differs from the last saved one; score, ratings, reviews and installs
+-- are recorded on every poll in the compact app_metrics_timeseries table instead, and
+-- copied onto the app's latest history row (highest revision) so readers of
+-- app_details_history / current_app_details still see current values.
+
+ALTER TABLE app_details_history ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE app_details_history ADD COLUMN IF NOT EXISTS revision BIGSERIAL;
+
+CREATE INDEX IF NOT EXISTS idx_app_details_history_app_revision ON app_details_history(app_id, revision);
+
+CREATE TABLE IF NOT EXISTS app_details_hashes (
+    app_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    last_checked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS app_metrics_timeseries (
+    app_id TEXT NOT NULL,
+    observed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    score REAL,
+    ratings_count BIGINT,
+    reviews_count BIGINT,
+    installs TEXT,
+    real_installs BIGINT,
+    PRIMARY KEY (app_id, observed_at)
+);
@@ -0,0 +1,11 @@
+-- Apps seen in Play Store searches, backing the local autocomplete index
+-- (see AppSearchIndex in app/google_reviews/app_search.py). The index itself is
+-- matched in memory; this table only persists it across restarts.
+CREATE TABLE IF NOT EXISTS app_search_index (
+    app_id TEXT PRIMARY KEY,
+    title TEXT,
+    developer TEXT,
+    icon TEXT,
+    description TEXT,
+    last_seen_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,120 @@
+-- Watermark-based incremental processing of raw_app_reviews into processed_app_reviews
+-- (see ReviewScraper.process_new_raw_reviews). Only raw rows fetched after the app's
+-- watermark are looked at, so each call costs O(new rows) instead of O(all raw rows).
+
+CREATE TABLE IF NOT EXISTS raw_review_watermarks (
+    app_id TEXT PRIMARY KEY,
+    last_fetched_at TIMESTAMP NOT NULL,
+    last_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_processed INTEGER NOT NULL DEFAULT 0,
+    last_skipped INTEGER NOT NULL DEFAULT 0,
+    last_duplicates INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_raw_app_reviews_app_fetched_at ON raw_app_reviews(app_id, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_processed_app_reviews_app_review_id ON processed_app_reviews(app_id, review_id);
+
+-- Returns one row of metrics:
+--   processed  - reviews inserted into or updated in processed_app_reviews
+--   skipped    - new raw rows for reviews already processed with identical content
+--   duplicates - extra raw rows for the same review_id among the new rows
+--   watermark  - the app's watermark after this call
+CREATE OR REPLACE FUNCTION process_raw_reviews_incremental(p_app_id TEXT)
+RETURNS TABLE (processed INTEGER, skipped INTEGER, duplicates INTEGER, watermark TIMESTAMP)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_from TIMESTAMP;
+    v_to TIMESTAMP;
+    v_new_rows INTEGER;
+    v_distinct INTEGER;
+    v_updated INTEGER;
+    v_inserted INTEGER;
+BEGIN
+    -- Serialize concurrent runs for the same app
+    PERFORM pg_advisory_xact_lock(hashtext('process_raw_reviews_incremental:' || p_app_id));
+
+    SELECT w.last_fetched_at INTO v_from FROM raw_review_watermarks w WHERE w.app_id = p_app_id;
+
+    SELECT MAX(r.fetched_at), COUNT(*), COUNT(DISTINCT r.review_id)
+    INTO v_to, v_new_rows, v_distinct
+    FROM raw_app_reviews r
+    WHERE r.app_id = p_app_id AND (v_from IS NULL OR r.fetched_at > v_from);
+
+    IF v_to IS NULL THEN
+        RETURN QUERY SELECT 0, 0, 0, v_from;
+        RETURN;
+    END IF;
+
+    -- Reviews we already have: update only if something changed (content changes need reanalysis)
+    WITH new_rows AS (
+        SELECT DISTINCT ON (r.review_id) r.*
+        FROM raw_app_reviews r
+        WHERE r.app_id = p_app_id AND (v_from IS NULL OR r.fetched_at > v_from) AND r.fetched_at <= v_to
+        ORDER BY r.review_id, r.fetched_at DESC
+    )
+    UPDATE processed_app_reviews p
+    SET content = n.content,
+        score = n.score,
+        thumbs_up_count = n.thumbs_up_count,
+        reply_content = n.reply_content,
+        reply_created_at = n.reply_created_at,
+        app_version = n.app_version,
+        analyzed = CASE WHEN p.content IS DISTINCT FROM n.content THEN FALSE ELSE p.analyzed END
+    FROM new_rows n
+    WHERE p.app_id = n.app_id AND p.review_id = n.review_id
+    AND (p.content IS DISTINCT FROM n.content
+         OR p.score IS DISTINCT FROM n.score
+         OR p.thumbs_up_count IS DISTINCT FROM n.thumbs_up_count
+         OR p.reply_content IS DISTINCT FROM n.reply_content);
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    -- Reviews we haven't processed before
+    WITH new_rows AS (
+        SELECT DISTINCT ON (r.review_id) r.*
+        FROM raw_app_reviews r
+        WHERE r.app_id = p_app_id AND (v_from IS NULL OR r.fetched_at > v_from) AND r.fetched_at <= v_to
+        ORDER BY r.review_id, r.fetched_at DESC
+    )
+    INSERT INTO processed_app_reviews (
+        app_id, review_id, username, user_image, content, score, thumbs_up_count,
+        review_created_at, reply_content, reply_created_at, app_version, analyzed
+    )
+    SELECT n.app_id, n.review_id, n.username, n.user_image, n.content, n.score, n.thumbs_up_count,
+           n.review_created_at, n.reply_content, n.reply_created_at, n.app_version, FALSE
+    FROM new_rows n
+    WHERE NOT EXISTS (
+        SELECT 1 FROM processed_app_reviews p
+        WHERE p.app_id = n.app_id AND p.review_id = n.review_id
+    );
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    -- Keep daily sentiment rollups (create_sentiment_daily_rollup.sql) in step with new reviews
+    IF v_updated + v_inserted > 0 AND to_regprocedure('refresh_sentiment_daily_rollup(text, date)') IS NOT NULL THEN
+        PERFORM refresh_sentiment_daily_rollup(p_app_id, days.review_date)
+        FROM (
+            SELECT DISTINCT r.review_created_at::date AS review_date
+            FROM raw_app_reviews r
+            WHERE r.app_id = p_app_id AND (v_from IS NULL OR r.fetched_at > v_from) AND r.fetched_at <= v_to
+            AND r.review_created_at IS NOT NULL
+        ) days;
+    END IF;
+
+    -- The rollups count unanalyzed reviews too, so cached analytics responses
+    -- (create_analytics_cache.sql) for the app are stale now
+    IF v_updated + v_inserted > 0 AND to_regprocedure('bump_analytics_cache_generation(text)') IS NOT NULL THEN
+        PERFORM bump_analytics_cache_generation(p_app_id);
+    END IF;
+
+    INSERT INTO raw_review_watermarks (app_id, last_fetched_at, last_run_at, last_processed, last_skipped, last_duplicates)
+    VALUES (p_app_id, v_to, NOW(), v_updated + v_inserted, v_distinct - v_updated - v_inserted, v_new_rows - v_distinct)
+    ON CONFLICT (app_id) DO UPDATE SET
+        last_fetched_at = EXCLUDED.last_fetched_at,
+        last_run_at = EXCLUDED.last_run_at,
+        last_processed = EXCLUDED.last_processed,
+        last_skipped = EXCLUDED.last_skipped,
+        last_duplicates = EXCLUDED.last_duplicates;
+
+    RETURN QUERY SELECT v_updated + v_inserted, v_distinct - v_updated - v_inserted, v_new_rows - v_distinct, v_to;
+END;
+$$;
@@ -0,0 +1,21 @@
+-- Content-addressed cache of LLM responses (see app/shared_services/llm_cache.py).
+-- cache_key is a sha256 over model, messages, response schema, temperature, max_tokens and prompt version.
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response_schema TEXT,
+    prompt_version TEXT,
+    response JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_accessed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Added with the prompt registry (app/prompts/registry.py)
+ALTER TABLE llm_response_cache ADD COLUMN IF NOT EXISTS prompt_version TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_prompt_version ON llm_response_cache(prompt_version);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires_at ON llm_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_accessed_at ON llm_response_cache(last_accessed_at);
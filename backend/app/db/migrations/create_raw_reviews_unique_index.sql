@@ -0,0 +1,26 @@
+-- One raw row per (app_id, review_id), so ReviewScraper.save_reviews_to_db can upsert each
+-- batch with ON CONFLICT through an index instead of scanning raw_app_reviews.
+-- Scrapers before the bulk upsert appended a row on every fetch; only the most recently
+-- fetched row of each review is kept (process_raw_reviews_incremental only ever reads the
+-- latest one). Skipped once the index exists.
+
+DO $$
+BEGIN
+    IF to_regclass('idx_raw_app_reviews_app_review_id') IS NULL THEN
+        DELETE FROM raw_app_reviews
+        WHERE ctid IN (
+            SELECT ctid
+            FROM (
+                SELECT ctid, ROW_NUMBER() OVER (
+                    PARTITION BY app_id, review_id
+                    ORDER BY fetched_at DESC NULLS LAST, ctid DESC
+                ) AS rn
+                FROM raw_app_reviews
+            ) ranked
+            WHERE ranked.rn > 1
+        );
+
+        CREATE UNIQUE INDEX idx_raw_app_reviews_app_review_id ON raw_app_reviews(app_id, review_id);
+    END IF;
+END;
+$$;
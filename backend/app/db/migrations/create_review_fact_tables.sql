@@ -0,0 +1,197 @@
+-- Normalized fact rows extracted from processed_app_reviews.latest_analysis, so dashboards
+-- and canonicalization read typed, indexed columns instead of unnesting JSONB per query.
+-- Rows for a review are rebuilt by refresh_review_facts() whenever its analysis is saved
+-- (see save_review_analysis in app/google_reviews/save_analyzed_reviews.py).
+
+CREATE TABLE IF NOT EXISTS review_issues (
+    id BIGSERIAL PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    review_created_at TIMESTAMP,
+    issue_index INTEGER NOT NULL,
+    issue_type TEXT,
+    severity TEXT,
+    description TEXT,
+    impact_score NUMERIC,
+    key_words JSONB,
+    snippet JSONB
+);
+
+CREATE TABLE IF NOT EXISTS review_actions (
+    id BIGSERIAL PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    review_created_at TIMESTAMP,
+    issue_index INTEGER NOT NULL,
+    action_type TEXT,
+    description TEXT,
+    confidence NUMERIC,
+    estimated_effort TEXT,
+    suggested_timeline TEXT
+);
+
+CREATE TABLE IF NOT EXISTS review_positives (
+    id BIGSERIAL PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    review_created_at TIMESTAMP,
+    description TEXT,
+    impact_score NUMERIC,
+    quote TEXT,
+    impact_area TEXT,
+    keywords JSONB,
+    user_segments JSONB,
+    metrics JSONB
+);
+
+CREATE TABLE IF NOT EXISTS review_segments (
+    id BIGSERIAL PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    review_created_at TIMESTAMP,
+    text TEXT,
+    sentiment_label TEXT,
+    sentiment_score NUMERIC,
+    sentiment_confidence NUMERIC
+);
+
+CREATE TABLE IF NOT EXISTS review_emotions (
+    id BIGSERIAL PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    review_created_at TIMESTAMP,
+    overall_sentiment TEXT,
+    emotion TEXT NOT NULL,
+    emotion_score NUMERIC
+);
+
+CREATE INDEX IF NOT EXISTS idx_review_issues_app_created_at ON review_issues(app_id, review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_issues_created_at ON review_issues(review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_issues_review ON review_issues(review_id, app_id);
+CREATE INDEX IF NOT EXISTS idx_review_issues_severity ON review_issues(severity);
+CREATE INDEX IF NOT EXISTS idx_review_issues_issue_type ON review_issues(issue_type);
+CREATE INDEX IF NOT EXISTS idx_review_issues_description ON review_issues(description);
+
+CREATE INDEX IF NOT EXISTS idx_review_actions_app_created_at ON review_actions(app_id, review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_actions_review ON review_actions(review_id, app_id);
+CREATE INDEX IF NOT EXISTS idx_review_actions_action_type ON review_actions(action_type);
+
+CREATE INDEX IF NOT EXISTS idx_review_positives_app_created_at ON review_positives(app_id, review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_positives_created_at ON review_positives(review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_positives_review ON review_positives(review_id, app_id);
+CREATE INDEX IF NOT EXISTS idx_review_positives_impact_area ON review_positives(impact_area);
+CREATE INDEX IF NOT EXISTS idx_review_positives_description ON review_positives(description);
+
+CREATE INDEX IF NOT EXISTS idx_review_segments_app_created_at ON review_segments(app_id, review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_segments_review ON review_segments(review_id, app_id);
+CREATE INDEX IF NOT EXISTS idx_review_segments_label ON review_segments(sentiment_label);
+
+CREATE INDEX IF NOT EXISTS idx_review_emotions_app_created_at ON review_emotions(app_id, review_created_at);
+CREATE INDEX IF NOT EXISTS idx_review_emotions_review ON review_emotions(review_id, app_id);
+CREATE INDEX IF NOT EXISTS idx_review_emotions_emotion ON review_emotions(emotion);
+
+-- LLM output isn't guaranteed to be well-typed: non-arrays become empty arrays and
+-- non-numeric scores become NULL instead of failing the whole refresh
+CREATE OR REPLACE FUNCTION jsonb_array_or_empty(j JSONB) RETURNS JSONB
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN jsonb_typeof(j) = 'array' THEN j ELSE '[]'::jsonb END
+$$;
+
+CREATE OR REPLACE FUNCTION try_numeric(t TEXT) RETURNS NUMERIC
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN t ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$' THEN t::numeric END
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_review_facts(p_app_id TEXT, p_review_id TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_created_at TIMESTAMP;
+    v_analysis JSONB;
+BEGIN
+    DELETE FROM review_issues WHERE app_id = p_app_id AND review_id = p_review_id;
+    DELETE FROM review_actions WHERE app_id = p_app_id AND review_id = p_review_id;
+    DELETE FROM review_positives WHERE app_id = p_app_id AND review_id = p_review_id;
+    DELETE FROM review_segments WHERE app_id = p_app_id AND review_id = p_review_id;
+    DELETE FROM review_emotions WHERE app_id = p_app_id AND review_id = p_review_id;
+
+    SELECT review_created_at, latest_analysis INTO v_created_at, v_analysis
+    FROM processed_app_reviews
+    WHERE app_id = p_app_id AND review_id = p_review_id
+    LIMIT 1;
+
+    IF v_analysis IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO review_issues (app_id, review_id, review_created_at, issue_index, issue_type, severity,
+                               description, impact_score, key_words, snippet)
+    SELECT p_app_id, p_review_id, v_created_at, i.ord - 1, i.issue->>'type', i.issue->>'severity',
+           i.issue->>'description', try_numeric(i.issue->>'impact_score'), i.issue->'key_words', i.issue->'snippet'
+    FROM jsonb_array_elements(jsonb_array_or_empty(v_analysis->'issues'->'issues')) WITH ORDINALITY AS i(issue, ord);
+
+    INSERT INTO review_actions (app_id, review_id, review_created_at, issue_index, action_type, description,
+                                confidence, estimated_effort, suggested_timeline)
+    SELECT p_app_id, p_review_id, v_created_at, i.ord - 1, a.action->>'type', a.action->>'description',
+           try_numeric(a.action->>'confidence'), a.action->>'estimated_effort', a.action->>'suggested_timeline'
+    FROM jsonb_array_elements(jsonb_array_or_empty(v_analysis->'issues'->'issues')) WITH ORDINALITY AS i(issue, ord)
+    CROSS JOIN LATERAL jsonb_array_elements(jsonb_array_or_empty(i.issue->'actions')) AS a(action);
+
+    INSERT INTO review_positives (app_id, review_id, review_created_at, description, impact_score, quote,
+                                  impact_area, keywords, user_segments, metrics)
+    SELECT p_app_id, p_review_id, v_created_at, m->>'description', try_numeric(m->>'impact_score'), m->>'quote',
+           m->>'impact_area', m->'keywords', m->'user_segments', m->'metrics'
+    FROM jsonb_array_elements(jsonb_array_or_empty(v_analysis->'positive_feedback'->'positive_mentions')) AS m;
+
+    INSERT INTO review_segments (app_id, review_id, review_created_at, text, sentiment_label,
+                                 sentiment_score, sentiment_confidence)
+    SELECT p_app_id, p_review_id, v_created_at, s->>'text', s->'sentiment'->>'label',
+           try_numeric(s->'sentiment'->>'score'), try_numeric(s->'sentiment'->>'confidence')
+    FROM jsonb_array_elements(jsonb_array_or_empty(v_analysis->'sentiment'->'segments')) AS s;
+
+    IF jsonb_typeof(v_analysis->'sentiment'->'emotions'->'emotion_scores') = 'object' THEN
+        INSERT INTO review_emotions (app_id, review_id, review_created_at, overall_sentiment, emotion, emotion_score)
+        SELECT p_app_id, p_review_id, v_created_at, v_analysis->'sentiment'->'overall'->>'classification',
+               e.key, try_numeric(e.value)
+        FROM jsonb_each_text(v_analysis->'sentiment'->'emotions'->'emotion_scores') AS e(key, value);
+    END IF;
+END;
+$$;
+
+-- Issues with their canonical description and taxonomy category; same columns the issues
+-- dashboard reads, but over the indexed review_issues table
+CREATE OR REPLACE VIEW vw_review_issue_facts AS
+WITH canonical AS (
+    SELECT
+        A.canonical_id,
+        A.statement,
+        B.category,
+        REPLACE(description, 'Auto-generated canonical ID for:', '') AS "desc"
+    FROM
+        canonical_statements A
+    LEFT OUTER JOIN
+        statement_taxonomy B
+    ON (A.canonical_id = B.canonical_id)
+)
+SELECT
+    ri.app_id,
+    ri.review_id,
+    ri.review_created_at,
+    COALESCE(c."desc", ri.description) AS "desc",
+    ri.issue_type,
+    ri.severity,
+    c.category,
+    ri.snippet::text AS snippet,
+    ri.key_words::text AS key_words,
+    ri.impact_score
+FROM
+    review_issues ri
+LEFT OUTER JOIN
+    canonical c
+ON (c.statement = ri.description);
+
+-- Backfill (idempotent)
+SELECT refresh_review_facts(app_id, review_id)
+FROM processed_app_reviews
+WHERE latest_analysis IS NOT NULL;
@@ -0,0 +1,27 @@
+-- Per-day word/phrase counts of review segment texts for the word cloud
+-- (see /sentiments/word_cloud and app/shared_services/word_frequency.py).
+-- review_segment_term_counts holds the most frequent terms per (app_id, day, sentiment_label)
+-- (up to WORD_CLOUD_TERMS_PER_DAY); a date range is served by summing these rows.
+-- sentiment_label is '' for segments without a label (primary key columns can't be NULL).
+-- review_segment_term_days records which days have been counted and a fingerprint of the
+-- segments they were counted from (row count and highest review_segments.id). Re-analysing a
+-- review rebuilds its segment rows with new ids, so a changed day is detected and recounted
+-- on the next request; nothing needs to be invalidated on the write path.
+
+CREATE TABLE IF NOT EXISTS review_segment_term_days (
+    app_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    segment_count INTEGER NOT NULL,
+    max_segment_id BIGINT NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (app_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS review_segment_term_counts (
+    app_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    sentiment_label TEXT NOT NULL DEFAULT '',
+    term TEXT NOT NULL,
+    term_count INTEGER NOT NULL,
+    PRIMARY KEY (app_id, day, sentiment_label, term)
+);
@@ -0,0 +1,8 @@
+-- Supports keyset pagination over processed_app_reviews on (review_created_at, id)
+-- (see get_reviews in app/google_reviews/get_reviews.py); the index can be scanned in
+-- either direction, so it serves both ascending and descending pages.
+CREATE INDEX IF NOT EXISTS idx_processed_app_reviews_app_created_id
+    ON processed_app_reviews(app_id, analyzed, review_created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_processed_app_reviews_created_id
+    ON processed_app_reviews(review_created_at DESC, id DESC);
@@ -0,0 +1,21 @@
+-- Apps scraped by the nightly review scrape (see app/google_reviews/scrape_scheduler.py).
+-- last_* columns are the per-app checkpoint written when an app's scrape finishes.
+CREATE TABLE IF NOT EXISTS scrape_apps (
+    app_id TEXT NOT NULL,
+    lang TEXT NOT NULL DEFAULT 'en',
+    country TEXT NOT NULL DEFAULT 'ke',
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    priority INTEGER NOT NULL DEFAULT 100,
+    last_started_at TIMESTAMP WITH TIME ZONE,
+    last_finished_at TIMESTAMP WITH TIME ZONE,
+    last_status TEXT,
+    last_error TEXT,
+    last_reviews_fetched INTEGER,
+    last_reviews_processed INTEGER,
+    PRIMARY KEY (app_id, lang, country)
+);
+
+INSERT INTO scrape_apps (app_id, priority) VALUES
+    ('com.kcb.mobilebanking.android.mbp', 10),
+    ('ke.co.equitygroup.equitymobile', 10)
+ON CONFLICT DO NOTHING;
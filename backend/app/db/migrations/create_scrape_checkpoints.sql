@@ -0,0 +1,17 @@
+-- Resumable review scrape checkpoints (see ReviewScraper.plan_scrape / save_checkpoint).
+-- One row per (app_id, lang, country): the Play Store continuation token after the last
+-- saved batch, and the date window the scrape was started with.
+CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+    app_id TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    country TEXT NOT NULL,
+    continuation_token TEXT,
+    batch_number INTEGER NOT NULL DEFAULT 0,
+    reviews_fetched INTEGER NOT NULL DEFAULT 0,
+    requested_start_date TIMESTAMP WITH TIME ZONE,
+    window_start TIMESTAMP WITH TIME ZONE,
+    window_end TIMESTAMP WITH TIME ZONE,
+    status TEXT NOT NULL DEFAULT 'in_progress',  -- in_progress | completed
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (app_id, lang, country)
+);
@@ -0,0 +1,78 @@
+-- Daily sentiment rollups per app (see /sentiments/sentiments_analytics in app/routers/sentiments_router.py).
+-- One row per (app_id, day, sentiment, rating) holding the review count, thumbs-up sum and
+-- emotion counts, so dashboards sum a few rows per day instead of re-extracting
+-- latest_analysis JSONB from every review. Weekly/monthly/yearly views sum the daily rows.
+-- sentiment is '' for reviews without an analysis and rating is 0 for unrated reviews
+-- (primary key columns can't be NULL).
+
+CREATE TABLE IF NOT EXISTS sentiment_daily_rollup (
+    app_id TEXT NOT NULL,
+    review_date DATE NOT NULL,
+    sentiment TEXT NOT NULL DEFAULT '',
+    rating SMALLINT NOT NULL DEFAULT 0,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    thumbs_up_sum BIGINT NOT NULL DEFAULT 0,
+    emotion_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (app_id, review_date, sentiment, rating)
+);
+
+CREATE INDEX IF NOT EXISTS idx_processed_app_reviews_app_created_at
+    ON processed_app_reviews(app_id, review_created_at);
+
+-- Recompute one app's rollup rows for one day. Called whenever a review's analysis is
+-- saved (save_review_analysis) and when raw reviews are processed, so a day is always
+-- rebuilt from its current reviews (re-analysis and edited reviews stay correct).
+CREATE OR REPLACE FUNCTION refresh_sentiment_daily_rollup(p_app_id TEXT, p_day DATE)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Serialize concurrent refreshes of the same app/day
+    PERFORM pg_advisory_xact_lock(hashtext('sentiment_daily_rollup:' || p_app_id || ':' || p_day::text));
+
+    DELETE FROM sentiment_daily_rollup WHERE app_id = p_app_id AND review_date = p_day;
+
+    WITH reviews AS (
+        SELECT
+            COALESCE(latest_analysis->'sentiment'->'overall'->>'classification', '') AS sentiment,
+            COALESCE(score, 0)::smallint AS rating,
+            thumbs_up_count,
+            COALESCE(latest_analysis->'sentiment'->'emotions'->'emotion_scores',
+                     latest_analysis->'emotions'->'emotion_scores') AS emotion_scores
+        FROM processed_app_reviews
+        WHERE app_id = p_app_id
+        AND review_created_at >= p_day AND review_created_at < p_day + 1
+    ),
+    groups AS (
+        SELECT sentiment, rating, count(*) AS review_count, COALESCE(sum(thumbs_up_count), 0) AS thumbs_up_sum
+        FROM reviews
+        GROUP BY sentiment, rating
+    ),
+    emotions AS (
+        SELECT sentiment, rating, jsonb_object_agg(emotion, emotion_count) AS emotion_counts
+        FROM (
+            SELECT r.sentiment, r.rating, e.emotion, count(*) AS emotion_count
+            FROM reviews r
+            CROSS JOIN LATERAL jsonb_object_keys(
+                CASE WHEN jsonb_typeof(r.emotion_scores) = 'object' THEN r.emotion_scores ELSE '{}'::jsonb END
+            ) AS e(emotion)
+            GROUP BY r.sentiment, r.rating, e.emotion
+        ) per_emotion
+        GROUP BY sentiment, rating
+    )
+    INSERT INTO sentiment_daily_rollup (app_id, review_date, sentiment, rating, review_count, thumbs_up_sum, emotion_counts, updated_at)
+    SELECT p_app_id, p_day, g.sentiment, g.rating, g.review_count, g.thumbs_up_sum,
+           COALESCE(e.emotion_counts, '{}'::jsonb), NOW()
+    FROM groups g
+    LEFT JOIN emotions e USING (sentiment, rating);
+END;
+$$;
+
+-- Backfill (idempotent; rebuilds every app/day that has reviews)
+SELECT refresh_sentiment_daily_rollup(days.app_id, days.review_date)
+FROM (
+    SELECT DISTINCT app_id, review_created_at::date AS review_date
+    FROM processed_app_reviews
+    WHERE review_created_at IS NOT NULL
+) days;
@@ -1,13 +1,16 @@
 # Get reviews from the database
 # Analyze them
 # Get in batches
+import asyncio
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
 from app.models.pydantic_models import ReviewFilter, Review
-from app.google_reviews.get_reviews import get_reviews
-from app.google_reviews.review_analyzer import perform_review_analysis
+from app.google_reviews.get_reviews import get_reviews, get_next_cursor
+from app.google_reviews.review_analyzer import perform_review_analysis, perform_batched_review_analysis
 from app.google_reviews.save_analyzed_reviews import save_review_analysis, mark_review_analysis_failed
 from app.shared_services.logger_setup import setup_logger
+from app.shared_services.async_db import run_db
+from app.shared_services.rate_limiter import AsyncTokenBucket
 
 logger = setup_logger()
 
@@ -21,13 +24,23 @@ async def analyze_reviews(
     min_score: Optional[float] = None,
     max_score: Optional[float] = None,
     analyzed: bool = False,
-    reanalyze: bool = False
+    reanalyze: bool = False,
+    concurrency: int = 5,
+    reviews_per_minute: Optional[float] = None,
+    fused: bool = False,
+    reviews_per_prompt: int = 1,
+    max_batched_review_chars: int = 280
 ) -> int:
     """
     Get reviews from database based on filters, analyze them, and save the results.
     Only saves reviews that have critical errors in their analysis (top-level or node processing errors).
     Component-specific errors (like positive feedback errors) don't prevent saving.
     
+    Each page of reviews is analyzed concurrently by up to `concurrency` workers sharing
+    one compiled graph; every review is still saved or marked failed on its own. Pages
+    are walked with a keyset cursor, so reviews that fail or are filtered out are not
+    fetched again and reviews flipping to analyzed never shift later pages.
+    
     Args:
         batch_size: Number of reviews to process in each batch
         max_reviews: Maximum number of reviews to analyze in total
@@ -39,12 +52,22 @@ async def analyze_reviews(
         max_score: Only analyze reviews with score <= this value (1-5)
         analyzed: If True, include already analyzed reviews
         reanalyze: If True, reanalyze reviews even if they were analyzed before
+        concurrency: Maximum number of reviews analyzed at the same time
+        reviews_per_minute: Optional cap on how many reviews start analysis per minute,
+            to stay within the LLM provider's rate limits
+        fused: If True, analyze each review with a single combined LLM call instead of
+            the four-step graph (cheaper for large backfills)
+        reviews_per_prompt: If > 1, pack up to this many short reviews into one LLM request
+        max_batched_review_chars: Only reviews at most this long are packed into batched requests
         
     Returns:
         int: Number of reviews successfully analyzed
     """
     total_analyzed = 0
     reviews_remaining = max_reviews if max_reviews else float('inf')
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    rate_limiter = AsyncTokenBucket.per_minute(reviews_per_minute) if reviews_per_minute else None
+    cursor = None
     
     try:
         while reviews_remaining > 0:
@@ -65,97 +88,52 @@ async def analyze_reviews(
             )
             
             # Get reviews based on filters
-            reviews = await get_reviews(filters)
+            reviews = await get_reviews(filters, cursor=cursor)
             
             if not reviews:
                 logger.info("No more reviews found matching the criteria")
                 break
                 
             logger.info(f"Found {len(reviews)} reviews to process")
+            cursor = get_next_cursor(reviews, current_batch_size)
             
-            # Process each review in the batch
+            # Select the reviews in this batch that need analysis
+            to_analyze = []
             for review in reviews:
-                try:
-                    # Apply score filters if specified
-                    if min_score is not None and review.score < min_score:
-                        continue
-                    if max_score is not None and review.score > max_score:
-                        continue
-                        
-                    # Skip already analyzed reviews unless reanalyze is True
-                    if not reanalyze and review.analyzed and not analyzed:
-                        continue
-                    
-                    # Log the review content for debugging
-                    logger.info(f"Starting internal review analysis for content: {review.content[:100]}...")
-                    
-                    # Perform the analysis
-                    analysis_results = await perform_review_analysis(review.content)
-                    
-                    # Add detailed logging
-                    logger.info(f"Analysis results for review {review.review_id}:")
-                    logger.info(f"Review content: {review.content[:100]}...")
-                    logger.info(f"Analysis content: {analysis_results.get('content', 'No content')[:100]}...")
-                    logger.info(f"Full analysis results: {analysis_results}")
+                # Apply score filters if specified
+                if min_score is not None and review.score < min_score:
+                    continue
+                if max_score is not None and review.score > max_score:
+                    continue
                     
-                    # Check for critical errors in the analysis
-                    has_critical_errors = False
-                    error_details = []
-
-                    # Check for top-level error
-                    if analysis_results.get('error'):
-                        has_critical_errors = True
-                        error_details.append(f"Top-level error: {analysis_results.get('error')}")
-
-                    # Check node history for processing errors
-                    node_history = analysis_results.get('node_history', [])
-                    for node in node_history:
-                        if node.get('error'):
-                            has_critical_errors = True
-                            error_details.append(f"Node {node.get('node_name')} error: {node['error'].get('error_message', str(node['error']))}")
-
-                    if has_critical_errors:
-                        error_msg = f"Analysis failed for review {review.review_id}. Critical errors: {'; '.join(error_details)}"
-                        logger.error(error_msg)
-                        
-                        # Mark the review as failed but also as analyzed
-                        error_data = {
-                            "error_message": error_msg,
-                            "error_details": error_details,
-                            "failed_at": datetime.now(timezone.utc).isoformat(),
-                            "analysis_results": analysis_results
-                        }
-                        
-                        if mark_review_analysis_failed(review.review_id, review.app_id, error_data):
-                            logger.info(f"Successfully marked review {review.review_id} as failed")
-                        else:
-                            logger.error(f"Failed to mark review {review.review_id} as failed in database")
-                        
-                        continue
-                        
-                    # Save the analysis results if no critical errors
-                    if save_review_analysis(
-                        review_id=review.review_id,
-                        analysis_data=analysis_results,
-                        app_id=review.app_id
-                    ):
-                        total_analyzed += 1
-                        logger.info(f"Successfully analyzed and saved review {review.review_id} for app {review.app_id}")
-                    else:
-                        logger.error(f"Failed to save analysis for review {review.review_id}")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing review {review.review_id}: {e}")
+                # Skip already analyzed reviews unless reanalyze is True
+                if not reanalyze and review.analyzed and not analyzed:
                     continue
                 
+                to_analyze.append(review)
                 reviews_remaining -= 1
                 if reviews_remaining <= 0:
                     break
             
+            # Short reviews can share one LLM request; the rest are analyzed one by one
+            batched = []
+            if reviews_per_prompt > 1:
+                batched = [review for review in to_analyze if len(review.content or "") <= max_batched_review_chars]
+            single = [review for review in to_analyze if review not in batched]
+            
+            # Analyze the batch concurrently, bounded by the semaphore and rate limiter
+            tasks = [
+                _analyze_and_save_review_batch(batched[i:i + reviews_per_prompt], semaphore, rate_limiter, fused)
+                for i in range(0, len(batched), reviews_per_prompt)
+            ]
+            tasks += [_analyze_and_save_review(review, semaphore, rate_limiter, fused) for review in single]
+            results = await asyncio.gather(*tasks)
+            total_analyzed += sum(int(saved) for saved in results)
+            
             logger.info(f"Completed batch. Total reviews analyzed so far: {total_analyzed}")
             
-            # If we got fewer reviews than requested, we're done
-            if len(reviews) < current_batch_size:
+            # No cursor means we got fewer reviews than requested - we're done
+            if cursor is None:
                 break
         
         logger.info(f"Analysis complete. Total reviews analyzed: {total_analyzed}")
@@ -165,12 +143,172 @@ async def analyze_reviews(
         logger.error(f"Error in analyze_reviews: {e}")
         return total_analyzed
 
+async def _analyze_and_save_review(
+    review: Review,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: Optional[AsyncTokenBucket] = None,
+    fused: bool = False
+) -> bool:
+    """
+    Analyze a single review and save (or mark failed) the result.
+    
+    Returns:
+        bool: True if the analysis was saved successfully
+    """
+    async with semaphore:
+        try:
+            if rate_limiter:
+                await rate_limiter.acquire()
+            
+            # Log the review content for debugging
+            logger.info(f"Starting internal review analysis for content: {review.content[:100]}...")
+            
+            # Perform the analysis
+            analysis_results = await perform_review_analysis(review.content, fused=fused)
+            
+            # Add detailed logging
+            logger.info(f"Analysis results for review {review.review_id}:")
+            logger.info(f"Review content: {review.content[:100]}...")
+            logger.info(f"Analysis content: {analysis_results.get('content', 'No content')[:100]}...")
+            logger.info(f"Full analysis results: {analysis_results}")
+            
+            # Saving is blocking database work - keep it off the event loop
+            return await run_db(_save_analysis_results, review, analysis_results)
+                
+        except Exception as e:
+            logger.error(f"Error processing review {review.review_id}: {e}")
+            await run_db(_mark_failed, review, f"Error processing review {review.review_id}: {e}")
+            return False
+
+async def _analyze_and_save_review_batch(
+    reviews: List[Review],
+    semaphore: asyncio.Semaphore,
+    rate_limiter: Optional[AsyncTokenBucket] = None,
+    fused: bool = False
+) -> int:
+    """
+    Analyze several short reviews with one LLM request and save (or mark failed) each result.
+    
+    The batch takes one rate limiter token per review, so `reviews_per_minute` still caps
+    reviews rather than requests. Reviews the batched response leaves out are re-analyzed
+    one at a time through _analyze_and_save_review, each with its own semaphore slot and
+    token, after this batch has released its slot.
+    
+    Returns:
+        int: Number of reviews whose analysis was saved successfully
+    """
+    saved = 0
+    missing = []
+    handled = set()
+    async with semaphore:
+        try:
+            if rate_limiter:
+                # One token per review; a single acquire(n) could exceed the bucket's capacity
+                for _ in reviews:
+                    await rate_limiter.acquire()
+            
+            logger.info(f"Starting batched analysis of {len(reviews)} reviews")
+            results = await perform_batched_review_analysis(
+                [(review.review_id, review.content) for review in reviews]
+            )
+            
+            for review in reviews:
+                analysis_results = results.get(review.review_id)
+                if analysis_results is None:
+                    missing.append(review)
+                elif await run_db(_save_analysis_results, review, analysis_results):
+                    saved += 1
+                handled.add(review.review_id)
+                
+        except Exception as e:
+            error_msg = f"Error processing review batch {[review.review_id for review in reviews]}: {e}"
+            logger.error(error_msg)
+            for review in reviews:
+                if review.review_id not in handled:
+                    await run_db(_mark_failed, review, error_msg)
+    
+    if missing:
+        logger.info(f"Falling back to single-review analysis for {len(missing)} of {len(reviews)} reviews")
+        outcomes = await asyncio.gather(
+            *(_analyze_and_save_review(review, semaphore, rate_limiter, fused) for review in missing)
+        )
+        saved += sum(int(outcome) for outcome in outcomes)
+    return saved
+
+def _mark_failed(review: Review, error_msg: str) -> None:
+    """Mark a review that produced no analysis at all as failed."""
+    error_data = {
+        "error_message": error_msg,
+        "error_details": [error_msg],
+        "failed_at": datetime.now(timezone.utc).isoformat()
+    }
+    if not mark_review_analysis_failed(review.review_id, review.app_id, error_data):
+        logger.error(f"Failed to mark review {review.review_id} as failed in database")
+
+def _save_analysis_results(review: Review, analysis_results: dict) -> bool:
+    """
+    Save the analysis for a review, or mark the review as failed if the analysis has critical errors.
+    
+    Returns:
+        bool: True if the analysis was saved successfully
+    """
+    # Check for critical errors in the analysis
+    has_critical_errors = False
+    error_details = []
+
+    # Check for top-level error
+    if analysis_results.get('error'):
+        has_critical_errors = True
+        error_details.append(f"Top-level error: {analysis_results.get('error')}")
+
+    # Check node history for processing errors
+    node_history = analysis_results.get('node_history', [])
+    for node in node_history:
+        if node.get('error'):
+            has_critical_errors = True
+            error_details.append(f"Node {node.get('node_name')} error: {node['error'].get('error_message', str(node['error']))}")
+
+    if has_critical_errors:
+        error_msg = f"Analysis failed for review {review.review_id}. Critical errors: {'; '.join(error_details)}"
+        logger.error(error_msg)
+        
+        # Mark the review as failed but also as analyzed
+        error_data = {
+            "error_message": error_msg,
+            "error_details": error_details,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "analysis_results": analysis_results
+        }
+        
+        if mark_review_analysis_failed(review.review_id, review.app_id, error_data):
+            logger.info(f"Successfully marked review {review.review_id} as failed")
+        else:
+            logger.error(f"Failed to mark review {review.review_id} as failed in database")
+        
+        return False
+        
+    # Save the analysis results if no critical errors
+    if save_review_analysis(
+        review_id=review.review_id,
+        analysis_data=analysis_results,
+        app_id=review.app_id
+    ):
+        logger.info(f"Successfully analyzed and saved review {review.review_id} for app {review.app_id}")
+        return True
+    
+    logger.error(f"Failed to save analysis for review {review.review_id}")
+    return False
+
 async def test_review_analysis(
                            app_id: str ,
                             start_date: datetime , 
                            end_date: datetime ,
                            batch_size: int = 5,
-                           max_reviews_per_day: int = 200000):
+                           max_reviews_per_day: int = 200000,
+                           concurrency: int = 5,
+                           reviews_per_minute: Optional[float] = None,
+                           fused: bool = False,
+                           reviews_per_prompt: int = 1):
     """
     Test function to analyze reviews day by day between start_date and end_date.
     
@@ -179,6 +317,10 @@ async def test_review_analysis(
         end_date: End date for analysis (inclusive)
         batch_size: Number of reviews to process in each batch
         max_reviews_per_day: Maximum number of reviews to analyze per day
+        concurrency: Maximum number of reviews analyzed at the same time
+        reviews_per_minute: Optional cap on reviews started per minute (provider rate limit)
+        fused: If True, use the single-call combined analysis
+        reviews_per_prompt: If > 1, pack up to this many short reviews into one LLM request
     """
     logger.info("Starting review analysis test")
     total_reviews = 0
@@ -192,7 +334,11 @@ async def test_review_analysis(
             batch_size=batch_size,
             app_id=app_id,
             date_list=[current_date],
-            analyzed=False
+            analyzed=False,
+            concurrency=concurrency,
+            reviews_per_minute=reviews_per_minute,
+            fused=fused,
+            reviews_per_prompt=reviews_per_prompt
         )
         
         logger.info(f"Analyzed {result} reviews for {current_date.strftime('%Y-%m-%d')}")
@@ -205,8 +351,6 @@ async def test_review_analysis(
     return total_reviews
 
 if __name__ == "__main__":
-    import asyncio
-    
     # Example usage:
     # Process reviews from March 1st to March 5th, 2025
     app_id = 'ke.co.equitygroup.equitymobile'
@@ -1,6 +1,9 @@
 import os
 import argparse
+import hashlib
+import json
 from datetime import datetime, timezone
+from typing import Optional
 from google_play_scraper import app
 from ..shared_services.db import get_postgres_connection
 from ..shared_services.logger_setup import setup_logger
@@ -27,10 +30,43 @@ class AppDetailsScraper:
             logger.error(f"Error getting current app version: {e}")
             return None
 
-    def save_app_details(self, app_id: str, details: dict) -> bool:
+    # Fields that change on almost every poll; kept out of the content hash, recorded in
+    # app_metrics_timeseries and refreshed in place on the latest app_details_history row
+    _METRIC_FIELDS = ('score', 'ratings_count', 'reviews_count', 'installs')
+
+    @classmethod
+    def compute_content_hash(cls, data: dict) -> str:
+        """Hash the tracked (non-metric) app detail fields"""
+        tracked = {k: v for k, v in data.items() if k not in cls._METRIC_FIELDS}
+        payload = json.dumps(tracked, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_last_content_hash(self, app_id: str) -> Optional[str]:
+        """Get the content hash of the last saved app details"""
+        self.cursor.execute("SELECT content_hash FROM app_details_hashes WHERE app_id = %s", (app_id,))
+        result = self.cursor.fetchone()
+        return result[0] if result else None
+
+    def save_app_metrics(self, app_id: str, details: dict) -> None:
+        """Record the frequently changing numeric fields in the metrics time series"""
+        self.cursor.execute("""
+            INSERT INTO app_metrics_timeseries (
+                app_id, score, ratings_count, reviews_count, installs, real_installs
+            ) VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (app_id, observed_at) DO NOTHING
+        """, (app_id, details.get('score'), details.get('ratings'), details.get('reviews'),
+              details.get('installs'), details.get('realInstalls')))
+
+    def save_app_details(self, app_id: str, details: dict, force: bool = False) -> bool:
         """
-        Save app details to history table
-        Returns: True if details were saved successfully
+        Save app details, writing a history row only when something changed.
+
+        Metrics (score, ratings, reviews, installs) are appended to app_metrics_timeseries
+        on every call. The remaining fields are hashed and a new app_details_history row is
+        inserted only if the hash differs from the last saved one (or force is True);
+        otherwise the metrics are refreshed on the app's latest history row.
+
+        Returns: True if a new history row was saved
         """
         try:
             # Prepare the data with correct field mappings
@@ -58,29 +94,57 @@ class AppDetailsScraper:
                 'content_rating_description': details.get('contentRatingDescription'),
                 'app_updated_at': datetime.fromtimestamp(details.get('updated'), tz=timezone.utc) if details.get('updated') else None
             }
+            # The version isn't a history column, but a new release should still be recorded
+            data['content_hash'] = self.compute_content_hash({**data, 'version': details.get('version')})
+
+            self.save_app_metrics(app_id, details)
+
+            changed = force or self.get_last_content_hash(app_id) != data['content_hash']
+            if changed:
+                self.cursor.execute("""
+                    INSERT INTO app_details_history (
+                        app_id, title, description, summary, installs,
+                        score, ratings_count, reviews_count, price, price_currency,
+                        size, minimum_android, developer_id, developer_email,
+                        developer_website, developer_address, privacy_policy, genre,
+                        genre_id, content_rating, content_rating_description,
+                        app_updated_at, content_hash
+                    ) VALUES (
+                        %(app_id)s, %(title)s, %(description)s, %(summary)s, %(installs)s,
+                        %(score)s, %(ratings_count)s, %(reviews_count)s, %(price)s, %(price_currency)s,
+                        %(size)s, %(minimum_android)s, %(developer_id)s, %(developer_email)s,
+                        %(developer_website)s, %(developer_address)s, %(privacy_policy)s, %(genre)s,
+                        %(genre_id)s, %(content_rating)s, %(content_rating_description)s,
+                        %(app_updated_at)s, %(content_hash)s
+                    )
+                """, data)
+            else:
+                self.cursor.execute("""
+                    UPDATE app_details_history
+                    SET installs = %(installs)s, score = %(score)s,
+                        ratings_count = %(ratings_count)s, reviews_count = %(reviews_count)s
+                    WHERE app_id = %(app_id)s AND revision = (
+                        SELECT MAX(revision) FROM app_details_history WHERE app_id = %(app_id)s
+                    )
+                """, data)
 
-            # Insert new record
             self.cursor.execute("""
-                INSERT INTO app_details_history (
-                    app_id, title, description, summary, installs,
-                    score, ratings_count, reviews_count, price, price_currency,
-                    size, minimum_android, developer_id, developer_email,
-                    developer_website, developer_address, privacy_policy, genre,
-                    genre_id, content_rating, content_rating_description,
-                    app_updated_at
-                ) VALUES (
-                    %(app_id)s, %(title)s, %(description)s, %(summary)s, %(installs)s,
-                    %(score)s, %(ratings_count)s, %(reviews_count)s, %(price)s, %(price_currency)s,
-                    %(size)s, %(minimum_android)s, %(developer_id)s, %(developer_email)s,
-                    %(developer_website)s, %(developer_address)s, %(privacy_policy)s, %(genre)s,
-                    %(genre_id)s, %(content_rating)s, %(content_rating_description)s,
-                    %(app_updated_at)s
-                )
-            """, data)
-            
+                INSERT INTO app_details_hashes (app_id, content_hash)
+                VALUES (%s, %s)
+                ON CONFLICT (app_id) DO UPDATE SET
+                    last_checked_at = NOW(),
+                    last_changed_at = CASE
+                        WHEN app_details_hashes.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                        THEN NOW() ELSE app_details_hashes.last_changed_at END,
+                    content_hash = EXCLUDED.content_hash
+            """, (app_id, data['content_hash']))
+
             self.conn.commit()
-            logger.info(f"Successfully saved new app details for {app_id}")
-            return True
+            if changed:
+                logger.info(f"Successfully saved new app details for {app_id}")
+            else:
+                logger.info(f"No changes in app details for {app_id}; refreshed metrics only")
+            return changed
             
         except Exception as e:
             self.conn.rollback()
@@ -113,41 +177,34 @@ class AppDetailsScraper:
         self.cursor.close()
         self.conn.close()
 
-# def main():
-#     """Command line interface for the AppDetailsScraper"""
-#     parser = argparse.ArgumentParser(description='Fetch and store Google Play Store app details')
-#     parser.add_argument('app_id', help='Google Play Store app ID')
-#     parser.add_argument('--lang', default='en', help='Language code (default: en)')
-#     parser.add_argument('--country', default='ke', help='Country code (default: ke)')
-#     parser.add_argument('--force', action='store_true', 
-#                       help='Force update even if version hasn\'t changed')
+def main():
+    """Command line interface for the AppDetailsScraper"""
+    parser = argparse.ArgumentParser(description='Fetch and store Google Play Store app details')
+    parser.add_argument('app_id', help='Google Play Store app ID')
+    parser.add_argument('--lang', default='en', help='Language code (default: en)')
+    parser.add_argument('--country', default='ke', help='Country code (default: ke)')
+    parser.add_argument('--force', action='store_true', 
+                      help='Force update even if details haven\'t changed')
     
-#     args = parser.parse_args()
+    args = parser.parse_args()
     
-#     with AppDetailsScraper() as scraper:
-#         # Fetch details
-#         details = scraper.fetch_app_details(
-#             app_id=args.app_id,
-#             country=args.country,
-#             lang=args.lang
-#         )
+    with AppDetailsScraper() as scraper:
+        # Fetch details
+        details = scraper.fetch_app_details(
+            app_id=args.app_id,
+            country=args.country,
+            lang=args.lang
+        )
         
-#         # Save if forced or if details have changed
-#         if args.force:
-#             scraper.save_app_details(args.app_id, details)
-#             print("Forced update of app details")
-#         elif scraper.save_app_details(args.app_id, details):
-#             print("New app details saved")
-#         else:
-#             print("No changes in app details")
+        # Save if forced or if details have changed
+        if scraper.save_app_details(args.app_id, details, force=args.force):
+            print("New app details saved")
+        else:
+            print("No changes in app details")
         
-#         # Print current version info
-#         print(f"\nCurrent app version: {details.get('version')}")
-#         print(f"Last updated: {details.get('updated')}")
+        # Print current version info
+        print(f"\nCurrent app version: {details.get('version')}")
+        print(f"Last updated: {details.get('updated')}")
 
 if __name__ == "__main__":
-    app_id = 'com.kcb.mobilebanking.android.mbp'
-    fetch_app_details(app_id)
-        
-        # Save if forced or if details have changed
-   
\ No newline at end of file
+    main()
@@ -1,9 +1,35 @@
-from typing import List, Tuple, Optional
+import bisect
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Tuple, Optional
 from google_play_scraper import search
 import logging
+import psycopg2.errors
+from dotenv import load_dotenv
+from ..shared_services.db import get_postgres_connection
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+APP_SEARCH_CACHE_TTL_SECONDS = int(os.getenv("APP_SEARCH_CACHE_TTL_SECONDS", "86400"))
+APP_SEARCH_CACHE_MAX_QUERIES = int(os.getenv("APP_SEARCH_CACHE_MAX_QUERIES", "1000"))
+APP_SEARCH_MIN_LIVE_QUERY_LENGTH = int(os.getenv("APP_SEARCH_MIN_LIVE_QUERY_LENGTH", "3"))
+
+
+def _index_entry(app: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a google_play_scraper search result to an app search index entry"""
+    return {
+        "app_id": app['appId'],
+        "title": app.get('title'),
+        "developer": app.get('developer'),
+        "icon": app.get('icon'),
+        "description": (app.get('description') or '')[:500] or None,
+    }
+
 def search_app_id(
     query: str, 
     country: str = 'ke', 
@@ -24,6 +50,7 @@ def search_app_id(
     """
     try:
         results = search(query, country=country, lang=lang, n_hits=n_hits)
+        app_search_index.add_apps([_index_entry(app) for app in results if app.get('appId')])
         return [(
             app['appId'],
             app['title'],
@@ -34,6 +61,218 @@ def search_app_id(
         logger.error(f"Error searching for apps: {e}")
         return []
 
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+
+def _trigrams(text: str) -> set:
+    """Word trigrams, padded like pg_trgm so short words and word starts still match"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class AppSearchIndex:
+    """
+    In-memory fuzzy index over apps we've already seen (title, developer, app_id).
+
+    Each query token is prefix-matched against the indexed words (bisect over a sorted
+    word list) and the whole query is trigram-matched, so "kcb mob" and "kcb mobil
+    bankng" both find the KCB app without a Play Store round trip. Entries are persisted
+    to the app_search_index table (app/db/migrations/create_app_search_index.sql) and
+    loaded on first use, so the index survives restarts.
+    """
+
+    def __init__(self):
+        self._apps: Dict[str, Dict[str, Any]] = {}
+        self._words: Dict[str, set] = {}
+        self._trigram_index: Dict[str, set] = defaultdict(set)
+        self._sorted_words: List[Tuple[str, str]] = []
+        self._sorted_dirty = False
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.persist = True
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT app_id, title, developer, icon, description FROM app_search_index")
+                    rows = cur.fetchall()
+        except Exception as e:
+            self._handle_error("load", e)
+            return
+        for app_id, title, developer, icon, description in rows:
+            self._add({"app_id": app_id, "title": title, "developer": developer,
+                       "icon": icon, "description": description})
+        logger.info(f"Loaded {len(rows)} apps into the app search index")
+
+    def _handle_error(self, action: str, e: Exception) -> None:
+        if isinstance(e, psycopg2.errors.UndefinedTable):
+            logger.warning("app_search_index table not found - app search index is in-memory only "
+                           "(run app/db/migrations/create_app_search_index.sql)")
+            self.persist = False
+        else:
+            logger.warning(f"App search index {action} failed: {e}")
+
+    def _add(self, app: Dict[str, Any]) -> None:
+        app_id = app["app_id"]
+        self._remove(app_id)
+        text = _normalize(f"{app.get('title')} {app.get('developer')} {app_id.replace('.', ' ')}")
+        words = set(text.split())
+        self._apps[app_id] = app
+        self._words[app_id] = words
+        for gram in _trigrams(text):
+            self._trigram_index[gram].add(app_id)
+        self._sorted_words.extend((word, app_id) for word in words)
+        self._sorted_dirty = True
+
+    def _remove(self, app_id: str) -> None:
+        if app_id not in self._apps:
+            return
+        text = " ".join(self._words.pop(app_id))
+        for gram in _trigrams(text):
+            self._trigram_index[gram].discard(app_id)
+        self._sorted_words = [entry for entry in self._sorted_words if entry[1] != app_id]
+        del self._apps[app_id]
+
+    def add_apps(self, apps: List[Dict[str, Any]]) -> None:
+        """Add or refresh apps in the index and persist them"""
+        if not apps:
+            return
+        with self._lock:
+            self._load()
+            for app in apps:
+                self._add(app)
+        if not self.persist:
+            return
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    for app in apps:
+                        cur.execute("""
+                            INSERT INTO app_search_index (app_id, title, developer, icon, description, last_seen_at)
+                            VALUES (%s, %s, %s, %s, %s, NOW())
+                            ON CONFLICT (app_id) DO UPDATE SET
+                                title = EXCLUDED.title, developer = EXCLUDED.developer,
+                                icon = EXCLUDED.icon, description = EXCLUDED.description,
+                                last_seen_at = NOW()
+                        """, (app["app_id"], app.get("title"), app.get("developer"),
+                              app.get("icon"), app.get("description")))
+        except Exception as e:
+            self._handle_error("save", e)
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.5) -> List[Dict[str, Any]]:
+        """
+        Return up to `limit` indexed apps matching `query`, best first.
+
+        Score is the larger of the fraction of query tokens that prefix-match an indexed
+        word and the fraction of the query's trigrams found in the app's text.
+        """
+        query_text = _normalize(query)
+        if not query_text:
+            return []
+        tokens = query_text.split()
+        query_grams = _trigrams(query_text)
+
+        with self._lock:
+            self._load()
+            if self._sorted_dirty:
+                self._sorted_words.sort()
+                self._sorted_dirty = False
+
+            prefix_hits: Dict[str, int] = defaultdict(int)
+            for token in tokens:
+                matched = set()
+                i = bisect.bisect_left(self._sorted_words, (token, ""))
+                while i < len(self._sorted_words) and self._sorted_words[i][0].startswith(token):
+                    matched.add(self._sorted_words[i][1])
+                    i += 1
+                for app_id in matched:
+                    prefix_hits[app_id] += 1
+
+            gram_hits: Dict[str, int] = defaultdict(int)
+            for gram in query_grams:
+                for app_id in self._trigram_index.get(gram, ()):
+                    gram_hits[app_id] += 1
+
+            scored = []
+            for app_id in set(prefix_hits) | set(gram_hits):
+                score = max(prefix_hits.get(app_id, 0) / len(tokens),
+                            gram_hits.get(app_id, 0) / len(query_grams) if query_grams else 0)
+                if score >= min_score:
+                    scored.append((score, app_id))
+            scored.sort(key=lambda item: (-item[0], self._apps[item[1]].get("title") or ""))
+            return [{**self._apps[app_id], "match_score": round(score, 3)} for score, app_id in scored[:limit]]
+
+
+app_search_index = AppSearchIndex()
+
+# (normalized query, country, lang, n_hits) -> (expires_at, results) for live Play Store searches
+_live_search_cache: "OrderedDict[Tuple[str, str, str, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_live_search_cache_lock = threading.Lock()
+
+
+def _live_search(query: str, country: str, lang: str, n_hits: int) -> Tuple[str, List[Dict[str, Any]]]:
+    """Live Play Store search with a TTL cache; returns (source, results)"""
+    key = (_normalize(query), country, lang, n_hits)
+    now = time.monotonic()
+    with _live_search_cache_lock:
+        cached = _live_search_cache.get(key)
+        if cached and cached[0] > now:
+            _live_search_cache.move_to_end(key)
+            return "cache", cached[1]
+
+    results = search(query, country=country, lang=lang, n_hits=n_hits)
+    apps = [_index_entry(app) for app in results if app.get('appId')]
+
+    with _live_search_cache_lock:
+        _live_search_cache[key] = (now + APP_SEARCH_CACHE_TTL_SECONDS, apps)
+        _live_search_cache.move_to_end(key)
+        while len(_live_search_cache) > APP_SEARCH_CACHE_MAX_QUERIES:
+            _live_search_cache.popitem(last=False)
+
+    app_search_index.add_apps(apps)
+    return "live", apps
+
+
+def search_apps(
+    query: str,
+    country: str = 'ke',
+    lang: str = 'en',
+    limit: int = 5,
+    live_fallback: bool = True
+) -> Dict[str, Any]:
+    """
+    Search apps for autocomplete: local index first, live Play Store search only on a miss.
+
+    Live results are cached for APP_SEARCH_CACHE_TTL_SECONDS and added to the local index,
+    and queries shorter than APP_SEARCH_MIN_LIVE_QUERY_LENGTH never go live, so typing a
+    name one keystroke at a time makes at most a handful of Play Store requests.
+
+    Returns:
+        {"source": "index" | "cache" | "live" | "none", "results": [app dicts]}
+    """
+    results = app_search_index.search(query, limit=limit)
+    if results:
+        return {"source": "index", "results": results}
+
+    if not live_fallback or len(_normalize(query)) < APP_SEARCH_MIN_LIVE_QUERY_LENGTH:
+        return {"source": "none", "results": []}
+
+    try:
+        source, apps = _live_search(query, country, lang, limit)
+    except Exception as e:
+        logger.error(f"Error searching for apps: {e}")
+        return {"source": "none", "results": []}
+    return {"source": source, "results": apps[:limit]}
+
+
 def format_search_results(results: List[Tuple[str, str, str, str]]) -> str:
     """
     Format search results in a human-readable way
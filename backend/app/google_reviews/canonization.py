@@ -5,7 +5,7 @@ import sys
 from app.models.canonization_models import ExistingStatement, CanonizationRequest
 from typing import List, Tuple, Dict, Optional
 from datetime import date, datetime, timedelta
-from app.agents.canonize_statement import canonize_statement_node
+from app.agents.canonize_statement import canonize_statement_node_async
 from app.models.canonization_models import CanonizationLLMResponse
 import logging
 
@@ -38,37 +38,21 @@ def get_issue_statements_by_review(review_id: str) -> List[Tuple[str, str]]: # C
         conn = get_postgres_connection()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT
-                'issue' as section_type,
-                issue_data->>'description' AS free_text_description
-            FROM
-                processed_app_reviews,
-                jsonb_array_elements(latest_analysis->'issues'->'issues') AS issue_data
-            WHERE
-                issue_data->>'description' IS NOT NULL AND review_id = %s
+            SELECT 'issue' AS section_type, description AS free_text_description
+            FROM review_issues
+            WHERE review_id = %s AND description IS NOT NULL
 
             UNION ALL
 
-            SELECT
-                'issue_action' as section_type, -- Consistent column name for union
-                action_data->>'description' AS free_text_description
-            FROM
-                processed_app_reviews,
-                jsonb_array_elements(latest_analysis->'issues'->'issues') AS issue_data,
-                jsonb_array_elements(issue_data->'actions') AS action_data
-            WHERE
-                action_data->>'description' IS NOT NULL AND review_id = %s
+            SELECT 'issue_action' AS section_type, description AS free_text_description
+            FROM review_actions
+            WHERE review_id = %s AND description IS NOT NULL
 
             UNION ALL
 
-            SELECT
-                'positive' as section_type, -- Consistent column name for union
-                positive_data->>'description' AS free_text_description
-            FROM
-                processed_app_reviews,
-                jsonb_array_elements(latest_analysis->'positive_feedback'->'positive_mentions') AS positive_data
-            WHERE
-                positive_data->>'description' IS NOT NULL AND review_id = %s
+            SELECT 'positive' AS section_type, description AS free_text_description
+            FROM review_positives
+            WHERE review_id = %s AND description IS NOT NULL
         """, (review_id, review_id, review_id)) # Pass review_id for each %s
         issue_statements = cursor.fetchall()
 
@@ -188,7 +172,7 @@ async def process_reviews_canonization(
                                     "review_section": section,
                                     "canonical_id": canonical_id
                                 }
-                                canonize_statement_node(state)
+                                await canonize_statement_node_async(state)
                                 continue
 
                             logger.info(f"Statement '{statement}' does not exist, proceeding with canonization")
@@ -213,7 +197,7 @@ async def process_reviews_canonization(
                             }
                             
                             # Send to LLM
-                            canonization_result = canonize_statement_node(state)
+                            canonization_result = await canonize_statement_node_async(state)
                             
                             # Check if canonization was successful
                             if (not canonization_result or 
@@ -19,7 +19,7 @@ from app.models.summary_models import (
     DailySummaryError
 )
 from app.models.pydantic_models import ReviewFilter, Review
-from app.google_reviews.get_reviews import get_reviews
+from app.google_reviews.get_reviews import get_reviews, get_next_cursor
 from app.graph.daily_summary_graph import build_graph
 from app.agents.daily_summary.daily_summary_agent_MVP import daily_summary_node
 from app.google_reviews.save_daily_summary import save_daily_summary, mark_daily_summary_failed
@@ -99,7 +99,7 @@ async def process_review_batches(
     """
     reviews_remaining = max_reviews if max_reviews else float('inf')
     daily_summaries = []
-    current_offset = 0
+    cursor = None
     total_processed = 0
     
     try:
@@ -110,7 +110,6 @@ async def process_review_batches(
             filters = ReviewFilter(
                 app_id=app_id,
                 limit=current_batch_size,
-                offset=current_offset,
                 order_by="review_created_at",
                 order_direction="desc",
                 from_date=min_date,
@@ -122,13 +121,14 @@ async def process_review_batches(
             )
             
             # Get reviews based on filters
-            reviews = await get_reviews(filters)
+            reviews = await get_reviews(filters, cursor=cursor)
             
             if not reviews:
                 logger.info("No more reviews found matching the criteria")
                 break
                 
             logger.info(f"Found {len(reviews)} reviews to process")
+            cursor = get_next_cursor(reviews, current_batch_size)
             
             # Convert Review objects to AppReviewAnalysis objects
             analysis_reviews = [convert_review_to_analysis(review) for review in reviews]
@@ -156,12 +156,11 @@ async def process_review_batches(
                 
             # Update counters
             reviews_remaining -= len(reviews)
-            current_offset += len(reviews)
             
             logger.info(f"Processed batch. Reviews remaining: {reviews_remaining}")
             
-            # If we got fewer reviews than requested, we're done
-            if len(reviews) < current_batch_size:
+            # No cursor means we got fewer reviews than requested - we're done
+            if cursor is None:
                 break
         
         if test_mode:
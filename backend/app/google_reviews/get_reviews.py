@@ -1,12 +1,16 @@
+import base64
+import logging
 from datetime import datetime
 from typing import Optional, List, Tuple
 import json
 from app.models.pydantic_models import Review, ReviewFilter
 from app.shared_services.db import get_postgres_connection
-from ..shared_services.logger_setup import setup_logger
+from app.shared_services.async_db import run_db
+from ..shared_services.logger_setup import LogSampler, get_subsystem_logger
 
 
-logger = setup_logger()
+logger = get_subsystem_logger("reviews")
+_row_sampler = LogSampler()
 
 
 def format_review_data(row_dict: dict) -> str:
@@ -36,10 +40,37 @@ def format_review_data(row_dict: dict) -> str:
     return str(log_dict)
 
 
-async def get_reviews(filters: ReviewFilter) -> List[Review]:
+def encode_cursor(review: Review) -> str:
+    """Opaque keyset cursor pointing just past `review` in (review_created_at, id) order."""
+    payload = json.dumps([review.review_created_at.isoformat(), review.id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed."""
+    try:
+        created_at, review_pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(review_pk)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_next_cursor(reviews: List[Review], limit: int) -> Optional[str]:
+    """Cursor for the page after `reviews`, or None if this was the last page."""
+    if not reviews or len(reviews) < limit:
+        return None
+    return encode_cursor(reviews[-1])
+
+
+async def get_reviews(filters: ReviewFilter, cursor: Optional[str] = None) -> List[Review]:
     """
     Get reviews with flexible filtering options.
     
+    Results are ordered by (review_created_at, id). Pass the `cursor` from the previous
+    page (see get_next_cursor) to get the next page by keyset instead of OFFSET: the
+    query seeks straight to the cursor position, and pages don't shift when rows are
+    updated (e.g. the analyzer flipping `analyzed`) between requests.
+    
     Args:
         filters: ReviewFilter object containing:
             - app_id: Optional filter by app_id
@@ -51,6 +82,7 @@ async def get_reviews(filters: ReviewFilter) -> List[Review]:
             - order_direction: Sort direction (asc or desc)
             - from_date: Optional filter for dates after this
             - to_date: Optional filter for dates before this
+        cursor: Optional keyset cursor; when given, `offset` is ignored
     """
     conditions = []
     params = []
@@ -89,6 +121,13 @@ async def get_reviews(filters: ReviewFilter) -> List[Review]:
     # Add content not null condition
     conditions.append("content IS NOT NULL AND content != ''")
     
+    # Keyset pagination: rows strictly after the cursor in the sort order
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        comparison = "<" if filters.order_direction == "desc" else ">"
+        conditions.append(f"(review_created_at, id) {comparison} (%s, %s)")
+        params.extend([cursor_created_at, cursor_id])
+    
     # Construct the WHERE clause
     where_clause = " AND ".join(conditions) if conditions else "TRUE"
     
@@ -111,41 +150,51 @@ async def get_reviews(filters: ReviewFilter) -> List[Review]:
             latest_analysis        
         FROM processed_app_reviews 
         WHERE {where_clause}
-        ORDER BY {filters.order_by} {filters.order_direction}
+        ORDER BY {filters.order_by} {filters.order_direction}, id {filters.order_direction}
         LIMIT %s OFFSET %s
     """
     
     # Add limit and offset to params
-    params.extend([filters.limit, filters.offset])
+    params.extend([filters.limit, 0 if cursor else filters.offset])
     
+    return await run_db(_execute_reviews_query, query, tuple(params))
+
+
+def _execute_reviews_query(query: str, params: tuple) -> List[Review]:
+    """Run the reviews query on a pooled connection (blocking; called via the DB executor)."""
     conn = get_postgres_connection()
     try:
         with conn.cursor() as cur:
-            logger.info(f"Executing query: {cur.mogrify(query, tuple(params))}")
-            cur.execute(query, tuple(params))
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("Executing query: %s", cur.mogrify(query, params))
+            cur.execute(query, params)
             rows = cur.fetchall()
             columns = [desc[0] for desc in cur.description]
             result = []
+            skipped = 0
             
             for row in rows:
-                # Create a dictionary with explicit column mapping
-                row_dict = {}
-                for i, column in enumerate(columns):
-                    row_dict[column] = row[i]
+                row_dict = dict(zip(columns, row))
                 
-                # Log safely formatted data
-                logger.info(f"Row data: {format_review_data(row_dict)}")
+                # Per-row output is sampled; formatting only happens for sampled rows
+                if debug and _row_sampler.sample():
+                    logger.debug("Row data (sampled): %s", format_review_data(row_dict))
                 
                 # Skip rows with no content
                 if not row_dict.get('content'):
-                    logger.warning(f"Skipping review {row_dict.get('review_id')} due to missing content")
+                    skipped += 1
                     continue
                 
                 result.append(Review(**row_dict))
             
+            if skipped:
+                logger.warning("Skipped %d reviews with missing content", skipped)
+            if debug:
+                logger.debug("Fetched reviews", extra={"rows": len(rows), "returned": len(result)})
             return result
     except Exception as e:
-        logger.error(f"Error fetching reviews: {str(e)}")
+        logger.error("Error fetching reviews: %s", e)
         raise e
     finally:
         conn.close()
@@ -10,18 +10,22 @@ from ..models.review_analysis_models import (
     ResponseContext, ResponseStrategy, ResponseTone, PositiveMention
 )
 from ..graph.review_analysis_graph import build_graph
-from ..agents.review_wise.review_wise_agents import sentiment_analysis_node
+from ..agents.review_wise.review_wise_agents import sentiment_analysis_node_async, fused_analysis_node_async, batched_analysis_async, apply_fused_analysis
 from ..models.summary_models import ProcessingError
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
 from ..shared_services.logger_setup import setup_logger
 
 logger = setup_logger()
 
-async def perform_review_analysis(review_content: str, test_mode: bool = False) -> dict:
-    """
-    Perform analysis on a single review.
-    """
+@lru_cache(maxsize=1)
+def get_review_analysis_graph():
+    """Compile the review analysis graph once per process and reuse it for every review."""
+    return build_graph()
+
+def _build_initial_state(review_content: str) -> MainState:
+    """Build the empty analysis state for a review before any agent has run."""
     # Generate a unique review ID
     review_id = str(uuid4())
     
@@ -127,6 +131,20 @@ async def perform_review_analysis(review_content: str, test_mode: bool = False)
         current_step="sentiment_analysis",
         error=None
     )
+    return initial_state
+
+async def perform_review_analysis(review_content: str, test_mode: bool = False, fused: bool = False) -> dict:
+    """
+    Perform analysis on a single review.
+
+    With fused=True, sentiment, issues, positives and the response recommendation come
+    from a single combined LLM call instead of the four-node graph - much cheaper for
+    high-volume backfills.
+    """
+    initial_state = _build_initial_state(review_content)
+    review_id = initial_state.review_analysis.review_id
+    review_analysis = initial_state.review_analysis
+    review_request = initial_state.review_analysis_request
 
     logger.debug(f"Initialized state with review_id: {review_id}")
     logger.debug(f"Review content in request: {review_request.review_content[:100]}...")
@@ -136,11 +154,15 @@ async def perform_review_analysis(review_content: str, test_mode: bool = False)
         if test_mode:
             # For testing, just do sentiment analysis
             state_dict = initial_state.model_dump()
-            result = await sentiment_analysis_node(state_dict)
+            result = await sentiment_analysis_node_async(state_dict)
+            final_state = MainState(**result)
+        elif fused:
+            # One LLM call for all four analysis sections
+            result = await fused_analysis_node_async(initial_state.model_dump())
             final_state = MainState(**result)
         else:
             # Full analysis using the graph
-            graph = build_graph()
+            graph = get_review_analysis_graph()
             results = await graph.abatch([initial_state.model_dump()])
             final_state = MainState(**results[0])
 
@@ -169,3 +191,32 @@ async def perform_review_analysis(review_content: str, test_mode: bool = False)
         review_analysis.response_recommendation.error = error_msg if review_analysis.response_recommendation else None
         
         return review_analysis.model_dump()
+
+async def perform_batched_review_analysis(reviews: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """
+    Analyze several short reviews with a single LLM call.
+
+    Args:
+        reviews: (review_id, content) pairs
+
+    Returns:
+        Analysis results keyed by review_id, each in the same shape as perform_review_analysis.
+        Reviews missing from the batched response, or whose item failed validation, are left
+        out; the caller re-analyzes them one at a time (see _analyze_and_save_review_batch in
+        analyze_revs_db.py) so those calls go through its concurrency and rate limits.
+    """
+    results = {}
+    try:
+        analyses = await batched_analysis_async(reviews)
+    except Exception as e:
+        logger.error(f"Batched review analysis failed: {e}")
+        return results
+
+    for review_id, content in reviews:
+        analysis = analyses.get(review_id)
+        if analysis is None:
+            continue
+        state = apply_fused_analysis(_build_initial_state(content).model_dump(), analysis)
+        results[review_id] = MainState(**state).review_analysis.model_dump()
+
+    return results
@@ -1,52 +1,111 @@
 import json
 from datetime import datetime, timezone
-import time
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterator, Tuple, Optional
 from google_play_scraper import app, reviews, Sort
+from google_play_scraper.features.reviews import _ContinuationToken  # private API, see _restore_continuation_token
+from psycopg2.extras import execute_values
 from ..shared_services.db import get_postgres_connection
 from ..shared_services.logger_setup import setup_logger
+from ..shared_services.rate_limiter import TokenBucket
 
 logger = setup_logger()
 
+
+class ScrapeInterrupted(RuntimeError):
+    """
+    The Play Store returned an empty page where more reviews were expected.
+    google_play_scraper turns throttling and HTTP errors into an empty page with no
+    continuation token, so this is treated as an interrupted run: the checkpoint keeps
+    the last good token and the next run resumes from it.
+    """
+
+
 class ReviewScraper:
     def __init__(self, db_name="xpchex"):
         """Initialize the ReviewScraper with database connection"""
         self.conn = get_postgres_connection(db_name)
         self.cursor = self.conn.cursor()
 
-    def save_reviews_to_db(self, reviews_data: List[Dict[str, Any]], app_id: str) -> None:
+    _RAW_REVIEW_COLUMNS = (
+        "app_id", "review_id", "username", "user_image", "content", "score",
+        "thumbs_up_count", "review_created_at", "reply_content",
+        "reply_created_at", "app_version", "fetched_at",
+    )
+
+    def save_reviews_to_db(self, reviews_data: List[Dict[str, Any]], app_id: str, process: bool = True) -> int:
         """
-        Save reviews to raw reviews table and process them
+        Bulk-save a batch of reviews to the raw reviews table and (optionally) process them.
+        
+        The batch is written with one multi-row insert into a transaction-scoped staging
+        table, then upserted into raw_app_reviews with ON CONFLICT on its unique
+        (app_id, review_id) index (app/db/migrations/create_raw_reviews_unique_index.sql):
+        new reviews are inserted, existing ones are updated only if their content or reply
+        changed, and duplicates within the batch are dropped.
+        
+        Args:
+            reviews_data: Reviews as returned by google_play_scraper
+            app_id: The app the reviews belong to
+            process: If True, process the app's new raw rows (see process_new_raw_reviews)
+        
+        Returns:
+            int: Number of reviews processed (0 if process is False)
         """
+        if not reviews_data:
+            return 0
         try:
             # Current timestamp for fetched_at
             fetched_at = datetime.now()
             
-            for review in reviews_data:
-                self.cursor.execute("""
-                    INSERT INTO raw_app_reviews (
-                        app_id, review_id, username, user_image, content, score,
-                        thumbs_up_count, review_created_at, reply_content,
-                        reply_created_at, app_version, fetched_at
-                    ) VALUES (
-                        %(app_id)s, %(reviewId)s, %(userName)s, %(userImage)s, %(content)s,
-                        %(score)s, %(thumbsUpCount)s, %(at)s, %(replyContent)s,
-                        %(repliedAt)s, %(reviewCreatedVersion)s, %(fetched_at)s
-                    )
-                """, {**review, 'app_id': app_id, 'fetched_at': fetched_at})
-            
-            # Process the raw reviews into the processed table
-            processed_count = self.process_raw_reviews(app_id)
+            rows = [
+                (
+                    app_id, review['reviewId'], review.get('userName'), review.get('userImage'),
+                    review.get('content'), review.get('score'), review.get('thumbsUpCount'),
+                    review.get('at'), review.get('replyContent'), review.get('repliedAt'),
+                    review.get('reviewCreatedVersion'), fetched_at,
+                )
+                for review in reviews_data
+            ]
+            columns = ", ".join(self._RAW_REVIEW_COLUMNS)
             
-            # Debug: Check what's actually in the database
-            self.cursor.execute("SELECT COUNT(*) FROM raw_app_reviews WHERE app_id = %s", (app_id,))
-            raw_count = self.cursor.fetchone()[0]
-            self.cursor.execute("SELECT COUNT(*) FROM processed_app_reviews WHERE app_id = %s", (app_id,))
-            processed_count_db = self.cursor.fetchone()[0]
-            logger.info(f"DEBUG: Raw reviews in DB: {raw_count}, Processed reviews in DB: {processed_count_db}")
+            # Only the scraped columns: no defaults, so staged rows don't draw raw_app_reviews ids
+            self.cursor.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS raw_app_reviews_staging ON COMMIT DELETE ROWS AS
+                SELECT {columns} FROM raw_app_reviews WITH NO DATA
+            """)
+            execute_values(
+                self.cursor,
+                f"INSERT INTO raw_app_reviews_staging ({columns}) VALUES %s",
+                rows,
+                page_size=1000
+            )
             
+            # Insert new reviews; update ones we have only if their content or developer reply changed
+            self.cursor.execute(f"""
+                INSERT INTO raw_app_reviews ({columns})
+                SELECT DISTINCT ON (s.review_id) {", ".join("s." + c for c in self._RAW_REVIEW_COLUMNS)}
+                FROM raw_app_reviews_staging s
+                ORDER BY s.review_id
+                ON CONFLICT (app_id, review_id) DO UPDATE
+                SET content = EXCLUDED.content, score = EXCLUDED.score,
+                    thumbs_up_count = EXCLUDED.thumbs_up_count, reply_content = EXCLUDED.reply_content,
+                    reply_created_at = EXCLUDED.reply_created_at, app_version = EXCLUDED.app_version,
+                    fetched_at = EXCLUDED.fetched_at
+                WHERE raw_app_reviews.content IS DISTINCT FROM EXCLUDED.content
+                   OR raw_app_reviews.score IS DISTINCT FROM EXCLUDED.score
+                   OR raw_app_reviews.reply_content IS DISTINCT FROM EXCLUDED.reply_content
+                RETURNING (xmax = 0) AS inserted
+            """)
+            written = [row[0] for row in self.cursor.fetchall()]
+            inserted = sum(written)
+            updated = len(written) - inserted
             self.conn.commit()
-            logger.info(f"Successfully saved {len(reviews_data)} reviews to raw table and processed {processed_count} reviews for app {app_id}")
+            logger.info(f"Saved batch of {len(rows)} reviews for app {app_id}: "
+                        f"{inserted} new, {updated} updated, {len(rows) - inserted - updated} unchanged/duplicate")
+            
+            if not process or not (inserted or updated):
+                return 0
+            
+            return self.process_new_raw_reviews(app_id)["processed"]
         except Exception as e:
             self.conn.rollback()
             logger.error(f"Error saving reviews to database: {e}")
@@ -98,6 +157,252 @@ class ReviewScraper:
             logger.error(f"Error processing raw reviews: {e}")
             raise
 
+    def process_new_raw_reviews(self, app_id: str) -> Dict[str, Any]:
+        """
+        Process only the raw reviews fetched since the app's last run.
+        
+        Runs process_raw_reviews_incremental (app/db/migrations/create_incremental_raw_review_processing.sql),
+        which reads raw rows past the app's fetched_at watermark, upserts them into
+        processed_app_reviews in two set-based statements and advances the watermark in
+        the same transaction, so a crash never skips or double-counts rows. Raw rows must
+        be committed in fetched_at order per app, which holds with one writer per app.
+        
+        Args:
+            app_id (str): The app ID to process
+        
+        Returns:
+            dict: processed (inserted or updated), skipped (unchanged), duplicates
+                  (repeated review_ids among the new rows) and the new watermark
+        """
+        try:
+            self.cursor.execute(
+                "SELECT processed, skipped, duplicates, watermark FROM process_raw_reviews_incremental(%s)",
+                (app_id,)
+            )
+            processed, skipped, duplicates, watermark = self.cursor.fetchone()
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"Error processing new raw reviews for app {app_id}: {e}")
+            raise
+        
+        metrics = {"processed": processed, "skipped": skipped, "duplicates": duplicates, "watermark": watermark}
+        logger.info(f"Processed new raw reviews for app {app_id}: {processed} processed, "
+                    f"{skipped} skipped, {duplicates} duplicates (watermark {watermark})")
+        return metrics
+
+    def load_checkpoint(self, app_id: str, lang: str, country: str) -> Optional[Dict[str, Any]]:
+        """Return the saved scrape checkpoint for (app_id, lang, country), if any."""
+        try:
+            self.cursor.execute("""
+                SELECT continuation_token, batch_number, reviews_fetched, requested_start_date,
+                       window_start, window_end, status
+                FROM scrape_checkpoints
+                WHERE app_id = %s AND lang = %s AND country = %s
+            """, (app_id, lang, country))
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+            columns = [desc[0] for desc in self.cursor.description]
+            return dict(zip(columns, row))
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"Could not load scrape checkpoint for {app_id}: {e}")
+            return None
+
+    def save_checkpoint(
+        self,
+        app_id: str,
+        lang: str,
+        country: str,
+        continuation_token: Any,
+        batch_number: int,
+        reviews_fetched: int,
+        requested_start_date: Optional[datetime],
+        window_start: Optional[datetime],
+        window_end: Optional[datetime],
+        status: str = "in_progress"
+    ) -> None:
+        """
+        Persist how far a scrape has got. Called after each batch is committed, so a
+        crashed or throttled run resumes from the next page instead of the newest reviews.
+        """
+        try:
+            self.cursor.execute("""
+                INSERT INTO scrape_checkpoints (
+                    app_id, lang, country, continuation_token, batch_number, reviews_fetched,
+                    requested_start_date, window_start, window_end, status, updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                ON CONFLICT (app_id, lang, country) DO UPDATE SET
+                    continuation_token = EXCLUDED.continuation_token,
+                    batch_number = EXCLUDED.batch_number,
+                    reviews_fetched = EXCLUDED.reviews_fetched,
+                    requested_start_date = EXCLUDED.requested_start_date,
+                    window_start = EXCLUDED.window_start,
+                    window_end = EXCLUDED.window_end,
+                    status = EXCLUDED.status,
+                    updated_at = NOW()
+            """, (app_id, lang, country, getattr(continuation_token, 'token', None), batch_number,
+                  reviews_fetched, requested_start_date, window_start, window_end, status))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"Could not save scrape checkpoint for {app_id}: {e}")
+
+    @staticmethod
+    def _restore_continuation_token(token: str, lang: str, country: str, batch_size: int) -> Any:
+        """Rebuild a google_play_scraper continuation token from its saved token string."""
+        # _ContinuationToken is private to google-play-scraper (constructor as of the pinned
+        # 1.2.7); calling it directly means a signature change fails loudly on resume
+        # The library stores the sort's int value and formats it into the request body
+        return _ContinuationToken(token, lang, country, Sort.NEWEST.value, batch_size, None, None)
+
+    def plan_scrape(
+        self,
+        app_id: str,
+        lang: str = 'en',
+        country: str = 'ke',
+        batch_size: int = 100,
+        incremental: bool = True,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        resume: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Decide where a scrape starts. If an unfinished checkpoint exists for the same
+        date window, continue from its continuation token and keep its cutoff date;
+        otherwise start from the newest reviews.
+        
+        Returns:
+            dict: cutoff_date, continuation_token, batch_number, reviews_fetched
+        """
+        if resume:
+            checkpoint = self.load_checkpoint(app_id, lang, country)
+            if (checkpoint and checkpoint["status"] == "in_progress" and checkpoint["continuation_token"]
+                    and checkpoint["requested_start_date"] == start_date and checkpoint["window_end"] == end_date):
+                logger.info(f"Resuming scrape of {app_id} ({lang}/{country}) after batch {checkpoint['batch_number']} "
+                            f"({checkpoint['reviews_fetched']} reviews already fetched)")
+                return {
+                    "cutoff_date": checkpoint["window_start"],
+                    "continuation_token": self._restore_continuation_token(
+                        checkpoint["continuation_token"], lang, country, batch_size
+                    ),
+                    "batch_number": checkpoint["batch_number"] + 1,
+                    "reviews_fetched": checkpoint["reviews_fetched"],
+                }
+        return {
+            "cutoff_date": self.get_cutoff_date(app_id, incremental, start_date),
+            "continuation_token": None,
+            "batch_number": 1,
+            "reviews_fetched": 0,
+        }
+
+    def get_cutoff_date(self, app_id: str, incremental: bool = True, start_date: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Work out the date before which reviews are not needed: start_date, the latest
+        review already in the DB (incremental mode), or the later of the two.
+        """
+        latest_date = self.get_latest_review_date(app_id) if incremental else None
+        logger.info(f"DEBUG: start_date = {start_date}")
+        logger.info(f"DEBUG: latest_date = {latest_date}")
+        logger.info(f"DEBUG: incremental = {incremental}")
+
+        # If both start_date and incremental are provided, use the later date
+        if start_date and latest_date:
+            cutoff_date = max(start_date, latest_date)
+            logger.info(f"DEBUG: Using max() - cutoff_date = {cutoff_date}")
+        else:
+            cutoff_date = start_date or latest_date
+            logger.info(f"DEBUG: Using or logic - cutoff_date = {cutoff_date}")
+        return cutoff_date
+
+    @staticmethod
+    def iter_review_batches(
+        app_id: str,
+        count: int = 0,
+        lang: str = 'en',
+        country: str = 'ke',
+        batch_size: int = 100,
+        cutoff_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        continuation_token: Any = None,
+        start_batch_number: int = 1
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]], Any]]:
+        """
+        Page through an app's reviews (newest first) and yield
+        (batch_number, reviews, continuation_token) for every page, where reviews are
+        the ones inside the date window (empty for pages still newer than end_date).
+        Does no database work, so it can run in scraper worker threads.
+        
+        Pages are requested through `rate_limiter` (default: one request per second).
+        Pass a saved `continuation_token` to resume paging where a previous run stopped.
+        
+        Paging ends normally when a page comes back without a continuation token, the
+        cutoff date or `count` is reached. An empty page before that raises
+        ScrapeInterrupted (see there), after every earlier page has been yielded.
+        """
+        rate_limiter = rate_limiter or TokenBucket(rate=1.0)
+        total_reviews = 0
+        batch_number = start_batch_number
+        while True:
+            logger.info(f"Fetching batch {batch_number} (size: {batch_size}) for {app_id}")
+            
+            # Fetch batch of reviews
+            rate_limiter.acquire()
+            result, continuation_token = reviews(
+                app_id,
+                lang=lang,
+                country=country,
+                count=min(batch_size, count - total_reviews) if count > 0 else batch_size,
+                sort=Sort.NEWEST,
+                continuation_token=continuation_token
+            )
+            
+            if not result:
+                raise ScrapeInterrupted(
+                    f"Empty page {batch_number} for {app_id} before the end of its reviews "
+                    f"(throttled or request failed)"
+                )
+            
+            logger.info(f"Got {len(result)} reviews in batch {batch_number}")
+            
+            # Filter reviews by date if cutoff_date is provided
+            if cutoff_date:
+                original_count = len(result)
+                result = [r for r in result if r['at'].replace(tzinfo=timezone.utc) > cutoff_date]
+                filtered_count = len(result)
+                if filtered_count < original_count:
+                    logger.info(f"Filtered out {original_count - filtered_count} old reviews")
+                if not result:
+                    logger.info(f"All reviews in this batch are older than {cutoff_date}")
+                    break
+            
+            # Filter reviews by end_date if provided
+            if end_date:
+                original_count = len(result)
+                result = [r for r in result if r['at'].replace(tzinfo=timezone.utc) < end_date]
+                filtered_count = len(result)
+                if filtered_count < original_count:
+                    logger.info(f"Filtered out {original_count - filtered_count} reviews after {end_date}")
+                if not result:
+                    # Newest first - older pages may still fall inside the window
+                    logger.info(f"All reviews in this batch are newer than {end_date} - moving on to older reviews")
+
+            yield batch_number, result, continuation_token
+            total_reviews += len(result)
+            
+            # Check if we've reached the requested count
+            if count > 0 and total_reviews >= count:
+                logger.info(f"Reached requested count of {count} reviews")
+                break
+                
+            if getattr(continuation_token, "token", None) is None:
+                logger.info("No continuation token returned - no more reviews available")
+                break
+                
+            batch_number += 1
+
     def fetch_reviews(
         self, 
         app_id: str, 
@@ -107,7 +412,10 @@ class ReviewScraper:
         batch_size: int = 100,
         incremental: bool = True,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        process_per_batch: bool = True,
+        rate_limiter: Optional[TokenBucket] = None,
+        resume: bool = True
     ) -> Tuple[int, int]:
         """
         Fetch reviews for a given app and save them to the database.
@@ -123,25 +431,21 @@ class ReviewScraper:
                                           Must be timezone-aware if provided.
             end_date (datetime, optional): If provided, only fetch reviews before this date.
                                         Must be timezone-aware if provided.
+            process_per_batch (bool): If True, process each batch's raw reviews as it is saved;
+                                      otherwise process everything fetched once at the end of the run
+            rate_limiter (TokenBucket, optional): Limits Play Store page requests
+                                      (default: one request per second)
+            resume (bool): If True, continue an unfinished scrape of the same date window from
+                           its saved checkpoint instead of starting again from the newest reviews
         
         Returns:
             tuple: (Total reviews fetched, Total reviews processed)
         """
-        continuation_token = None
         total_reviews = 0
         total_processed = 0
-        latest_date = self.get_latest_review_date(app_id) if incremental else None
-        logger.info(f"DEBUG: start_date = {start_date}")
-        logger.info(f"DEBUG: latest_date = {latest_date}")
-        logger.info(f"DEBUG: incremental = {incremental}")
-
-        # If both start_date and incremental are provided, use the later date
-        if start_date and latest_date:
-            cutoff_date = max(start_date, latest_date)
-            logger.info(f"DEBUG: Using max() - cutoff_date = {cutoff_date}")
-        else:
-            cutoff_date = start_date or latest_date
-            logger.info(f"DEBUG: Using or logic - cutoff_date = {cutoff_date}")
+        plan = self.plan_scrape(app_id, lang, country, batch_size, incremental, start_date, end_date, resume)
+        cutoff_date = plan["cutoff_date"]
+        batch_number = plan["batch_number"] - 1
 
         logger.info(f"Starting to fetch reviews for {app_id}")
         logger.info(f"Parameters: count={count}, lang={lang}, country={country}, batch_size={batch_size}")
@@ -149,71 +453,31 @@ class ReviewScraper:
             logger.info(f"Only fetching reviews after {cutoff_date}")
 
         try:
-            batch_number = 1
-            while True:
-                logger.info(f"Fetching batch {batch_number} (size: {batch_size})")
+            for batch_number, result, continuation_token in self.iter_review_batches(
+                app_id, count, lang, country, batch_size, cutoff_date, end_date, rate_limiter,
+                plan["continuation_token"], plan["batch_number"]
+            ):
+                if result:
+                    # Save batch to raw table and process
+                    total_processed += self.save_reviews_to_db(result, app_id, process=process_per_batch)
+                    total_reviews += len(result)
+                    logger.info(f"Batch {batch_number}: Saved {len(result)} reviews. Running total: {total_reviews}")
                 
-                # Fetch batch of reviews
-                result, continuation_token = reviews(
-                    app_id,
-                    lang=lang,
-                    country=country,
-                    count=min(batch_size, count - total_reviews) if count > 0 else batch_size,
-                    sort=Sort.NEWEST,
-                    continuation_token=continuation_token
-                )
-                
-                if not result:
-                    logger.info("No more reviews returned from API")
-                    break
-                
-                logger.info(f"Got {len(result)} reviews in batch {batch_number}")
-                
-                # Filter reviews by date if cutoff_date is provided
-                if cutoff_date:
-                    original_count = len(result)
-                    result = [r for r in result if r['at'].replace(tzinfo=timezone.utc) > cutoff_date]
-                    filtered_count = len(result)
-                    if filtered_count < original_count:
-                        logger.info(f"Filtered out {original_count - filtered_count} old reviews")
-                    if not result:
-                        logger.info(f"All reviews in this batch are older than {cutoff_date}")
-                        break
-                
-                # Filter reviews by end_date if provided
-                if end_date:
-                    original_count = len(result)
-                    result = [r for r in result if r['at'].replace(tzinfo=timezone.utc) < end_date]
-                    filtered_count = len(result)
-                    if filtered_count < original_count:
-                        logger.info(f"Filtered out {original_count - filtered_count} reviews after {end_date}")
-                    if not result:
-                        logger.info(f"All reviews in this batch are newer than {end_date}")
-                        break
-
-                # Save batch to raw table and process
-                self.save_reviews_to_db(result, app_id)
-                total_reviews += len(result)
-                total_processed += len(result)
-                
-                logger.info(f"Batch {batch_number}: Saved {len(result)} reviews. Running total: {total_reviews}")
-                
-                # Check if we've reached the requested count
-                if count > 0 and total_reviews >= count:
-                    logger.info(f"Reached requested count of {count} reviews")
-                    break
-                    
-                if not continuation_token:
-                    logger.info("No continuation token returned - no more reviews available")
-                    break
-                    
-                # Add a small delay to avoid hitting rate limits
-                time.sleep(1)
-                batch_number += 1
+                self.save_checkpoint(app_id, lang, country, continuation_token, batch_number,
+                                     plan["reviews_fetched"] + total_reviews, start_date, cutoff_date, end_date)
 
+        except ScrapeInterrupted as e:
+            # Leave the checkpoint in progress at the last saved page so the next run resumes
+            logger.warning(f"Scrape of {app_id} interrupted, will resume from batch {batch_number + 1}: {e}")
         except Exception as e:
             logger.error(f"Error fetching reviews for app {app_id}: {e}")
             raise
+        else:
+            self.save_checkpoint(app_id, lang, country, None, batch_number, plan["reviews_fetched"] + total_reviews,
+                                 start_date, cutoff_date, end_date, status="completed")
+
+        if not process_per_batch and total_reviews:
+            total_processed = self.process_new_raw_reviews(app_id)["processed"]
 
         logger.info(f"Finished fetching reviews for {app_id}")
         logger.info(f"Total reviews fetched: {total_reviews}")
@@ -249,6 +513,10 @@ def main_cli():
                       help='Fetch all reviews instead of only new ones')
     parser.add_argument('--start-date', type=str, default=None, help='Start date for fetching reviews')
     parser.add_argument('--end-date', type=str, default=None, help='End date for fetching reviews')
+    parser.add_argument('--process-at-end', action='store_false', dest='process_per_batch',
+                      help='Process raw reviews once after the scrape instead of after every batch')
+    parser.add_argument('--no-resume', action='store_false', dest='resume',
+                      help='Ignore any saved checkpoint and start from the newest reviews')
     args = parser.parse_args()
     
     with ReviewScraper() as scraper:
@@ -260,7 +528,9 @@ def main_cli():
             batch_size=args.batch_size,
             incremental=args.incremental,
             start_date=args.start_date,
-            end_date=args.end_date
+            end_date=args.end_date,
+            process_per_batch=args.process_per_batch,
+            resume=args.resume
         )
         
         print(f"\nSummary:")
@@ -3,6 +3,7 @@
 from datetime import datetime, timezone
 from typing import Dict, Any, Tuple, Optional
 import json
+from ..shared_services.analytics_cache import invalidate_analytics_cache
 from ..shared_services.db import get_postgres_connection
 from ..shared_services.logger_setup import setup_logger
 from ..shared_services.utils import DateTimeEncoder
@@ -72,9 +73,37 @@ def mark_review_analysis_failed(review_id: str, app_id: str, error_details: Dict
     finally:
         conn.close()
 
+# Tables derived from a review's latest_analysis, rebuilt whenever it is saved
+# (app/db/migrations/create_review_fact_tables.sql, create_sentiment_daily_rollup.sql)
+_DERIVED_TABLE_REFRESHES = (
+    ("review_facts", "SELECT refresh_review_facts(%s, %s)"),
+    ("sentiment_rollup", """
+        SELECT refresh_sentiment_daily_rollup(app_id, review_created_at::date)
+        FROM processed_app_reviews
+        WHERE app_id = %s AND review_id = %s AND review_created_at IS NOT NULL
+    """),
+)
+
+def refresh_review_derived_tables(cur, app_id: str, review_id: str) -> None:
+    """
+    Rebuild the review's fact rows and its day's sentiment rollup inside the caller's
+    transaction. Each refresh runs in its own savepoint; a failure (e.g. a migration
+    that hasn't been run) is logged and rolled back so it never fails the analysis save.
+    """
+    for name, query in _DERIVED_TABLE_REFRESHES:
+        cur.execute(f"SAVEPOINT {name}")
+        try:
+            cur.execute(query, (app_id, review_id))
+            cur.execute(f"RELEASE SAVEPOINT {name}")
+        except Exception as e:
+            cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            logger.warning(f"Could not refresh {name} for app_id={app_id}, review_id={review_id}: {e}")
+
 def save_review_analysis(review_id: str, analysis_data: Dict[str, Any], app_id: str) -> bool:
     """
-    Save review analysis to ai_review_analysis table and update processed_app_reviews.
+    Save review analysis to ai_review_analysis table and update processed_app_reviews,
+    the review's fact rows and its day's sentiment rollup, and invalidate the app's
+    cached analytics responses.
     
     Args:
         review_id: The ID of the review being analyzed
@@ -135,6 +164,9 @@ def save_review_analysis(review_id: str, analysis_data: Dict[str, Any], app_id:
                 WHERE app_id = %s AND review_id = %s
             """, (json.dumps(analysis_data, cls=DateTimeEncoder), analysis_id, app_id, review_id))
             
+            refresh_review_derived_tables(cur, app_id, review_id)
+            invalidate_analytics_cache(app_id, cur)
+            
             conn.commit()
             logger.info(f"Successfully saved analysis for app_id={app_id}, review_id={review_id} with analysis_id={analysis_id}")
             return True
@@ -6,6 +6,7 @@ import json
 import logging
 from typing import Optional
 from app.models.summary_models import DailySummary
+from app.shared_services.analytics_cache import invalidate_analytics_cache
 from app.shared_services.db import get_postgres_connection
 from app.shared_services.logger_setup import setup_logger
 from app.shared_services.utils import DateTimeEncoder
@@ -52,6 +53,7 @@ def save_daily_summary(daily_summary: DailySummary) -> bool:
                 json.dumps(daily_summary.business_impact.dict(), cls=DateTimeEncoder),
                 json.dumps(daily_summary.error.dict(), cls=DateTimeEncoder) if daily_summary.error else None
             ))
+            invalidate_analytics_cache(daily_summary.app_id, cur)
             
             conn.commit()
             logger.info(f"Successfully saved daily summary for app_id={daily_summary.app_id}, date={daily_summary.summary_date}")
@@ -0,0 +1,272 @@
+"""
+Multi-app review scrape scheduler.
+
+Scrapes every enabled app in the `scrape_apps` table (app/db/migrations/create_scrape_apps.sql)
+concurrently: one worker thread per app pages through the Play Store, all workers share
+a token bucket so the combined request rate to Google stays bounded, and a single
+writer thread saves every batch on one database connection. When an app finishes, its
+outcome is checkpointed back into `scrape_apps`, so total scrape time is roughly that of
+the slowest app rather than the sum of all of them.
+
+Each saved batch also updates the app's resumable checkpoint (scrape_checkpoints), so an
+interrupted run continues from the last saved page.
+"""
+import argparse
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from ..shared_services.db import get_postgres_connection
+from ..shared_services.logger_setup import setup_logger
+from ..shared_services.rate_limiter import TokenBucket
+from .reviews_scraper import ReviewScraper, ScrapeInterrupted
+
+load_dotenv()
+
+logger = setup_logger()
+
+AppKey = Tuple[str, str, str]  # (app_id, lang, country)
+
+
+def get_apps_to_scrape() -> List[Dict[str, str]]:
+    """Return the enabled apps from the scrape_apps config table, highest priority first."""
+    with get_postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT app_id, lang, country
+                FROM scrape_apps
+                WHERE enabled
+                ORDER BY priority, app_id
+            """)
+            return [{"app_id": app_id, "lang": lang, "country": country} for app_id, lang, country in cur.fetchall()]
+
+
+class _ReviewWriter(threading.Thread):
+    """
+    Single database writer shared by all scraper threads.
+
+    Batches are saved in arrival order on the scraper's connection, so scraping
+    concurrency never multiplies database connections or write contention. A bounded
+    queue applies back-pressure to the scrapers if the database falls behind.
+    """
+
+    def __init__(self, scraper: ReviewScraper, max_pending: int, plans: Dict[AppKey, Dict[str, Any]],
+                 start_date: Optional[datetime], end_date: Optional[datetime]):
+        super().__init__(name="review-writer", daemon=True)
+        self.scraper = scraper
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self.results: Dict[AppKey, Dict[str, Any]] = {}
+        self.plans = plans
+        self.start_date = start_date
+        self.end_date = end_date
+        self._last_batch: Dict[AppKey, int] = {}
+
+    def _result(self, key: AppKey) -> Dict[str, Any]:
+        return self.results.setdefault(key, {"fetched": 0, "processed": 0, "error": None})
+
+    def has_failed(self, key: AppKey) -> bool:
+        result = self.results.get(key)
+        return bool(result and result["error"])
+
+    def submit(self, key: AppKey, batch_number: int, batch: List[Dict[str, Any]], continuation_token: Any) -> None:
+        self.queue.put(("batch", key, batch_number, batch, continuation_token))
+
+    def finish_app(self, key: AppKey, started_at: datetime, error: Optional[str]) -> None:
+        self.queue.put(("done", key, started_at, error))
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.join()
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if item[0] == "batch":
+                self._save_batch(*item[1:])
+            else:
+                self._checkpoint(*item[1:])
+
+    def _save_checkpoint(self, key: AppKey, continuation_token: Any, status: str) -> None:
+        plan = self.plans[key]
+        self.scraper.save_checkpoint(
+            *key, continuation_token, self._last_batch.get(key, plan["batch_number"] - 1),
+            plan["reviews_fetched"] + self._result(key)["fetched"],
+            self.start_date, plan["cutoff_date"], self.end_date, status=status
+        )
+
+    def _save_batch(self, key: AppKey, batch_number: int, batch: List[Dict[str, Any]], continuation_token: Any) -> None:
+        result = self._result(key)
+        if result["error"]:
+            return
+        try:
+            if batch:
+                result["processed"] += self.scraper.save_reviews_to_db(batch, key[0])
+                result["fetched"] += len(batch)
+        except Exception as e:
+            result["error"] = f"Error saving reviews: {e}"
+            logger.error(f"Error saving reviews for {key[0]} ({key[1]}/{key[2]}): {e}")
+            return
+        self._last_batch[key] = batch_number
+        self._save_checkpoint(key, continuation_token, "in_progress")
+
+    def _checkpoint(self, key: AppKey, started_at: datetime, error: Optional[str]) -> None:
+        result = self._result(key)
+        result["error"] = result["error"] or error
+        result["status"] = "failed" if result["error"] else "success"
+        if not result["error"]:
+            self._save_checkpoint(key, None, "completed")
+        app_id, lang, country = key
+        try:
+            self.scraper.cursor.execute("""
+                UPDATE scrape_apps
+                SET last_started_at = %s, last_finished_at = NOW(), last_status = %s, last_error = %s,
+                    last_reviews_fetched = %s, last_reviews_processed = %s
+                WHERE app_id = %s AND lang = %s AND country = %s
+            """, (started_at, result["status"], result["error"], result["fetched"], result["processed"],
+                  app_id, lang, country))
+            self.scraper.conn.commit()
+        except Exception as e:
+            self.scraper.conn.rollback()
+            logger.error(f"Error saving scrape checkpoint for {app_id}: {e}")
+        logger.info(f"Finished scraping {app_id} ({lang}/{country}): {result['status']}, "
+                    f"{result['fetched']} fetched, {result['processed']} processed")
+
+
+def _scrape_app(
+    key: AppKey,
+    plan: Dict[str, Any],
+    end_date: Optional[datetime],
+    count: int,
+    batch_size: int,
+    rate_limiter: TokenBucket,
+    writer: _ReviewWriter
+) -> None:
+    """Worker: page through one app's reviews and hand each batch to the writer."""
+    app_id, lang, country = key
+    started_at = datetime.now(timezone.utc)
+    error = None
+    try:
+        for batch_number, batch, continuation_token in ReviewScraper.iter_review_batches(
+            app_id, count, lang, country, batch_size, plan["cutoff_date"], end_date, rate_limiter,
+            plan["continuation_token"], plan["batch_number"]
+        ):
+            if writer.has_failed(key):
+                break
+            writer.submit(key, batch_number, batch, continuation_token)
+    except ScrapeInterrupted as e:
+        # Not marked completed, so the checkpoint keeps the last saved page for the next run
+        error = f"Scrape interrupted, will resume: {e}"
+        logger.warning(f"Scrape of {app_id} ({lang}/{country}) interrupted: {e}")
+    except Exception as e:
+        error = f"Error fetching reviews: {e}"
+        logger.error(f"Error fetching reviews for app {app_id}: {e}")
+    writer.finish_app(key, started_at, error)
+
+
+def scrape_apps(
+    apps: Optional[List[Dict[str, str]]] = None,
+    max_workers: Optional[int] = None,
+    requests_per_second: Optional[float] = None,
+    incremental: bool = True,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    count: int = 0,
+    batch_size: int = 100,
+    resume: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Scrape reviews for many apps concurrently.
+
+    Args:
+        apps: Apps to scrape as {"app_id", "lang", "country"} dicts; defaults to the
+            enabled rows of the scrape_apps table
+        max_workers: Number of apps scraped at the same time (SCRAPE_MAX_WORKERS, default 4)
+        requests_per_second: Combined Play Store request rate across all workers
+            (SCRAPE_REQUESTS_PER_SECOND, default 2)
+        incremental: If True, only fetch reviews newer than the latest in DB for each app
+        start_date: If provided, only fetch reviews after this date (timezone-aware)
+        end_date: If provided, only fetch reviews before this date (timezone-aware)
+        count: Maximum reviews per app, 0 for all
+        batch_size: Reviews per Play Store page (max 100)
+        resume: If True, continue each app's unfinished scrape from its saved checkpoint
+
+    Returns:
+        One result per app: app_id, lang, country, status, fetched, processed, error
+    """
+    max_workers = max_workers or int(os.getenv("SCRAPE_MAX_WORKERS", "4"))
+    requests_per_second = requests_per_second or float(os.getenv("SCRAPE_REQUESTS_PER_SECOND", "2"))
+
+    if apps is None:
+        apps = get_apps_to_scrape()
+    if not apps:
+        logger.warning("No apps to scrape")
+        return []
+
+    keys = [(a["app_id"], a.get("lang", "en"), a.get("country", "ke")) for a in apps]
+    rate_limiter = TokenBucket(rate=requests_per_second)
+    logger.info(f"Scraping {len(keys)} apps with {max_workers} workers at {requests_per_second} requests/s")
+
+    with ReviewScraper() as scraper:
+        plans = {
+            key: scraper.plan_scrape(*key, batch_size, incremental, start_date, end_date, resume)
+            for key in keys
+        }
+
+        writer = _ReviewWriter(scraper, max_workers * 2, plans, start_date, end_date)
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-scraper") as pool:
+                for key in keys:
+                    pool.submit(_scrape_app, key, plans[key], end_date, count, batch_size, rate_limiter, writer)
+        finally:
+            writer.close()
+
+    results = []
+    for key in keys:
+        result = writer.results.get(key, {"fetched": 0, "processed": 0, "error": None, "status": "success"})
+        results.append({"app_id": key[0], "lang": key[1], "country": key[2], **result})
+
+    failed = [r["app_id"] for r in results if r["status"] == "failed"]
+    logger.info(f"Scrape complete: {len(results) - len(failed)} apps succeeded, {len(failed)} failed {failed or ''}")
+    return results
+
+
+def main():
+    """Command line entry point for the nightly multi-app scrape"""
+    parser = argparse.ArgumentParser(description='Scrape Google Play Store reviews for many apps concurrently')
+    parser.add_argument('app_ids', nargs='*', help='App IDs to scrape (default: enabled apps in scrape_apps)')
+    parser.add_argument('--lang', default='en', help='Language code for app IDs given on the command line')
+    parser.add_argument('--country', default='ke', help='Country code for app IDs given on the command line')
+    parser.add_argument('--workers', type=int, default=None, help='Number of apps scraped concurrently')
+    parser.add_argument('--rps', type=float, default=None, help='Combined Play Store requests per second')
+    parser.add_argument('--count', type=int, default=0, help='Maximum reviews per app (0 for all)')
+    parser.add_argument('--no-incremental', action='store_false', dest='incremental',
+                        help='Fetch all reviews instead of only new ones')
+    parser.add_argument('--no-resume', action='store_false', dest='resume',
+                        help='Ignore saved checkpoints and start every app from the newest reviews')
+    args = parser.parse_args()
+
+    apps = [{"app_id": app_id, "lang": args.lang, "country": args.country} for app_id in args.app_ids] or None
+    results = scrape_apps(
+        apps=apps,
+        max_workers=args.workers,
+        requests_per_second=args.rps,
+        incremental=args.incremental,
+        count=args.count,
+        resume=args.resume
+    )
+    for result in results:
+        print(f"{result['app_id']} ({result['lang']}/{result['country']}): {result['status']}, "
+              f"{result['fetched']} fetched, {result['processed']} processed"
+              + (f", error: {result['error']}" if result['error'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from datetime import date, timedelta
 from typing import Any, Dict, List, Optional
 import json
 
+from app.shared_services.analytics_cache import invalidate_analytics_cache
 from app.shared_services.db import get_postgres_connection
 from app.shared_services.logger_setup import setup_logger
 from app.google_reviews.weekly.weekly_summary_generator import process_weekly_aggregations
@@ -195,6 +196,7 @@ def save_week_aggregation(aggregated_data: Dict[str, Any]) -> bool:
                     json.dumps(aggregated_data),
                 ),
             )
+            invalidate_analytics_cache(aggregated_data['app_id'], cur)
             conn.commit()
             logger.info(
                 f"Saved weekly aggregation for app_id={aggregated_data['app_id']} week_start={aggregated_data['week_start']}"
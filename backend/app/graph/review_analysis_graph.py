@@ -1,14 +1,15 @@
 """
 Graph Builder Module for No Frameworks
 """
-from typing import Dict, Any
+import operator
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Annotated, TypedDict
 from langgraph.graph import StateGraph, END, START
 import logging
 
 from ..models.review_analysis_models import MainState, ReviewAnalysisRequest, IssueAnalysis, SentimentAnalysis, ProductStrengths, ResponseRecommendation, CompetitorComparison, Prioritization, MarketOpportunity, SourceDerivation, BusinessGoal, StrategicInitiative, PositiveMention, ImpactAnalysis, Implementation, RoadmapImpactAssessment, RoadmapPrioritization, RoadmapTimeline, Opportunities, Roadmap    
 
 #Nodes
-from ..agents.review_wise.review_wise_agents import sentiment_analysis_node, issue_analysis_node, positives_analysis_node, response_recommendations_node
+from ..agents.review_wise.review_wise_agents import sentiment_analysis_node_async, issue_analysis_node_async, positives_analysis_node_async, response_recommendations_node_async
 
 #Logging
 
@@ -88,27 +89,81 @@ def save_graph_state(state: Dict[str, Any]) -> Dict[str, Any]:
     
     return current_state.model_dump()
   
+def _merge_review_analysis(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer: merge the analysis sections written by parallel nodes into one review_analysis."""
+    if hasattr(left, "model_dump"):
+        left = left.model_dump()
+    if hasattr(right, "model_dump"):
+        right = right.model_dump()
+    return {**(left or {}), **(right or {})}
+
+
+def _keep_first_error(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Reducer: keep the first error reported by any branch."""
+    return left if left else right
+
+
+def _last_value(left: Any, right: Any) -> Any:
+    """Reducer: accept concurrent writes and keep the latest one."""
+    return right
+
+
+class ReviewAnalysisGraphState(TypedDict, total=False):
+    """
+    Graph state for the review analysis workflow. Mirrors MainState, with reducers
+    so the independent analysis nodes can run in the same step and be joined.
+    """
+    review_analysis_request: Dict[str, Any]
+    review_analysis: Annotated[Dict[str, Any], _merge_review_analysis]
+    node_history: Annotated[List[Dict[str, Any]], operator.add]
+    current_step: Annotated[str, _last_value]
+    error: Annotated[Optional[Dict[str, Any]], _keep_first_error]
+
+
+def _analysis_node(agent: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]], section: str, step: str):
+    """
+    Wrap an async review_wise agent node so it only returns the parts of the state it
+    changed: its own review_analysis section, its node_history entry and any error.
+    """
+    async def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        result = await agent(dict(state))
+        update = {
+            "review_analysis": {section: result["review_analysis"][section]},
+            "node_history": result["node_history"][-1:],
+            "current_step": step,
+        }
+        if result.get("error"):
+            update["error"] = result["error"]
+        return update
+
+    node.__name__ = step
+    return node
+
+
 def build_graph(state: Dict[str, Any] = None) -> StateGraph:
-    """Build the review analysis workflow graph."""
-    workflow = StateGraph(MainState)
+    """
+    Build the review analysis workflow graph.
+
+    Sentiment, issue and positives analysis don't depend on each other, so they fan
+    out from START and run in parallel; response recommendations runs once all
+    three have finished.
+    """
+    workflow = StateGraph(ReviewAnalysisGraphState)
     
     # Add nodes
-    workflow.add_node("sentiment_analysis", sentiment_analysis_node)
+    workflow.add_node("sentiment_analysis", _analysis_node(sentiment_analysis_node_async, "sentiment", "sentiment_analysis"))
    # workflow.add_node("aspect_analysis", aspect_analysis_node)
-    workflow.add_node("issue_analysis", issue_analysis_node)
+    workflow.add_node("issue_analysis", _analysis_node(issue_analysis_node_async, "issues", "issue_analysis"))
     #workflow.add_node("opportunities_analysis", opportunities_analysis_node)
-    workflow.add_node("positives_analysis", positives_analysis_node)
+    workflow.add_node("positives_analysis", _analysis_node(positives_analysis_node_async, "positive_feedback", "positives_analysis"))
     #workflow.add_node("roadmap_analysis", roadmap_analysis_node)
-    workflow.add_node("response_recommendations", response_recommendations_node)
+    workflow.add_node("response_recommendations", _analysis_node(response_recommendations_node_async, "response_recommendation", "response_recommendations"))
     
-    # Add edges
+    # Add edges - fan out the independent analyses, join before the response step
     workflow.add_edge(START, "sentiment_analysis")
-    #workflow.add_edge("sentiment_analysis", "aspect_analysis")
-    #workflow.add_edge("aspect_analysis", "issue_analysis")
-    workflow.add_edge("sentiment_analysis", "issue_analysis")
-    #workflow.add_edge("issue_analysis", "opportunities_analysis")
-    workflow.add_edge("issue_analysis", "positives_analysis")
-    workflow.add_edge("positives_analysis", "response_recommendations")
+    workflow.add_edge(START, "issue_analysis")
+    workflow.add_edge(START, "positives_analysis")
+    workflow.add_edge(["sentiment_analysis", "issue_analysis", "positives_analysis"], "response_recommendations")
     #workflow.add_edge("roadmap_analysis", "response_recommendations")
     workflow.add_edge("response_recommendations", END)
     
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+from app.models.review_analysis_models import SentimentAnalysis, IssueAnalysis, ProductStrengths, ResponseRecommendation
+
+
+class FusedReviewAnalysis(BaseModel):
+    """Sentiment, issues, positives and response recommendation for one review, returned by a single LLM call."""
+    sentiment: SentimentAnalysis = Field(..., description="Sentiment and emotion analysis of the review")
+    issues: IssueAnalysis = Field(..., description="Negative issues raised in the review and actions to resolve them")
+    positive_feedback: ProductStrengths = Field(..., description="Positive feedback and strengths mentioned in the review")
+    response_recommendation: ResponseRecommendation = Field(..., description="Recommended response to the review")
+
+
+class BatchedReviewAnalysisItem(BaseModel):
+    """Analysis of one review inside a batched (multi-review) LLM response."""
+    review_id: str = Field(..., description="The review_id given for this review in the prompt")
+    analysis: FusedReviewAnalysis
+
+
+class BatchedReviewAnalysis(BaseModel):
+    """
+    Response of a batched analysis call. Items are kept as raw dicts and validated one by
+    one against BatchedReviewAnalysisItem, so one malformed item doesn't fail the batch.
+    """
+    analyses: List[Dict[str, Any]] = Field(..., description="One BatchedReviewAnalysisItem per review")
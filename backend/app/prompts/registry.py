@@ -0,0 +1,77 @@
+"""
+Prompt registry.
+
+Review prompts are mostly static text (instructions, JSON schema, examples) around
+the review content. Registering a prompt function renders it once, splits the result
+around the review content and keeps the static parts, so each call only joins the
+review into precomputed text instead of regenerating schemas and f-strings.
+
+Every registered prompt has a version hash over its static text; it changes whenever
+the prompt's wording, schema or examples change, so LLM results can be tied to the
+prompt version that produced them.
+"""
+import hashlib
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from app.shared_services.logger_setup import setup_logger
+
+logger = setup_logger()
+
+
+class PromptTemplate:
+    """A prompt rendered once, with `review_content` interpolated per call."""
+
+    def __init__(self, name: str, render: Callable[..., str]):
+        self.name = name
+        self._render = render
+
+        # Render once with a unique marker standing in for the review content
+        marker = f"@@review_content_{uuid.uuid4().hex}@@"
+        rendered = render(review_content=marker)
+        parts = rendered.split(marker)
+        if len(parts) > 1:
+            self._parts: Optional[List[str]] = parts
+            static_text = "".join(parts)
+        else:
+            # The function transforms the content (or doesn't use it) - render every call
+            logger.warning(f"Prompt '{name}' could not be precompiled; it will be rendered on every call")
+            self._parts = None
+            static_text = rendered
+
+        self.version = hashlib.sha256(f"{name}\0{static_text}".encode("utf-8")).hexdigest()[:12]
+
+    def __call__(self, review_content: str) -> str:
+        if self._parts is None:
+            return self._render(review_content=review_content)
+        return review_content.join(self._parts)
+
+
+class PromptRegistry:
+    """Process-wide set of precompiled prompts, looked up by name."""
+
+    def __init__(self):
+        self._prompts: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, render: Callable[..., str]) -> PromptTemplate:
+        """Precompile `render` under `name` (idempotent) and return the template."""
+        with self._lock:
+            if name not in self._prompts:
+                self._prompts[name] = PromptTemplate(name, render)
+            return self._prompts[name]
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._prompts[name]
+
+    def versions(self) -> Dict[str, str]:
+        """Return {prompt name: version hash} for every registered prompt."""
+        return {name: template.version for name, template in self._prompts.items()}
+
+
+prompt_registry = PromptRegistry()
+
+
+def get_prompt_versions() -> Dict[str, str]:
+    return prompt_registry.versions()
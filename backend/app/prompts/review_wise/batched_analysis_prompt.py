@@ -0,0 +1,42 @@
+import json
+from typing import List, Tuple
+
+from app.models.fused_review_analysis_models import BatchedReviewAnalysisItem
+from app.prompts.review_wise.fused_analysis_prompt import FUSED_ANALYSIS_INSTRUCTIONS
+
+# Registered with the prompt registry like the single-review prompts (see
+# review_wise_agents.py); the reviews block is the per-call content
+_HEADER = """
+    Agent Name: batched_analysis_agent
+    Description: You are an expert app review analyst. You analyze several independent app reviews at once.
+    Analyze every review on its own - never let one review influence the analysis of another.
+
+    Reviews to analyze (one JSON object per line):
+"""
+
+_INSTRUCTIONS = f"""
+    Return a JSON object {{"analyses": [...]}} with exactly one item per review above, in the same order.
+    Each item has the review's "review_id" (copied exactly) and an "analysis" with these four sections:
+
+{FUSED_ANALYSIS_INSTRUCTIONS}
+    Validation Rules:
+    1. Return exactly one item for every review_id listed above, and no others.
+    2. Every value must be derived exclusively from that item's review text.
+    3. If a section cannot be completed, populate that section's `error` field and leave its other fields empty or null.
+
+    JSON schema of each item:
+    {BatchedReviewAnalysisItem.model_json_schema()}
+    """
+
+
+def format_batched_reviews(reviews: List[Tuple[str, str]]) -> str:
+    """The reviews block of the batched prompt: one JSON object per (review_id, content) pair."""
+    return "\n".join(
+        json.dumps({"review_id": review_id, "content": content}, ensure_ascii=False)
+        for review_id, content in reviews
+    )
+
+
+def get_batched_analysis_prompt(review_content: str) -> str:
+    """Generate one prompt that analyzes several short reviews, given as a format_batched_reviews() block."""
+    return f"{_HEADER}{review_content}\n{_INSTRUCTIONS}"
@@ -0,0 +1,51 @@
+from app.models.fused_review_analysis_models import FusedReviewAnalysis
+
+# Per-section instructions, shared with the batched (multi-review) prompt
+FUSED_ANALYSIS_INSTRUCTIONS = """
+    1. "sentiment" (`SentimentAnalysis`):
+       - Overall sentiment score, classification, confidence and positive/neutral/negative distribution.
+       - Primary and secondary emotions; emotion scores must sum to 1.0.
+       - Segments of the review with exact text spans and a sentiment label for each.
+
+    2. "issues" (`IssueAnalysis`):
+       - Negative feedback only. If there is none, return an empty list and say so in the error field.
+       - Issue types MUST be one of: ["bug", "performance", "feature_request", "ux_issue", "security", "other"].
+       - State each issue from the negative perspective (e.g. "Feature to upload large files is missing"), not as a suggestion.
+       - impact_score is 0-100: how much the issue drives the review's overall sentiment.
+       - Include key_words, supporting snippets and concrete actions to resolve each issue.
+
+    3. "positive_feedback" (`ProductStrengths`):
+       - For each positive aspect: a clear description of what users like, a supporting quote, keywords,
+         the impact area, the user segments that are happy with it and any metrics mentioned.
+       - impact_score is 0-100: how much the positive mention drives the review's overall sentiment.
+
+    4. "response_recommendation" (`ResponseRecommendation`):
+       - Whether and how to respond, the strategy and tone, and a suggested public response.
+       - formality_level MUST be one of: 'casual', 'neutral', or 'formal'.
+       - The response must be consistent with the issues and positives you identified above.
+"""
+
+
+def get_fused_analysis_prompt(review_content: str) -> str:
+    """Generate a single prompt that returns sentiment, issues, positives and the response recommendation together."""
+    schema = FusedReviewAnalysis.model_json_schema()
+
+    return f"""
+    Agent Name: fused_analysis_agent
+    Description: You are an expert app review analyst. In one pass you analyze the sentiment, the negative issues,
+    the positive feedback and the recommended response for a single app review.
+
+    Review to analyze:
+    {review_content}
+
+    Return ONE JSON object with exactly these four sections:
+
+{FUSED_ANALYSIS_INSTRUCTIONS}
+    Validation Rules:
+    1. The output must be a single, valid JSON object matching the schema below.
+    2. Every value must be derived exclusively from the review above and justified by its text.
+    3. If a section cannot be completed, populate that section's `error` field and leave its other fields empty or null.
+
+    JSON schema:
+    {schema}
+    """
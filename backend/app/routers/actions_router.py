@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timedelta
 import logging
 from typing import Optional, List
@@ -6,8 +7,9 @@ from enum import Enum
 from dateutil.relativedelta import relativedelta
 import ast
 
-from app.shared_services.db import get_postgres_connection
-import pandas as pd
+from app.shared_services.analytics_cache import cached_analytics_response
+from app.shared_services.async_db import fetch_all_async, fetch_dicts_async, fetch_value_async
+from app.shared_services.serialization import rows_to_records
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +30,13 @@ class Granularity(str, Enum):
 
 router = APIRouter(
     prefix="/actions",
-    tags=["actions"]
+    tags=["actions"],
+    default_response_class=ORJSONResponse
 )
 
 @router.get("/actions_analytics", status_code=status.HTTP_200_OK)
 async def get_actions_analytics(
+    request: Request,
     app_id: str = Query(..., description="App ID"),
     time_range: TimeRange = Query(default=TimeRange.LAST_30_DAYS),
     estimated_effort: Optional[str] = Query(default=None, description="Filter by effort level: low, medium, high"),
@@ -49,38 +53,19 @@ async def get_actions_analytics(
     - All time: Dynamic (yearly if >1 year of data, monthly otherwise)
     
     Granularity is automatically determined and cannot be overridden.
+
+    Responses are cached until new analysis data is saved, and carry an ETag
+    (see app/shared_services/analytics_cache.py).
     """
     try:
-        # Auto-determine granularity based on time range
-        granularity = _get_granularity_for_range(time_range)
-        
-        # Calculate date range
-        start_date, end_date = _calculate_date_range(time_range)
-        
-        # Get aggregated data based on granularity
-        if granularity == Granularity.DAILY:
-            actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
-        elif granularity == Granularity.WEEKLY:
-            actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
-        elif granularity == Granularity.MONTHLY:
-            actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
-        elif granularity == Granularity.YEARLY:
-            actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
-        else:
-            actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
-            
-
-        return {
-            "status": "success",
-            "time_range": time_range,
-            "granularity": granularity,
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "data": actions_data
-        }
-        
+        return await cached_analytics_response(
+            request,
+            "actions_analytics",
+            app_id,
+            {"time_range": time_range, "estimated_effort": estimated_effort, "suggested_timeline": suggested_timeline},
+            lambda: _build_actions_analytics(time_range, estimated_effort, suggested_timeline),
+            app_scoped=False,  # the aggregates span all apps
+        )
     except Exception as e:
         logger.error(f"Error getting actions analytics: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -88,6 +73,43 @@ async def get_actions_analytics(
             detail=f"Error getting actions analytics: {str(e)}"
         )
 
+
+async def _build_actions_analytics(
+    time_range: TimeRange,
+    estimated_effort: Optional[str],
+    suggested_timeline: Optional[str]
+) -> dict:
+    """Build the actions_analytics response payload"""
+    # Auto-determine granularity based on time range
+    granularity = await _get_granularity_for_range(time_range)
+    
+    # Calculate date range
+    start_date, end_date = _calculate_date_range(time_range)
+    
+    # Get aggregated data based on granularity
+    if granularity == Granularity.DAILY:
+        actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
+    elif granularity == Granularity.WEEKLY:
+        actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
+    elif granularity == Granularity.MONTHLY:
+        actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
+    elif granularity == Granularity.YEARLY:
+        actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
+    else:
+        actions_data = await _get_aggregated_actions_data(start_date, end_date, granularity, estimated_effort, suggested_timeline)
+        
+
+    return {
+        "status": "success",
+        "time_range": time_range,
+        "granularity": granularity,
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        },
+        "data": actions_data
+    }
+
 @router.get("/list_actions", status_code=status.HTTP_200_OK)
 async def list_actions(
     app_id: str = Query(..., description="App ID"),
@@ -152,7 +174,7 @@ async def list_actions(
             detail=f"Error listing actions: {str(e)}"
         )
 # Helper functions
-def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
+async def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
     """Auto-determine granularity based on time range"""
     if time_range in [TimeRange.LAST_7_DAYS]:
         return Granularity.DAILY
@@ -164,7 +186,7 @@ def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
         return Granularity.MONTHLY
     elif time_range == TimeRange.ALL_TIME:
         # For all time, dynamically determine based on data span
-        return _get_alltime_granularity()
+        return await _get_alltime_granularity()
     else:
         return Granularity.MONTHLY
 
@@ -216,7 +238,7 @@ def _calculate_date_range(time_range: TimeRange) -> tuple[datetime, datetime]:
     
     return start_date, end_date
 
-def _get_alltime_granularity() -> Granularity:
+async def _get_alltime_granularity() -> Granularity:
     """
     Dynamically determine granularity for all-time data based on data span.
     If the app has been collecting data for more than 1 year, use yearly aggregation.
@@ -227,22 +249,20 @@ def _get_alltime_granularity() -> Granularity:
         query = """
         SELECT MIN(first_date_recommended) FROM issues
         """
-        with get_postgres_connection() as conn:
-            result = pd.read_sql(query, conn)
-            if not result.empty and result.iloc[0, 0] is not None:
-                min_date = result.iloc[0, 0]
-                current_date = datetime.now()
-                
-                # Calculate the difference in years
-                years_diff = (current_date - min_date).days / 365.25
-                
-                if years_diff > 1:
-                    return Granularity.YEARLY
-                else:
-                    return Granularity.MONTHLY
+        min_date = await fetch_value_async(query)
+        if min_date is not None:
+            current_date = datetime.now()
+
+            # Calculate the difference in years
+            years_diff = (current_date - min_date).days / 365.25
+
+            if years_diff > 1:
+                return Granularity.YEARLY
             else:
-                # If no data found, default to monthly
                 return Granularity.MONTHLY
+        else:
+            # If no data found, default to monthly
+            return Granularity.MONTHLY
     except Exception as e:
         logger.warning(f"Error determining all-time granularity: {str(e)}. Defaulting to monthly.")
         return Granularity.MONTHLY
@@ -490,10 +510,11 @@ async def _get_aggregated_actions_data(
     )
 
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing aggregation query with params: {params}")
-            logger.info(f"Final query: {final_query}")
-            
+        logger.debug("Executing aggregation query with params: %s", params)
+        logger.debug("Final query: %s", final_query)
+
+        # Extra diagnostic query only runs when DEBUG is on for this router
+        if logger.isEnabledFor(logging.DEBUG):
             # Debug: Check if there's any data in the date range
             debug_query = """
             SELECT COUNT(*) as total_count, 
@@ -502,36 +523,26 @@ async def _get_aggregated_actions_data(
             FROM issues 
             WHERE DATE(first_date_recommended) BETWEEN %s AND %s
             """
-            debug_result = pd.read_sql(debug_query, conn, params=tuple(params[:2]))
-            logger.info(f"Debug - Data in date range: {debug_result.to_dict('records')}")
-            
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"Actions data found: {len(data)} rows")
-                logger.info(f"Data columns: {list(data.columns)}")
-                
-                # Convert DataFrame to JSON-safe format
-                try:
-                    # Convert DataFrame to records and handle datetime formatting
-                    records = data.to_dict('records')
-                    
-                    # Format datetime columns
-                    for record in records:
-                        if 'action_period' in record and record['action_period'] is not None:
-                            if hasattr(record['action_period'], 'strftime'):
-                                record['action_period'] = record['action_period'].strftime('%Y-%m-%d')
-                            else:
-                                record['action_period'] = str(record['action_period'])
-                    
-                    return records
-                    
-                except Exception as conversion_error:
-                    logger.error(f"Error converting data to JSON format: {conversion_error}")
-                    # Fallback: return empty result
-                    return {}
-            else:
-                logger.warning("No aggregated actions data found - this might indicate a query issue")
+            debug_result = await fetch_dicts_async(debug_query, params=tuple(params[:2]))
+            logger.debug("Debug - Data in date range: %s", debug_result)
+
+        columns, rows = await fetch_all_async(final_query, params=tuple(params))
+        if rows:
+            logger.debug("Actions data found: %s rows", len(rows))
+            logger.debug("Data columns: %s", columns)
+
+            # Convert rows to JSON-safe format
+            try:
+                # Convert rows to records with formatted periods
+                return rows_to_records(columns, rows, date_columns=["action_period"])
+
+            except Exception as conversion_error:
+                logger.error(f"Error converting data to JSON format: {conversion_error}")
+                # Fallback: return empty result
                 return {}
+        else:
+            logger.warning("No aggregated actions data found - this might indicate a query issue")
+            return {}
     except Exception as e:
         logger.error(f"Error getting actions data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -644,22 +655,17 @@ async def _get_actions_list(
     
     # 6. Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing actions list query with params: {params}")
-            logger.info(f"Final query: {final_query}")
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"List data: {len(data)} rows")
-                logger.info(f"Data columns: {list(data.columns)}")
-                logger.info(f"Sample data: {data.head(2).to_dict('records')}")
-                
-                # Convert the data to records and parse JSON fields
-                records = data.to_dict('records')
-                
-                return records
-            else:
-                logger.info("No actions data found")
-                return []
+        logger.debug("Executing actions list query with params: %s", params)
+        logger.debug("Final query: %s", final_query)
+        records = await fetch_dicts_async(final_query, params=tuple(params))
+        if records:
+            logger.debug("List data: %s rows", len(records))
+            logger.debug("Sample data: %s", records[:2])
+
+            return records
+        else:
+            logger.debug("No actions data found")
+            return []
     except Exception as e:
         logger.error(f"Error getting actions data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -673,7 +679,7 @@ async def _get_minimum_date(app_id: str):
     query = f"""
     SELECT MIN(first_date_recommended) FROM issues WHERE app_id = %s
     """
-    return pd.read_sql(query, get_postgres_connection(), params=(app_id,))
+    return await fetch_value_async(query, params=(app_id,))
 
 async def _get_actions_list_count(
     start_date: datetime,
@@ -727,15 +733,14 @@ async def _get_actions_list_count(
     
     # Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                count = int(data['count'].iloc[0])
-                logger.info(f"Filtered action count: {count}")
-                return count
-            else:
-                logger.info("No actions found with filters, count is 0")
-                return 0
+        count = await fetch_value_async(final_query, params=tuple(params))
+        if count is not None:
+            count = int(count)
+            logger.debug("Filtered action count: %s", count)
+            return count
+        else:
+            logger.debug("No actions found with filters, count is 0")
+            return 0
     except Exception as e:
         logger.error(f"Error getting filtered action count: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timedelta
 import logging
 from typing import Optional, List
@@ -6,8 +7,9 @@ from enum import Enum
 from dateutil.relativedelta import relativedelta
 import ast
 
-from app.shared_services.db import get_postgres_connection
-import pandas as pd
+from app.shared_services.analytics_cache import cached_analytics_response
+from app.shared_services.async_db import fetch_all_async, fetch_dicts_async, fetch_value_async
+from app.shared_services.serialization import rows_to_columns
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +30,13 @@ class Granularity(str, Enum):
 
 router = APIRouter(
     prefix="/issues",
-    tags=["issues"]
+    tags=["issues"],
+    default_response_class=ORJSONResponse
 )
 
 @router.get("/issues_analytics", status_code=status.HTTP_200_OK)
 async def get_issues_analytics(
+    request: Request,
     app_id: str = Query(..., description="App ID"),
     time_range: TimeRange = Query(default=TimeRange.THIS_YEAR),
     severity: Optional[str] = Query(default=None),
@@ -49,38 +53,19 @@ async def get_issues_analytics(
     - All time: Dynamic (yearly if >1 year of data, monthly otherwise)
     
     Granularity is automatically determined and cannot be overridden.
+
+    Responses are cached until new analysis data is saved, and carry an ETag
+    (see app/shared_services/analytics_cache.py).
     """
     try:
-        # Auto-determine granularity based on time range
-        granularity = _get_granularity_for_range(time_range)
-        
-        # Calculate date range
-        start_date, end_date = _calculate_date_range(time_range)
-        
-        # Get aggregated data based on granularity
-        if granularity == Granularity.DAILY:
-            data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.WEEKLY:
-            data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.MONTHLY:
-            data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.YEARLY:
-            data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
-        else:
-            data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
-            
-
-        return {
-            "status": "success",
-            "time_range": time_range,
-            "granularity": granularity,
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "data": data
-        }
-        
+        return await cached_analytics_response(
+            request,
+            "issues_analytics",
+            app_id,
+            {"time_range": time_range, "severity": severity, "category": category},
+            lambda: _build_issues_analytics(time_range, severity, category),
+            app_scoped=False,  # the aggregates span all apps
+        )
     except Exception as e:
         logger.error(f"Error getting issues analytics: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -88,6 +73,43 @@ async def get_issues_analytics(
             detail=f"Error getting issues analytics: {str(e)}"
         )
 
+
+async def _build_issues_analytics(
+    time_range: TimeRange,
+    severity: Optional[str],
+    category: Optional[str]
+) -> dict:
+    """Build the issues_analytics response payload"""
+    # Auto-determine granularity based on time range
+    granularity = await _get_granularity_for_range(time_range)
+    
+    # Calculate date range
+    start_date, end_date = _calculate_date_range(time_range)
+    
+    # Get aggregated data based on granularity
+    if granularity == Granularity.DAILY:
+        data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.WEEKLY:
+        data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.MONTHLY:
+        data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.YEARLY:
+        data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
+    else:
+        data = await _get_aggregated_issues_data(start_date, end_date, granularity, severity, category)
+        
+
+    return {
+        "status": "success",
+        "time_range": time_range,
+        "granularity": granularity,
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        },
+        "data": data
+    }
+
 @router.get("/list", status_code=status.HTTP_200_OK)
 async def list_issues(
     app_id: str = Query(..., description="App ID"),
@@ -147,7 +169,7 @@ async def list_issues(
             detail=f"Error listing issues: {str(e)}"
         )
 # Helper functions
-def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
+async def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
     """Auto-determine granularity based on time range"""
     if time_range in [TimeRange.LAST_7_DAYS]:
         return Granularity.DAILY
@@ -159,7 +181,7 @@ def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
         return Granularity.MONTHLY
     elif time_range == TimeRange.ALL_TIME:
         # For all time, dynamically determine based on data span
-        return _get_alltime_granularity()
+        return await _get_alltime_granularity()
     else:
         return Granularity.MONTHLY
 
@@ -211,7 +233,7 @@ def _calculate_date_range(time_range: TimeRange) -> tuple[datetime, datetime]:
     
     return start_date, end_date
 
-def _get_alltime_granularity() -> Granularity:
+async def _get_alltime_granularity() -> Granularity:
     """
     Dynamically determine granularity for all-time data based on data span.
     If the app has been collecting data for more than 1 year, use yearly aggregation.
@@ -220,24 +242,22 @@ def _get_alltime_granularity() -> Granularity:
     try:
         # Get the minimum date from the database synchronously
         query = """
-        SELECT MIN(REVIEW_CREATED_AT) FROM vw_flattened_issues
+        SELECT MIN(REVIEW_CREATED_AT) FROM vw_review_issue_facts
         """
-        with get_postgres_connection() as conn:
-            result = pd.read_sql(query, conn)
-            if not result.empty and result.iloc[0, 0] is not None:
-                min_date = result.iloc[0, 0]
-                current_date = datetime.now()
-                
-                # Calculate the difference in years
-                years_diff = (current_date - min_date).days / 365.25
-                
-                if years_diff > 1:
-                    return Granularity.YEARLY
-                else:
-                    return Granularity.MONTHLY
+        min_date = await fetch_value_async(query)
+        if min_date is not None:
+            current_date = datetime.now()
+
+            # Calculate the difference in years
+            years_diff = (current_date - min_date).days / 365.25
+
+            if years_diff > 1:
+                return Granularity.YEARLY
             else:
-                # If no data found, default to monthly
                 return Granularity.MONTHLY
+        else:
+            # If no data found, default to monthly
+            return Granularity.MONTHLY
     except Exception as e:
         logger.warning(f"Error determining all-time granularity: {str(e)}. Defaulting to monthly.")
         return Granularity.MONTHLY
@@ -290,9 +310,9 @@ async def _get_aggregated_issues_data(
                 ORDER BY COUNT(*) DESC, "issue_type"
             ) AS rn
         FROM
-            vw_flattened_issues
+            vw_review_issue_facts
         WHERE
-            DATE(REVIEW_CREATED_AT) BETWEEN %s AND %s
+            REVIEW_CREATED_AT >= %s::date AND REVIEW_CREATED_AT < %s::date + 1
             -- Dynamic filters will be added here
         GROUP BY
             "desc", "issue_type", "severity", "category", "snippet", "key_words", DATE_TRUNC('{trunc_level}', REVIEW_CREATED_AT)
@@ -332,56 +352,24 @@ async def _get_aggregated_issues_data(
     )
 
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing aggregation query with params: {params}")
-            logger.info(f"Final query: {final_query}")
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"Issues data found: {len(data)} rows")
-                logger.info(f"Data columns: {list(data.columns)}")
-                
-                # Convert DataFrame to JSON-safe dictionary format
-                try:
-                    # Convert DataFrame to the format expected by frontend charts
-                    # Ensure all data types are JSON-serializable
-                    result = {}
-                    for col in data.columns:
-                        column_data = {}
-                        for i in range(len(data)):
-                            value = data[col].iloc[i]
-                            
-                            # Convert pandas/numpy types to native Python types
-                            if pd.isna(value):
-                                column_data[str(i)] = None
-                            elif col == 'issue_period':
-                                # Handle datetime/timestamp columns
-                                if hasattr(value, 'strftime'):
-                                    column_data[str(i)] = value.strftime('%Y-%m-%d')
-                                else:
-                                    column_data[str(i)] = str(value)
-                            else:
-                                # Handle numeric columns - convert numpy types to Python types
-                                try:
-                                    if isinstance(value, (int, float)):
-                                        column_data[str(i)] = float(value)
-                                    elif hasattr(value, 'item'):  # numpy types have .item() method
-                                        column_data[str(i)] = value.item()
-                                    else:
-                                        column_data[str(i)] = str(value)
-                                except (ValueError, TypeError):
-                                    column_data[str(i)] = str(value)
-                        
-                        result[col] = column_data
-                    
-                    return result
-                    
-                except Exception as conversion_error:
-                    logger.error(f"Error converting data to JSON format: {conversion_error}")
-                    # Fallback: return empty result
-                    return {}
-            else:
-                logger.warning("No aggregated issues data found - this might indicate a query issue")
+        logger.debug("Executing aggregation query with params: %s", params)
+        logger.debug("Final query: %s", final_query)
+        columns, rows = await fetch_all_async(final_query, params=tuple(params))
+        if rows:
+            logger.debug("Issues data found: %s rows", len(rows))
+            logger.debug("Data columns: %s", columns)
+
+            # Convert rows to the column-oriented, JSON-safe format expected by frontend charts
+            try:
+                return rows_to_columns(columns, rows, date_columns=["issue_period"])
+
+            except Exception as conversion_error:
+                logger.error(f"Error converting data to JSON format: {conversion_error}")
+                # Fallback: return empty result
                 return {}
+        else:
+            logger.warning("No aggregated issues data found - this might indicate a query issue")
+            return {}
     except Exception as e:
         logger.error(f"Error getting issues data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -444,9 +432,9 @@ async def _get_issues_list(
                 ORDER BY REVIEW_CREATED_AT DESC
             ) AS rn
         FROM
-            vw_flattened_issues
+            vw_review_issue_facts
         WHERE
-            DATE(REVIEW_CREATED_AT) BETWEEN %s AND %s
+            REVIEW_CREATED_AT >= %s::date AND REVIEW_CREATED_AT < %s::date + 1
             -- Dynamic filters will be added here
         GROUP BY
             "desc", "issue_type", "severity", "category", "snippet", "key_words", REVIEW_CREATED_AT
@@ -501,34 +489,30 @@ async def _get_issues_list(
     
     # 6. Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"List data: {len(data)}")
-                
-                # Convert the data to records and parse JSON fields
-                records = data.to_dict('records')
-                
-                # Simple string replacement to remove inner brackets
-                for record in records:
-                    if 'snippets' in record and record['snippets']:
-                        # Convert to string, replace all inner brackets, then parse back
-                        snippets_str = str(record['snippets'])
-                        # Remove all inner brackets by replacing multiple patterns
-                        snippets_str = snippets_str.replace('[[', '[').replace(']]', ']').replace('], [', ', ').replace('], [', ', ')
-                        record['snippets'] = ast.literal_eval(snippets_str)
-                    
-                    if 'keywords' in record and record['keywords']:
-                        # Convert to string, replace all inner brackets, then parse back
-                        keywords_str = str(record['keywords'])
-                        # Remove all inner brackets by replacing multiple patterns
-                        keywords_str = keywords_str.replace('[[', '[').replace(']]', ']').replace('], [', ', ').replace('], [', ', ')
-                        record['keywords'] = ast.literal_eval(keywords_str)
-                
-                return records
-            else:
-                logger.info("No list data found")
-                return []
+        records = await fetch_dicts_async(final_query, params=tuple(params))
+        if records:
+            logger.debug("List data: %s", len(records))
+
+            # Simple string replacement to remove inner brackets
+            for record in records:
+                if 'snippets' in record and record['snippets']:
+                    # Convert to string, replace all inner brackets, then parse back
+                    snippets_str = str(record['snippets'])
+                    # Remove all inner brackets by replacing multiple patterns
+                    snippets_str = snippets_str.replace('[[', '[').replace(']]', ']').replace('], [', ', ').replace('], [', ', ')
+                    record['snippets'] = ast.literal_eval(snippets_str)
+
+                if 'keywords' in record and record['keywords']:
+                    # Convert to string, replace all inner brackets, then parse back
+                    keywords_str = str(record['keywords'])
+                    # Remove all inner brackets by replacing multiple patterns
+                    keywords_str = keywords_str.replace('[[', '[').replace(']]', ']').replace('], [', ', ').replace('], [', ', ')
+                    record['keywords'] = ast.literal_eval(keywords_str)
+
+            return records
+        else:
+            logger.debug("No list data found")
+            return []
     except Exception as e:
         logger.error(f"Error getting list data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -540,9 +524,9 @@ async def _get_issues_list(
 async def _get_minimum_date(app_id: str):
     """Get minimum date for a given app_id"""
     query = f"""
-    SELECT MIN(REVIEW_CREATED_AT) FROM vw_flattened_issues WHERE app_id = %s
+    SELECT MIN(REVIEW_CREATED_AT) FROM vw_review_issue_facts WHERE app_id = %s
     """
-    return pd.read_sql(query, get_postgres_connection(), params=(app_id,))
+    return await fetch_value_async(query, params=(app_id,))
 
 async def _get_issues_list_count(
     start_date: datetime,
@@ -573,9 +557,9 @@ async def _get_issues_list_count(
                     ORDER BY REVIEW_CREATED_AT DESC
                 ) AS rn
             FROM
-                vw_flattened_issues
+                vw_review_issue_facts
             WHERE
-                DATE(REVIEW_CREATED_AT) BETWEEN %s AND %s
+                REVIEW_CREATED_AT >= %s::date AND REVIEW_CREATED_AT < %s::date + 1
                 -- Dynamic filters will be added here
             GROUP BY
                 "desc", "issue_type", "severity", "category", "snippet", "key_words", REVIEW_CREATED_AT
@@ -613,15 +597,14 @@ async def _get_issues_list_count(
     
     # Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                count = int(data['count'].iloc[0])
-                logger.info(f"Filtered issue count: {count}")
-                return count
-            else:
-                logger.info("No issues found with filters, count is 0")
-                return 0
+        count = await fetch_value_async(final_query, params=tuple(params))
+        if count is not None:
+            count = int(count)
+            logger.debug("Filtered issue count: %s", count)
+            return count
+        else:
+            logger.debug("No issues found with filters, count is 0")
+            return 0
     except Exception as e:
         logger.error(f"Error getting filtered issue count: {str(e)}", exc_info=True)
         raise HTTPException(
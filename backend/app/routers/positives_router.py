@@ -1,6 +1,7 @@
 # positives router
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timedelta
 import logging
 from typing import Optional, List
@@ -9,8 +10,9 @@ from dateutil.relativedelta import relativedelta
 import ast
 
 
-from app.shared_services.db import get_postgres_connection
-import pandas as pd
+from app.shared_services.analytics_cache import cached_analytics_response
+from app.shared_services.async_db import fetch_all_async, fetch_value_async
+from app.shared_services.serialization import rows_to_columns, rows_to_records
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +33,13 @@ class Granularity(str, Enum):
 
 router = APIRouter(
     prefix="/positives",
-    tags=["positives"]
+    tags=["positives"],
+    default_response_class=ORJSONResponse
 )
 
 @router.get("/positives_analytics", status_code=status.HTTP_200_OK)
 async def get_positives_analytics(
+    request: Request,
     app_id: str = Query(..., description="App ID"),
     time_range: TimeRange = Query(default=TimeRange.LAST_6_MONTHS),
     severity: Optional[str] = Query(default=None),
@@ -52,38 +56,19 @@ async def get_positives_analytics(
     - All time: Dynamic (yearly if >1 year of data, monthly otherwise)
     
     Granularity is automatically determined and cannot be overridden.
+
+    Responses are cached until new analysis data is saved, and carry an ETag
+    (see app/shared_services/analytics_cache.py).
     """
     try:
-        # Auto-determine granularity based on time range
-        granularity = _get_granularity_for_range(time_range)
-        
-        # Calculate date range
-        start_date, end_date = _calculate_date_range(time_range)
-        
-        # Get aggregated data based on granularity
-        if granularity == Granularity.DAILY:
-            data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.WEEKLY:
-            data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.MONTHLY:
-            data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
-        elif granularity == Granularity.YEARLY:
-            data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
-        else:
-            data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
-            
-
-        return {
-            "status": "success",
-            "time_range": time_range,
-            "granularity": granularity,
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "data": data
-        }
-        
+        return await cached_analytics_response(
+            request,
+            "positives_analytics",
+            app_id,
+            {"time_range": time_range, "severity": severity, "category": category},
+            lambda: _build_positives_analytics(time_range, severity, category),
+            app_scoped=False,  # the aggregates span all apps
+        )
     except Exception as e:
         logger.error(f"Error getting positives analytics: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -91,6 +76,43 @@ async def get_positives_analytics(
             detail=f"Error getting positives analytics: {str(e)}"
         )
 
+
+async def _build_positives_analytics(
+    time_range: TimeRange,
+    severity: Optional[str],
+    category: Optional[str]
+) -> dict:
+    """Build the positives_analytics response payload"""
+    # Auto-determine granularity based on time range
+    granularity = await _get_granularity_for_range(time_range)
+    
+    # Calculate date range
+    start_date, end_date = _calculate_date_range(time_range)
+    
+    # Get aggregated data based on granularity
+    if granularity == Granularity.DAILY:
+        data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.WEEKLY:
+        data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.MONTHLY:
+        data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
+    elif granularity == Granularity.YEARLY:
+        data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
+    else:
+        data = await _get_aggregated_positives_data(start_date, end_date, granularity, severity, category)
+        
+
+    return {
+        "status": "success",
+        "time_range": time_range,
+        "granularity": granularity,
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        },
+        "data": data
+    }
+
 @router.get("/list", status_code=status.HTTP_200_OK)
 async def list_positives(
     app_id: str = Query(..., description="App ID"),
@@ -149,7 +171,7 @@ async def list_positives(
             detail=f"Error listing positives: {str(e)}"
         )
 # Helper functions
-def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
+async def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
     """Auto-determine granularity based on time range"""
     if time_range in [TimeRange.LAST_7_DAYS]:
         return Granularity.DAILY
@@ -161,7 +183,7 @@ def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
         return Granularity.MONTHLY
     elif time_range == TimeRange.ALL_TIME:
         # For all time, dynamically determine based on data span
-        return _get_alltime_granularity()
+        return await _get_alltime_granularity()
     else:
         return Granularity.MONTHLY
 
@@ -213,7 +235,7 @@ def _calculate_date_range(time_range: TimeRange) -> tuple[datetime, datetime]:
     
     return start_date, end_date
 
-def _get_alltime_granularity() -> Granularity:
+async def _get_alltime_granularity() -> Granularity:
     """
     Dynamically determine granularity for all-time data based on data span.
     If the app has been collecting data for more than 1 year, use yearly aggregation.
@@ -222,24 +244,22 @@ def _get_alltime_granularity() -> Granularity:
     try:
         # Get the minimum date from the database synchronously
         query = """
-        SELECT MIN(REVIEW_CREATED_AT) FROM vw_flattened_issues
+        SELECT MIN(REVIEW_CREATED_AT) FROM vw_review_issue_facts
         """
-        with get_postgres_connection() as conn:
-            result = pd.read_sql(query, conn)
-            if not result.empty and result.iloc[0, 0] is not None:
-                min_date = result.iloc[0, 0]
-                current_date = datetime.now()
-                
-                # Calculate the difference in years
-                years_diff = (current_date - min_date).days / 365.25
-                
-                if years_diff > 1:
-                    return Granularity.YEARLY
-                else:
-                    return Granularity.MONTHLY
+        min_date = await fetch_value_async(query)
+        if min_date is not None:
+            current_date = datetime.now()
+
+            # Calculate the difference in years
+            years_diff = (current_date - min_date).days / 365.25
+
+            if years_diff > 1:
+                return Granularity.YEARLY
             else:
-                # If no data found, default to monthly
                 return Granularity.MONTHLY
+        else:
+            # If no data found, default to monthly
+            return Granularity.MONTHLY
     except Exception as e:
         logger.warning(f"Error determining all-time granularity: {str(e)}. Defaulting to monthly.")
         return Granularity.MONTHLY
@@ -285,13 +305,12 @@ async def _get_aggregated_positives_data(
         SELECT
             pr.review_id,
             pr.review_created_at,
-            positive_mentions->>'description' AS description,
-            positive_mentions->>'impact_score' AS impact_score
+            pr.description,
+            pr.impact_score
         FROM
-            processed_app_reviews pr,
-            jsonb_array_elements(pr.latest_analysis->'positive_feedback'->'positive_mentions') AS positive_mentions
+            review_positives pr
         WHERE
-            DATE(pr.review_created_at) BETWEEN %s AND %s
+            pr.review_created_at >= %s::date AND pr.review_created_at < %s::date + 1
             -- Dynamic filters will be added here
     ),
     CANONICAL_STATEMENTS AS (
@@ -344,56 +363,24 @@ async def _get_aggregated_positives_data(
     )
 
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing aggregation query with params: {params}")
-            logger.info(f"Final query: {final_query}")
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"Positives data found: {len(data)} rows")
-                logger.info(f"Data columns: {list(data.columns)}")
-                
-                # Convert DataFrame to JSON-safe dictionary format
-                try:
-                    # Convert DataFrame to the format expected by frontend charts
-                    # Ensure all data types are JSON-serializable
-                    result = {}
-                    for col in data.columns:
-                        column_data = {}
-                        for i in range(len(data)):
-                            value = data[col].iloc[i]
-                            
-                            # Convert pandas/numpy types to native Python types
-                            if pd.isna(value):
-                                column_data[str(i)] = None
-                            elif col == 'period':
-                                # Handle datetime/timestamp columns
-                                if hasattr(value, 'strftime'):
-                                    column_data[str(i)] = value.strftime('%Y-%m-%d')
-                                else:
-                                    column_data[str(i)] = str(value)
-                            else:
-                                # Handle numeric columns - convert numpy types to Python types
-                                try:
-                                    if isinstance(value, (int, float)):
-                                        column_data[str(i)] = float(value)
-                                    elif hasattr(value, 'item'):  # numpy types have .item() method
-                                        column_data[str(i)] = value.item()
-                                    else:
-                                        column_data[str(i)] = str(value)
-                                except (ValueError, TypeError):
-                                    column_data[str(i)] = str(value)
-                        
-                        result[col] = column_data
-                    
-                    return result
-                    
-                except Exception as conversion_error:
-                    logger.error(f"Error converting data to JSON format: {conversion_error}")
-                    # Fallback: return empty result
-                    return {}
-            else:
-                logger.warning("No aggregated positives data found - this might indicate a query issue")
+        logger.debug("Executing aggregation query with params: %s", params)
+        logger.debug("Final query: %s", final_query)
+        columns, rows = await fetch_all_async(final_query, params=tuple(params))
+        if rows:
+            logger.debug("Positives data found: %s rows", len(rows))
+            logger.debug("Data columns: %s", columns)
+
+            # Convert rows to the column-oriented, JSON-safe format expected by frontend charts
+            try:
+                return rows_to_columns(columns, rows, date_columns=["period"])
+
+            except Exception as conversion_error:
+                logger.error(f"Error converting data to JSON format: {conversion_error}")
+                # Fallback: return empty result
                 return {}
+        else:
+            logger.warning("No aggregated positives data found - this might indicate a query issue")
+            return {}
     except Exception as e:
         logger.error(f"Error getting positives data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -438,18 +425,17 @@ async def _get_positives_list(
         SELECT
             pr.review_id,
             pr.review_created_at,
-            positive_mentions->>'description' AS description,
-            positive_mentions->>'impact_score' AS impact_score,
-            positive_mentions->>'quote' AS quote,
-            positive_mentions->>'metrics' AS metrics,
-            positive_mentions->>'keywords' AS keywords,
-            positive_mentions->>'impact_area' AS impact_area,
-            positive_mentions->>'user_segments' AS user_segments
+            pr.description,
+            pr.impact_score,
+            pr.quote,
+            pr.metrics::text AS metrics,
+            pr.keywords::text AS keywords,
+            pr.impact_area,
+            pr.user_segments::text AS user_segments
         FROM
-            processed_app_reviews pr,
-            jsonb_array_elements(pr.latest_analysis->'positive_feedback'->'positive_mentions') AS positive_mentions
+            review_positives pr
         WHERE
-            DATE(pr.review_created_at) BETWEEN %s AND %s
+            pr.review_created_at >= %s::date AND pr.review_created_at < %s::date + 1
             -- Dynamic filters will be added here
     ),
     CANONICAL_STATEMENTSS AS (
@@ -556,51 +542,41 @@ async def _get_positives_list(
     
     # 6. Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing positives list query with params: {params}")
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"Positives list data: {len(data)} rows")
-                
-                # Convert the data to records
-                records = data.to_dict('records')
-                
-                # Clean up data types and handle potential JSON parsing
-                for record in records:
-                    # Convert numpy types to Python types
-                    for key, value in record.items():
-                        if pd.isna(value):
-                            record[key] = None
-                        elif hasattr(value, 'item'):  # numpy types
-                            record[key] = value.item()
-                        elif isinstance(value, (int, float)):
-                            record[key] = float(value) if isinstance(value, float) else int(value)
-                    
-                    # Process comma-separated strings for quotes and keywords
-                    if 'quote' in record and record['quote']:
-                        # Convert comma-separated string to array
-                        quotes_str = str(record['quote'])
-                        if quotes_str and quotes_str != 'None':
-                            # Split by comma and clean up
-                            quotes_list = [q.strip() for q in quotes_str.split(',') if q.strip()]
-                            record['quote'] = quotes_list
-                        else:
-                            record['quote'] = []
-                    
-                    if 'keywords' in record and record['keywords']:
-                        # Convert comma-separated string to array
-                        keywords_str = str(record['keywords'])
-                        if keywords_str and keywords_str != 'None':
-                            # Split by comma and clean up
-                            keywords_list = [k.strip() for k in keywords_str.split(',') if k.strip()]
-                            record['keywords'] = keywords_list
-                        else:
-                            record['keywords'] = []
-                
-                return records
-            else:
-                logger.info("No positives list data found")
-                return []
+        logger.debug("Executing positives list query with params: %s", params)
+        columns, rows = await fetch_all_async(final_query, params=tuple(params))
+        if rows:
+            logger.debug("Positives list data: %s rows", len(rows))
+
+            # Convert the rows to records with native Python types
+            records = rows_to_records(columns, rows)
+
+            # Handle potential JSON parsing
+            for record in records:
+                # Process comma-separated strings for quotes and keywords
+                if 'quote' in record and record['quote']:
+                    # Convert comma-separated string to array
+                    quotes_str = str(record['quote'])
+                    if quotes_str and quotes_str != 'None':
+                        # Split by comma and clean up
+                        quotes_list = [q.strip() for q in quotes_str.split(',') if q.strip()]
+                        record['quote'] = quotes_list
+                    else:
+                        record['quote'] = []
+
+                if 'keywords' in record and record['keywords']:
+                    # Convert comma-separated string to array
+                    keywords_str = str(record['keywords'])
+                    if keywords_str and keywords_str != 'None':
+                        # Split by comma and clean up
+                        keywords_list = [k.strip() for k in keywords_str.split(',') if k.strip()]
+                        record['keywords'] = keywords_list
+                    else:
+                        record['keywords'] = []
+
+            return records
+        else:
+            logger.debug("No positives list data found")
+            return []
     except Exception as e:
         logger.error(f"Error getting positives list data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -612,9 +588,9 @@ async def _get_positives_list(
 async def _get_minimum_date(app_id: str):
     """Get minimum date for a given app_id"""
     query = f"""
-    SELECT MIN(REVIEW_CREATED_AT) FROM vw_flattened_issues WHERE app_id = %s
+    SELECT MIN(REVIEW_CREATED_AT) FROM vw_review_issue_facts WHERE app_id = %s
     """
-    return pd.read_sql(query, get_postgres_connection(), params=(app_id,))
+    return await fetch_value_async(query, params=(app_id,))
 
 async def _get_positives_list_count(
     start_date: datetime,
@@ -635,18 +611,17 @@ async def _get_positives_list_count(
             SELECT
                 pr.review_id,
                 pr.review_created_at,
-                positive_mentions->>'description' AS description,
-                positive_mentions->>'impact_score' AS impact_score,
-                positive_mentions->>'quote' AS quote,
-                positive_mentions->>'metrics' AS metrics,
-                positive_mentions->>'keywords' AS keywords,
-                positive_mentions->>'impact_area' AS impact_area,
-                positive_mentions->>'user_segments' AS user_segments
+                pr.description,
+                pr.impact_score,
+                pr.quote,
+                pr.metrics::text AS metrics,
+                pr.keywords::text AS keywords,
+                pr.impact_area,
+                pr.user_segments::text AS user_segments
             FROM
-                processed_app_reviews pr,
-                jsonb_array_elements(pr.latest_analysis->'positive_feedback'->'positive_mentions') AS positive_mentions
+                review_positives pr
             WHERE
-                DATE(pr.review_created_at) BETWEEN %s AND %s
+                pr.review_created_at >= %s::date AND pr.review_created_at < %s::date + 1
                 -- Dynamic filters will be added here
         ),
         CANONICAL_STATEMENTSS AS (
@@ -703,15 +678,14 @@ async def _get_positives_list_count(
     
     # Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                count = int(data['count'].iloc[0])
-                logger.info(f"Filtered positives count: {count}")
-                return count
-            else:
-                logger.info("No positives found with filters, count is 0")
-                return 0
+        count = await fetch_value_async(final_query, params=tuple(params))
+        if count is not None:
+            count = int(count)
+            logger.debug("Filtered positives count: %s", count)
+            return count
+        else:
+            logger.debug("No positives found with filters, count is 0")
+            return 0
     except Exception as e:
         logger.error(f"Error getting filtered positives count: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query, status
-from app.google_reviews.get_reviews import get_reviews
+from fastapi.concurrency import run_in_threadpool
+from app.google_reviews.get_reviews import get_reviews, get_next_cursor
 from app.google_reviews.app_details_scraper import AppDetailsScraper
-from app.google_reviews.app_search import search_app_id
+from app.google_reviews.app_search import search_apps
 from app.models.pydantic_models import ReviewFilter, Review
 from datetime import datetime
 import logging
@@ -24,7 +25,8 @@ async def list_reviews(
     order_by: str = Query(default="review_created_at", pattern="^(review_created_at)$"),
     order_direction: str = Query(default="desc", pattern="^(asc|desc)$"),
     from_date: datetime = None,
-    to_date: datetime = None
+    to_date: datetime = None,
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page; replaces offset")
 ):
     """List Reviews with minimal data for table view"""
     try:
@@ -39,7 +41,10 @@ async def list_reviews(
             from_date=from_date,
             to_date=to_date
         )
-        reviews = await get_reviews(filters)
+        try:
+            reviews = await get_reviews(filters, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         # Return only essential fields for table view
         review_responses = [
             {
@@ -52,11 +57,29 @@ async def list_reviews(
             }
             for review in reviews
         ]
-        return {"status": "success", "data": review_responses}
+        return {"status": "success", "data": review_responses, "next_cursor": get_next_cursor(reviews, limit)}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing reviews: {str(e)}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error listing reviews: {str(e)}")
 
+@router.get("/search_apps", status_code=status.HTTP_200_OK)
+async def search_apps_endpoint(
+    query: str = Query(..., min_length=1, max_length=100),
+    country: str = "ke",
+    lang: str = "en",
+    limit: int = Query(default=5, ge=1, le=20),
+    live_fallback: bool = True
+):
+    """Autocomplete apps from the local search index, falling back to a cached live Play Store search"""
+    try:
+        result = await run_in_threadpool(search_apps, query, country, lang, limit, live_fallback)
+        return {"status": "success", "source": result["source"], "data": result["results"]}
+    except Exception as e:
+        logger.error(f"Error searching apps: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error searching apps: {str(e)}")
+
 @router.get("/{review_id}/details", status_code=status.HTTP_200_OK)
 async def get_review_details(review_id: str):
     """Get detailed information for a specific review"""
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timedelta
 import logging
 from typing import Optional, List
@@ -6,8 +7,11 @@ from enum import Enum
 from dateutil.relativedelta import relativedelta
 import ast
 
-from app.shared_services.db import get_postgres_connection
-import pandas as pd
+from app.shared_services.analytics_cache import cached_analytics_response
+from app.shared_services.async_db import fetch_all_async, fetch_dicts_async, fetch_value_async
+from app.shared_services.export_stream import ExportFormat, export_filename, stream_export
+from app.shared_services.serialization import rows_to_records
+from app.shared_services.word_frequency import get_term_frequencies
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +32,13 @@ class Granularity(str, Enum):
 
 router = APIRouter(
     prefix="/sentiments",
-    tags=["sentiments"]
+    tags=["sentiments"],
+    default_response_class=ORJSONResponse
 )
 
 @router.get("/sentiments_analytics", status_code=status.HTTP_200_OK)
 async def get_sentiments_analytics(
+    request: Request,
     app_id: str = Query(..., description="App ID"),
     time_range: TimeRange = Query(default=TimeRange.THIS_YEAR),
     sentiment: Optional[str] = Query(default=None, description="Filter by sentiment: positive, negative, neutral"),
@@ -49,45 +55,63 @@ async def get_sentiments_analytics(
     - All time: Dynamic (yearly if >1 year of data, monthly otherwise)
     
     Granularity is automatically determined and cannot be overridden.
+
+    Responses are cached until new analysis data is saved, and carry an ETag
+    (see app/shared_services/analytics_cache.py).
     """
     try:
-        # Auto-determine granularity based on time range
-        granularity = _get_granularity_for_range(time_range)
-        
-        # Calculate date range
-        start_date, end_date = _calculate_date_range(time_range)
-        logger.info(f"Date range for {time_range}: {start_date} to {end_date}")
-        
-        # Get aggregated data based on granularity
-        if granularity == Granularity.DAILY:
-            sentiments_data = await _get_aggregated_sentiments_data(start_date, end_date, granularity, sentiment, rating)
-        elif granularity == Granularity.WEEKLY:
-            sentiments_data = await _get_aggregated_sentiments_data(start_date, end_date, granularity, sentiment, rating)
-        elif granularity == Granularity.MONTHLY:
-            sentiments_data = await _get_aggregated_sentiments_data(start_date, end_date, granularity, sentiment, rating)
-        elif granularity == Granularity.YEARLY:
-            sentiments_data = await _get_aggregated_sentiments_data(start_date, end_date, granularity, sentiment, rating)
-        else:
-            sentiments_data = await _get_aggregated_sentiments_data(start_date, end_date, granularity, sentiment, rating)
-            
-
-        return {
-            "status": "success",
-            "time_range": time_range,
-            "granularity": granularity,
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "data": sentiments_data
-        }
-        
+        return await cached_analytics_response(
+            request,
+            "sentiments_analytics",
+            app_id,
+            {"time_range": time_range, "sentiment": sentiment, "rating": rating},
+            lambda: _build_sentiments_analytics(app_id, time_range, sentiment, rating),
+        )
     except Exception as e:
         logger.error(f"Error getting sentiments analytics: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=f"Error getting sentiments analytics: {str(e)}"
         )
+
+
+async def _build_sentiments_analytics(
+    app_id: str,
+    time_range: TimeRange,
+    sentiment: Optional[str],
+    rating: Optional[str]
+) -> dict:
+    """Build the sentiments_analytics response payload"""
+    # Auto-determine granularity based on time range
+    granularity = await _get_granularity_for_range(time_range)
+    
+    # Calculate date range
+    start_date, end_date = _calculate_date_range(time_range)
+    logger.debug("Date range for %s: %s to %s", time_range, start_date, end_date)
+    
+    # Get aggregated data based on granularity
+    if granularity == Granularity.DAILY:
+        sentiments_data = await _get_aggregated_sentiments_data(app_id, start_date, end_date, granularity, sentiment, rating)
+    elif granularity == Granularity.WEEKLY:
+        sentiments_data = await _get_aggregated_sentiments_data(app_id, start_date, end_date, granularity, sentiment, rating)
+    elif granularity == Granularity.MONTHLY:
+        sentiments_data = await _get_aggregated_sentiments_data(app_id, start_date, end_date, granularity, sentiment, rating)
+    elif granularity == Granularity.YEARLY:
+        sentiments_data = await _get_aggregated_sentiments_data(app_id, start_date, end_date, granularity, sentiment, rating)
+    else:
+        sentiments_data = await _get_aggregated_sentiments_data(app_id, start_date, end_date, granularity, sentiment, rating)
+        
+
+    return {
+        "status": "success",
+        "time_range": time_range,
+        "granularity": granularity,
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        },
+        "data": sentiments_data
+    }
 @router.get("/list_segments", status_code=status.HTTP_200_OK)
 async def list_segments(
     app_id: str = Query(..., description="App ID"),
@@ -138,6 +162,56 @@ async def list_all_segments(
             detail=f"Error getting all segments: {str(e)}"
         )
 
+@router.get("/word_cloud", status_code=status.HTTP_200_OK)
+async def get_word_cloud(
+    request: Request,
+    app_id: str = Query(..., description="App ID"),
+    time_range: TimeRange = Query(default=TimeRange.THIS_YEAR),
+    top_k: int = Query(default=50, ge=1, le=200, description="Terms returned per sentiment label"),
+    phrases: bool = Query(default=True, description="Include two-word phrases")
+):
+    """
+    Most frequent words and phrases of the segments in the time range, per sentiment label.
+
+    Counted server-side from per-day term counts (app/shared_services/word_frequency.py),
+    so the response is a few KB instead of every segment text from /list_all_segments.
+    """
+    try:
+        return await cached_analytics_response(
+            request,
+            "word_cloud",
+            app_id,
+            {"time_range": time_range, "top_k": top_k, "phrases": phrases},
+            lambda: _build_word_cloud(app_id, time_range, top_k, phrases),
+        )
+    except Exception as e:
+        logger.error(f"Error getting word cloud: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting word cloud: {str(e)}"
+        )
+
+
+async def _build_word_cloud(app_id: str, time_range: TimeRange, top_k: int, phrases: bool) -> dict:
+    """Build the word_cloud response payload"""
+    start_date, end_date = _calculate_date_range(time_range)
+    terms, segment_count = await get_term_frequencies(
+        app_id, start_date.date(), end_date.date(), top_k=top_k, phrases=phrases
+    )
+    return {
+        "status": "success",
+        "time_range": time_range,
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        },
+        "segment_count": segment_count,
+        "data": {
+            label: [{"term": term, "count": count} for term, count in label_terms]
+            for label, label_terms in terms.items()
+        }
+    }
+
 @router.get("/list_emotions", status_code=status.HTTP_200_OK)
 async def list_emotions(
     app_id: str = Query(..., description="App ID"),
@@ -224,8 +298,62 @@ async def list_reviews(
             detail=f"Error listing reviews: {str(e)}"
         )
 
+@router.get("/list_all_segments/export", status_code=status.HTTP_200_OK)
+async def export_all_segments(
+    request: Request,
+    app_id: str = Query(..., description="App ID"),
+    time_range: TimeRange = Query(default=TimeRange.THIS_YEAR),
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="ndjson or csv")
+):
+    """Stream every segment in the time range as NDJSON or CSV (gzip if accepted)"""
+    try:
+        start_date, end_date = _calculate_date_range(time_range)
+        params = (app_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        return await stream_export(request, _ALL_SEGMENTS_QUERY, params, format,
+                                   export_filename("segments", app_id, time_range))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting segments: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error exporting segments: {str(e)}"
+        )
+
+@router.get("/list_reviews/export", status_code=status.HTTP_200_OK)
+async def export_reviews(
+    request: Request,
+    app_id: str = Query(..., description="App ID"),
+    time_range: TimeRange = Query(default=TimeRange.THIS_YEAR),
+    order_by: str = Query(default='thumbs_up_count'),
+    sentiment: Optional[str] = Query(default=None, description="Filter by sentiment: positive, negative, neutral"),
+    rating: Optional[str] = Query(default=None, description="Filter by rating: 1, 2, 3, 4, 5"),
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="ndjson or csv")
+):
+    """Stream every matching review in the time range as NDJSON or CSV (gzip if accepted)"""
+    try:
+        start_date, end_date = _calculate_date_range(time_range)
+        query, params = _build_reviews_list_query(
+            app_id=app_id,
+            start_date=start_date,
+            end_date=end_date,
+            order_by=order_by,
+            sentiment=sentiment,
+            rating=rating
+        )
+        return await stream_export(request, query, tuple(params), format,
+                                   export_filename("reviews", app_id, time_range))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting reviews: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error exporting reviews: {str(e)}"
+        )
+
 # Helper functions
-def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
+async def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
     """Auto-determine granularity based on time range"""
     if time_range in [TimeRange.LAST_7_DAYS]:
         return Granularity.DAILY
@@ -235,7 +363,7 @@ def _get_granularity_for_range(time_range: TimeRange) -> Granularity:
         return Granularity.MONTHLY
     elif time_range == TimeRange.ALL_TIME:
         # For all time, dynamically determine based on data span
-        return _get_alltime_granularity()
+        return await _get_alltime_granularity()
     else:
         return Granularity.MONTHLY
 
@@ -285,7 +413,7 @@ def _calculate_date_range(time_range: TimeRange) -> tuple[datetime, datetime]:
     
     return start_date, end_date
 
-def _get_alltime_granularity() -> Granularity:
+async def _get_alltime_granularity() -> Granularity:
     """
     Dynamically determine granularity for all-time data based on data span.
     If the app has been collecting data for more than 1 year, use yearly aggregation.
@@ -296,22 +424,20 @@ def _get_alltime_granularity() -> Granularity:
         query = """
         SELECT MIN(review_created_at) FROM processed_app_reviews
         """
-        with get_postgres_connection() as conn:
-            result = pd.read_sql(query, conn)
-            if not result.empty and result.iloc[0, 0] is not None:
-                min_date = result.iloc[0, 0]
-                current_date = datetime.now()
-                
-                # Calculate the difference in years
-                years_diff = (current_date - min_date).days / 365.25
-                
-                if years_diff > 1:
-                    return Granularity.YEARLY
-                else:
-                    return Granularity.MONTHLY
+        min_date = await fetch_value_async(query)
+        if min_date is not None:
+            current_date = datetime.now()
+
+            # Calculate the difference in years
+            years_diff = (current_date - min_date).days / 365.25
+
+            if years_diff > 1:
+                return Granularity.YEARLY
             else:
-                # If no data found, default to monthly
                 return Granularity.MONTHLY
+        else:
+            # If no data found, default to monthly
+            return Granularity.MONTHLY
     except Exception as e:
         logger.warning(f"Error determining all-time granularity: {str(e)}. Defaulting to monthly.")
         return Granularity.MONTHLY
@@ -328,28 +454,25 @@ async def _get_segments_data(
     try:
         base_query = """    
 SELECT
-    p.review_id,
-    p.review_created_at,
+    t.review_id,
+    t.review_created_at,
     p.username,
     p.user_image,
-    (t ->> 'text') AS text,
-    (t -> 'sentiment' ->> 'label') AS segment_sentiment_label,
-    (t -> 'sentiment' ->> 'score')::numeric AS segment_sentiment_score,
+    t.text,
+    t.sentiment_label AS segment_sentiment_label,
+    t.sentiment_score AS segment_sentiment_score,
     p.review_id
 FROM
-    processed_app_reviews AS p
-CROSS JOIN LATERAL
-    jsonb_array_elements(p.latest_analysis -> 'sentiment' -> 'segments') AS t
+    review_segments AS t
+JOIN
+    processed_app_reviews AS p ON p.app_id = t.app_id AND p.review_id = t.review_id
 WHERE
-    p.latest_analysis IS NOT NULL AND p.app_id = %s AND DATE(p.review_created_at) BETWEEN %s AND %s
+    t.app_id = %s AND t.review_created_at >= %s::date AND t.review_created_at < %s::date + 1
 ORDER BY RANDOM()
 LIMIT 5
 """
         params = [app_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(base_query, conn, params=tuple(params))
-            records = data.to_dict('records')
-            return records
+        return await fetch_dicts_async(base_query, params=tuple(params))
     except Exception as e:
         logger.error(f"Error getting segments data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -357,6 +480,24 @@ LIMIT 5
             detail=f"Error getting segments data: {str(e)}"
         )
 
+# All segments in a date range (word cloud data); params: app_id, start date, end date
+_ALL_SEGMENTS_QUERY = """
+SELECT
+    t.review_id,
+    t.review_created_at,
+    p.username,
+    p.user_image,
+    t.text,
+    t.sentiment_label AS segment_sentiment_label,
+    t.sentiment_score AS segment_sentiment_score
+FROM
+    review_segments AS t
+JOIN
+    processed_app_reviews AS p ON p.app_id = t.app_id AND p.review_id = t.review_id
+WHERE
+    t.app_id = %s AND t.review_created_at >= %s::date AND t.review_created_at < %s::date + 1
+"""
+
 async def _get_all_segments_data(
     app_id: str,
     start_date: datetime,
@@ -366,28 +507,8 @@ async def _get_all_segments_data(
     Get ALL segments data for word cloud analysis (no limit).
     """
     try:
-        base_query = """    
-SELECT
-    p.review_id,
-    p.review_created_at,
-    p.username,
-    p.user_image,
-    (t ->> 'text') AS text,
-    (t -> 'sentiment' ->> 'label') AS segment_sentiment_label,
-    (t -> 'sentiment' ->> 'score')::numeric AS segment_sentiment_score,
-    p.review_id
-FROM
-    processed_app_reviews AS p
-CROSS JOIN LATERAL
-    jsonb_array_elements(p.latest_analysis -> 'sentiment' -> 'segments') AS t
-WHERE
-    p.latest_analysis IS NOT NULL AND p.app_id = %s AND DATE(p.review_created_at) BETWEEN %s AND %s
-"""
         params = [app_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(base_query, conn, params=tuple(params))
-            records = data.to_dict('records')
-            return records
+        return await fetch_dicts_async(_ALL_SEGMENTS_QUERY, params=tuple(params))
     except Exception as e:
         logger.error(f"Error getting all segments data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -406,26 +527,20 @@ async def _get_emotions_data(
     try:
         base_query = """
 SELECT
-    p.review_id,
-    p.review_created_at,
+    e.review_id,
+    e.review_created_at,
     -- Overall Classification for context
-    p.latest_analysis -> 'sentiment' -> 'overall' ->> 'classification' AS overall_sentiment,
-    -- Unnested Emotion Data
-    t.key AS emotion,
-    (t.value)::numeric AS emotion_score
+    e.overall_sentiment,
+    e.emotion,
+    e.emotion_score
 FROM
-    processed_app_reviews AS p
-CROSS JOIN LATERAL
-    jsonb_each_text(p.latest_analysis -> 'sentiment' -> 'emotions' -> 'emotion_scores') AS t(key, value)
+    review_emotions AS e
 WHERE
-    p.latest_analysis IS NOT NULL 
-    AND p.app_id = %s 
-    AND DATE(p.review_created_at) BETWEEN %s AND %s
+    e.app_id = %s 
+    AND e.review_created_at >= %s::date AND e.review_created_at < %s::date + 1
 """
         params = [app_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(base_query, conn, params=tuple(params))
-            return data.to_dict('records')
+        return await fetch_dicts_async(base_query, params=tuple(params))
     except Exception as e:
         logger.error(f"Error getting emotions data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -434,6 +549,7 @@ WHERE
         )
 
 async def _get_aggregated_sentiments_data(
+    app_id: str,
     start_date: datetime,
     end_date: datetime,
     aggregation_level: str,
@@ -442,6 +558,9 @@ async def _get_aggregated_sentiments_data(
 ):
     """
     Get aggregated sentiments data for a given date range and aggregation level.
+    
+    Served from the sentiment_daily_rollup table (app/db/migrations/create_sentiment_daily_rollup.sql):
+    each period sums that app's daily rollup rows instead of scanning review JSONB.
     """
     
     # Map aggregation levels to SQL DATE_TRUNC arguments
@@ -458,158 +577,106 @@ async def _get_aggregated_sentiments_data(
     trunc_level = aggregation_map[aggregation_level]
 
     base_query = f"""
-    WITH review_data AS (
+    WITH rollup_data AS (
         SELECT
-            latest_analysis->'sentiment'->'overall'->>'classification' as sentiment,
-            score as rating,
-            thumbs_up_count as thumbs_up_count,
-            0 as thumbs_down_count ,
-            review_created_at,
-            latest_analysis,
-            DATE_TRUNC('{trunc_level}', review_created_at) AS sentiment_period
+            DATE_TRUNC('{trunc_level}', review_date::timestamp) AS sentiment_period,
+            NULLIF(sentiment, '') AS sentiment,
+            NULLIF(rating, 0) AS rating,
+            review_count,
+            thumbs_up_sum,
+            emotion_counts
         FROM
-            processed_app_reviews
+            sentiment_daily_rollup
         WHERE
-            DATE(review_created_at) BETWEEN %s AND %s
+            app_id = %s
+            AND review_date BETWEEN %s AND %s
             -- Dynamic filters will be added here
     ),
-    sentiment_counts AS (
+    periods AS (
         SELECT
             sentiment_period,
-            sentiment,
-            count(*) AS sentiment_count
+            sum(review_count)::bigint AS total_reviews,
+            sum(thumbs_up_sum)::bigint AS total_thumbs_up,
+            0 AS total_thumbs_down,
+            sum(rating * review_count)::numeric
+                / NULLIF(sum(review_count) FILTER (WHERE rating IS NOT NULL), 0) AS average_rating,
+            -- NPS calculation (rating-based)
+            COALESCE(sum(review_count) FILTER (WHERE rating >= 4), 0)::bigint AS promoters,
+            COALESCE(sum(review_count) FILTER (WHERE rating <= 2), 0)::bigint AS detractors,
+            COALESCE(sum(review_count) FILTER (WHERE rating IS NOT NULL), 0)::bigint AS nps_total,
+            -- NPS calculation (sentiment-based)
+            COALESCE(sum(review_count) FILTER (WHERE rating IS NOT NULL AND sentiment = 'positive'), 0)::bigint AS sentiment_promoters,
+            COALESCE(sum(review_count) FILTER (WHERE rating IS NOT NULL AND sentiment = 'negative'), 0)::bigint AS sentiment_detractors,
+            COALESCE(sum(review_count) FILTER (WHERE rating IS NOT NULL AND sentiment = 'neutral'), 0)::bigint AS sentiment_neutrals
         FROM
-            review_data
+            rollup_data
         GROUP BY
-            sentiment_period, sentiment
+            sentiment_period
     ),
-    rating_counts AS (
+    sentiment_breakdown AS (
         SELECT
             sentiment_period,
-            rating,
-            count(*) AS rating_count
-        FROM
-            review_data
+            jsonb_agg(jsonb_build_object('sentiment', sentiment, 'count', sentiment_count) ORDER BY sentiment_count DESC) AS sentiment_breakdown
+        FROM (
+            SELECT sentiment_period, sentiment, sum(review_count) AS sentiment_count
+            FROM rollup_data
+            GROUP BY sentiment_period, sentiment
+        ) sentiment_counts
         GROUP BY
-            sentiment_period, rating
+            sentiment_period
     ),
-    emotion_counts AS (
+    rating_breakdown AS (
         SELECT
             sentiment_period,
-            emotion_key,
-            sum(emotion_count) AS emotion_count
+            jsonb_agg(jsonb_build_object('rating', rating, 'count', rating_count) ORDER BY rating) AS rating_breakdown
         FROM (
-            SELECT
-                sentiment_period,
-                jsonb_object_keys(latest_analysis->'emotions'->'emotion_scores') AS emotion_key,
-                1 AS emotion_count
-            FROM
-                review_data
-            WHERE
-                latest_analysis IS NOT NULL 
-                AND latest_analysis->'emotions'->'emotion_scores' IS NOT NULL
-                AND jsonb_typeof(latest_analysis->'emotions'->'emotion_scores') = 'object'
-        ) emotion_expanded
+            SELECT sentiment_period, rating, sum(review_count) AS rating_count
+            FROM rollup_data
+            GROUP BY sentiment_period, rating
+        ) rating_counts
         GROUP BY
-            sentiment_period, emotion_key
+            sentiment_period
     ),
-    nps_calculation AS (
+    emotion_breakdown AS (
         SELECT
             sentiment_period,
-            count(*) AS total_reviews,
-            sum(CASE WHEN rating >= 4 THEN 1 ELSE 0 END) AS promoters,
-            sum(CASE WHEN rating <= 2 THEN 1 ELSE 0 END) AS detractors,
-            -- NPS based on sentiment data
-            sum(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) AS sentiment_promoters,
-            sum(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) AS sentiment_detractors,
-            sum(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) AS sentiment_neutrals
-        FROM
-            review_data
-        WHERE
-            rating IS NOT NULL
+            jsonb_agg(jsonb_build_object('emotion', emotion_key, 'count', emotion_count) ORDER BY emotion_count DESC) AS emotion_breakdown
+        FROM (
+            SELECT rd.sentiment_period, e.key AS emotion_key, sum(e.value::bigint) AS emotion_count
+            FROM rollup_data rd
+            CROSS JOIN LATERAL jsonb_each_text(rd.emotion_counts) AS e
+            GROUP BY rd.sentiment_period, e.key
+        ) emotion_counts
         GROUP BY
             sentiment_period
     )
     SELECT
-        sentiment_period,
-        count(*) AS total_reviews,
-        sum(thumbs_up_count) AS total_thumbs_up,
-        sum(thumbs_down_count) AS total_thumbs_down,
-        avg(rating) AS average_rating,
-        -- NPS calculation (rating-based)
-        (SELECT promoters FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS promoters,
-        (SELECT detractors FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS detractors,
-        (SELECT total_reviews FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS nps_total,
-        -- NPS calculation (sentiment-based)
-        (SELECT sentiment_promoters FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS sentiment_promoters,
-        (SELECT sentiment_detractors FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS sentiment_detractors,
-        (SELECT sentiment_neutrals FROM nps_calculation WHERE sentiment_period = rd.sentiment_period) AS sentiment_neutrals,
-        -- Sentiment breakdown
-        (
-            SELECT
-                jsonb_agg(
-                    jsonb_build_object(
-                        'sentiment', sentiment,
-                        'count', sentiment_count
-                    )
-                    ORDER BY sentiment_count DESC
-                )
-            FROM
-                sentiment_counts
-            WHERE
-                sentiment_period = rd.sentiment_period
-        ) AS sentiment_breakdown,
-        -- Rating breakdown
-        (
-            SELECT
-                jsonb_agg(
-                    jsonb_build_object(
-                        'rating', rating,
-                        'count', rating_count
-                    )
-                    ORDER BY rating
-                )
-            FROM
-                rating_counts
-            WHERE
-                sentiment_period = rd.sentiment_period
-        ) AS rating_breakdown,
-        -- Emotion breakdown
-        (
-            SELECT
-                jsonb_agg(
-                    jsonb_build_object(
-                        'emotion', emotion_key,
-                        'count', emotion_count
-                    )
-                    ORDER BY emotion_count DESC
-                )
-            FROM
-                emotion_counts
-            WHERE
-                sentiment_period = rd.sentiment_period
-        ) AS emotion_breakdown
+        p.*,
+        s.sentiment_breakdown,
+        r.rating_breakdown,
+        e.emotion_breakdown
     FROM
-        review_data rd
-    GROUP BY
-        sentiment_period
+        periods p
+        LEFT JOIN sentiment_breakdown s USING (sentiment_period)
+        LEFT JOIN rating_breakdown r USING (sentiment_period)
+        LEFT JOIN emotion_breakdown e USING (sentiment_period)
     ORDER BY
         sentiment_period;
     """
 
     where_parts = []
-    params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+    params = [app_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
 
     if sentiment:
         # Handle comma-separated sentiment values
         sentiment_list = [s.strip() for s in sentiment.split(',')]
         placeholders = ', '.join(['%s'] * len(sentiment_list))
-        where_parts.append(f"latest_analysis->'sentiment'->'overall'->>'classification' IN ({placeholders})")
+        where_parts.append(f"sentiment IN ({placeholders})")
         params.extend(sentiment_list)
     if rating:
         rating_list = [s.strip() for s in rating.split(',')]
         placeholders = ', '.join(['%s'] * len(rating_list))
-        where_parts.append(f"score IN ({placeholders})")
+        where_parts.append(f"rating IN ({placeholders})")
         params.extend(rating_list)
 
     final_query = base_query.replace(
@@ -618,10 +685,11 @@ async def _get_aggregated_sentiments_data(
     )
 
     try:
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing aggregation query with params: {params}")
-            logger.info(f"Final query: {final_query}")
-            
+        logger.debug("Executing aggregation query with params: %s", params)
+        logger.debug("Final query: %s", final_query)
+
+        # Extra diagnostic queries only run when DEBUG is on for this router
+        if logger.isEnabledFor(logging.DEBUG):
             # Debug: Check if there's any data in the date range
             debug_query = """
             SELECT COUNT(*) as total_count, 
@@ -630,9 +698,9 @@ async def _get_aggregated_sentiments_data(
             FROM processed_app_reviews 
             WHERE DATE(review_created_at) BETWEEN %s AND %s
             """
-            debug_result = pd.read_sql(debug_query, conn, params=tuple(params[:2]))
-            logger.info(f"Debug - Data in date range: {debug_result.to_dict('records')}")
-            
+            debug_result = await fetch_dicts_async(debug_query, params=tuple(params[1:3]))
+            logger.debug("Debug - Data in date range: %s", debug_result)
+
             # Debug: Check what periods we're getting
             period_debug_query = f"""
             SELECT 
@@ -643,9 +711,9 @@ async def _get_aggregated_sentiments_data(
             GROUP BY DATE_TRUNC('{trunc_level}', review_created_at)
             ORDER BY sentiment_period
             """
-            period_debug_result = pd.read_sql(period_debug_query, conn, params=tuple(params[:2]))
-            logger.info(f"Debug - Periods found: {period_debug_result.to_dict('records')}")
-            
+            period_debug_result = await fetch_dicts_async(period_debug_query, params=tuple(params[1:3]))
+            logger.debug("Debug - Periods found: %s", period_debug_result)
+
             # Debug: Check sample data structure
             sample_query = """
             SELECT 
@@ -664,56 +732,48 @@ async def _get_aggregated_sentiments_data(
             WHERE DATE(review_created_at) BETWEEN %s AND %s
             LIMIT 3
             """
-            sample_result = pd.read_sql(sample_query, conn, params=tuple(params[:2]))
-            logger.info(f"Debug - Sample data: {sample_result.to_dict('records')}")
-            
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                logger.info(f"Sentiments data found: {len(data)} rows")
-                logger.info(f"Data columns: {list(data.columns)}")
-                
-                # Convert DataFrame to JSON-safe format
-                try:
-                    # Convert DataFrame to records and handle datetime formatting
-                    records = data.to_dict('records')
-                    
-                    # Format datetime columns
-                    for record in records:
-                        if 'sentiment_period' in record and record['sentiment_period'] is not None:
-                            if hasattr(record['sentiment_period'], 'strftime'):
-                                record['sentiment_period'] = record['sentiment_period'].strftime('%Y-%m-%d')
-                            else:
-                                record['sentiment_period'] = str(record['sentiment_period'])
-                        
-                        # Calculate NPS score (rating-based)
-                        if record.get('nps_total', 0) > 0:
-                            promoters = record.get('promoters', 0)
-                            detractors = record.get('detractors', 0)
-                            total = record.get('nps_total', 0)
-                            record['nps_score'] = round(((promoters - detractors) / total) * 100, 1)
-                        else:
-                            record['nps_score'] = 0
-                        
-                        # Calculate NPS score (sentiment-based)
-                        sentiment_promoters = record.get('sentiment_promoters', 0)
-                        sentiment_detractors = record.get('sentiment_detractors', 0)
-                        sentiment_neutrals = record.get('sentiment_neutrals', 0)
-                        sentiment_total = sentiment_promoters + sentiment_detractors + sentiment_neutrals
-                        
-                        if sentiment_total > 0:
-                            record['sentiment_nps_score'] = round(((sentiment_promoters - sentiment_detractors) / sentiment_total) * 100, 1)
-                        else:
-                            record['sentiment_nps_score'] = 0
-                    
-                    return records
-                    
-                except Exception as conversion_error:
-                    logger.error(f"Error converting data to JSON format: {conversion_error}")
-                    # Fallback: return empty result
-                    return {}
-            else:
-                logger.warning("No aggregated sentiments data found - this might indicate a query issue")
+            sample_result = await fetch_dicts_async(sample_query, params=tuple(params[1:3]))
+            logger.debug("Debug - Sample data: %s", sample_result)
+
+        columns, rows = await fetch_all_async(final_query, params=tuple(params))
+        if rows:
+            logger.debug("Sentiments data found: %s rows", len(rows))
+            logger.debug("Data columns: %s", columns)
+
+            # Convert rows to JSON-safe format
+            try:
+                records = rows_to_records(columns, rows, date_columns=["sentiment_period"])
+
+                for record in records:
+                    # Calculate NPS score (rating-based)
+                    if record.get('nps_total', 0) > 0:
+                        promoters = record.get('promoters', 0)
+                        detractors = record.get('detractors', 0)
+                        total = record.get('nps_total', 0)
+                        record['nps_score'] = round(((promoters - detractors) / total) * 100, 1)
+                    else:
+                        record['nps_score'] = 0
+
+                    # Calculate NPS score (sentiment-based)
+                    sentiment_promoters = record.get('sentiment_promoters', 0)
+                    sentiment_detractors = record.get('sentiment_detractors', 0)
+                    sentiment_neutrals = record.get('sentiment_neutrals', 0)
+                    sentiment_total = sentiment_promoters + sentiment_detractors + sentiment_neutrals
+
+                    if sentiment_total > 0:
+                        record['sentiment_nps_score'] = round(((sentiment_promoters - sentiment_detractors) / sentiment_total) * 100, 1)
+                    else:
+                        record['sentiment_nps_score'] = 0
+
+                return records
+
+            except Exception as conversion_error:
+                logger.error(f"Error converting data to JSON format: {conversion_error}")
+                # Fallback: return empty result
                 return {}
+        else:
+            logger.warning("No aggregated sentiments data found - this might indicate a query issue")
+            return {}
     except Exception as e:
         logger.error(f"Error getting sentiments data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -723,21 +783,19 @@ async def _get_aggregated_sentiments_data(
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-import pandas as pd
-from app.shared_services.db import get_postgres_connection
 
-async def _get_reviews_list(
+def _build_reviews_list_query(
     app_id: str,
     start_date: datetime,
     end_date: datetime,
-    order_by: str = 'thumbs_up_count', # Corrected default to match valid columns
+    order_by: str = 'thumbs_up_count',
     sentiment: Optional[str] = None,
     rating: Optional[str] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None
-) -> List[Dict[str, Any]]:
+) -> tuple[str, list]:
     """
-    Get a filtered and paginated list of reviews, extracting detailed sentiment and
+    Build the reviews list query and its parameters, extracting detailed sentiment and
     response recommendation data from the latest_analysis JSONB column.
     """
 
@@ -834,31 +892,46 @@ async def _get_reviews_list(
         if offset is not None:
             final_query += f" OFFSET {offset}"
 
+    return final_query, params
+
+async def _get_reviews_list(
+    app_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    order_by: str = 'thumbs_up_count', # Corrected default to match valid columns
+    sentiment: Optional[str] = None,
+    rating: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get a filtered and paginated list of reviews (see _build_reviews_list_query).
+    """
+    final_query, params = _build_reviews_list_query(
+        app_id, start_date, end_date, order_by, sentiment, rating, limit, offset
+    )
+
     # 6. Execute query and return data
     try:
-        # NOTE: get_postgres_connection() must be implemented to work.
-        # This assumes a context manager that returns a connection object suitable for pandas.read_sql
-        with get_postgres_connection() as conn:
-            logger.info(f"Executing reviews list query with params: {params}")
-            logger.info(f"Final SQL query: {final_query}")
-            
-            # Debug: Show the query with actual parameter values
+        logger.debug("Executing reviews list query with params: %s", params)
+        logger.debug("Final SQL query: %s", final_query)
+
+        # Debug: Show the query with actual parameter values
+        if logger.isEnabledFor(logging.DEBUG):
             debug_query = final_query
             for i, param in enumerate(params):
                 debug_query = debug_query.replace('%s', f"'{param}'", 1)
-            logger.info(f"Debug SQL with real params: {debug_query}")
-            
-            # pd.read_sql safely handles parameter substitution using the params tuple
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            
-            if not data.empty:
-                logger.info(f"List data: {len(data)} rows")
-                # Convert the data to records (list of dictionaries)
-                records = data.to_dict('records')
-                return records
-            else:
-                logger.info("No reviews data found")
-                return []
+            logger.debug("Debug SQL with real params: %s", debug_query)
+
+        # Runs on a pooled connection off the event loop; rows come back as dicts
+        records = await fetch_dicts_async(final_query, params=tuple(params))
+
+        if records:
+            logger.debug("List data: %s rows", len(records))
+            return records
+        else:
+            logger.debug("No reviews data found")
+            return []
     except Exception as e:
         logger.error(f"Error getting reviews data: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -907,15 +980,14 @@ async def _get_reviews_list_count(
     
     # Execute query and return data
     try:
-        with get_postgres_connection() as conn:
-            data = pd.read_sql(final_query, conn, params=tuple(params))
-            if not data.empty:
-                count = int(data['count'].iloc[0])
-                logger.info(f"Filtered reviews count: {count}")
-                return count
-            else:
-                logger.info("No reviews found with filters, count is 0")
-                return 0
+        count = await fetch_value_async(final_query, params=tuple(params))
+        if count is not None:
+            count = int(count)
+            logger.debug("Filtered reviews count: %s", count)
+            return count
+        else:
+            logger.debug("No reviews found with filters, count is 0")
+            return 0
     except Exception as e:
         logger.error(f"Error getting filtered reviews count: {str(e)}", exc_info=True)
         raise HTTPException(
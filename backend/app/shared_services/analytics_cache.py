@@ -0,0 +1,342 @@
+"""
+Response cache for the dashboard analytics endpoints.
+
+The /sentiments, /issues, /positives and /actions analytics payloads only change when
+the analyzer jobs write new results, yet every dashboard open requests several of them.
+Responses are cached on (endpoint, app_id, time range, filters, today's date) as
+already-serialized JSON, in two layers:
+
+- an in-process LRU (ANALYTICS_CACHE_MAX_ENTRIES entries, ANALYTICS_CACHE_TTL_SECONDS each)
+- optionally (ANALYTICS_CACHE_SHARED), the `analytics_response_cache` table, so every
+  API worker can serve a payload computed by any other
+
+The analyzer jobs run in other processes, so invalidation goes through the database:
+save_review_analysis, save_daily_summary and save_week_aggregation call
+invalidate_analytics_cache(), which bumps the app's generation in
+`analytics_cache_generations` (app/db/migrations/create_analytics_cache.sql); raw
+review ingestion (process_raw_reviews_incremental) bumps it in SQL. Entries
+remember the generation they were built at, and the API re-reads the generations at
+most every ANALYTICS_CACHE_GENERATION_CHECK_SECONDS, so new data shows up within that
+interval. Endpoints whose aggregates span all apps use the sum of all generations.
+
+Every response carries an ETag, and a request whose If-None-Match matches gets a 304.
+A cache failure never fails the request - it is logged and the payload is rebuilt.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+import psycopg2.errors
+from dotenv import load_dotenv
+from fastapi import Request, Response
+
+from .async_db import run_db
+from .db import get_postgres_connection
+from .logger_setup import setup_logger
+from .serialization import encode_json
+
+load_dotenv()
+
+logger = setup_logger()
+
+# Scope of endpoints whose aggregates span every app
+ALL_APPS = "*"
+
+
+class _Entry(NamedTuple):
+    scope: str
+    generation: int
+    expires_at: float
+    etag: str
+    body: bytes
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches `etag` (weak comparison, as browsers send it)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class AnalyticsResponseCache:
+    """In-process LRU of analytics responses, validated against per-app generations."""
+
+    def __init__(self, enabled: bool, ttl_seconds: int, max_entries: int, generation_check_seconds: float,
+                 shared: bool, evict_every: int = 200):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generation_check_seconds = generation_check_seconds
+        self.shared = shared
+        self.evict_every = max(1, evict_every)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._generations_loaded_at = 0.0
+        self._generations_lock: Optional[asyncio.Lock] = None
+        self._shared_stores_since_evict = 0
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "not_modified": 0,
+                       "invalidations": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(endpoint: str, app_id: str, params: Dict[str, Any]) -> str:
+        """Hash the request into a cache key. Today's date is included because time ranges are relative."""
+        payload = json.dumps(
+            {"endpoint": endpoint, "app_id": app_id, "params": params, "day": date.today().isoformat()},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _handle_error(self, action: str, e: Exception) -> None:
+        self._incr("errors")
+        if isinstance(e, psycopg2.errors.UndefinedTable):
+            # Without the generations table, cached responses could never be invalidated
+            logger.warning("analytics cache tables not found - disabling analytics response cache "
+                           "(run app/db/migrations/create_analytics_cache.sql)")
+            self.enabled = False
+        else:
+            logger.warning(f"Analytics cache {action} failed: {e}")
+
+    # Generations
+
+    def _load_generations(self) -> Dict[str, int]:
+        with get_postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT app_id, generation FROM analytics_cache_generations")
+                return dict(cur.fetchall())
+
+    async def current_generation(self, scope: str) -> Optional[int]:
+        """Return the scope's generation, re-reading the table if the last read is stale. None on error."""
+        if time.monotonic() - self._generations_loaded_at >= self.generation_check_seconds:
+            if self._generations_lock is None:
+                self._generations_lock = asyncio.Lock()
+            async with self._generations_lock:
+                if time.monotonic() - self._generations_loaded_at >= self.generation_check_seconds:
+                    try:
+                        generations = await run_db(self._load_generations)
+                    except Exception as e:
+                        self._handle_error("generation lookup", e)
+                        return None
+                    with self._lock:
+                        self._generations = generations
+                        self._generations_loaded_at = time.monotonic()
+        with self._lock:
+            if scope == ALL_APPS:
+                return sum(self._generations.values())
+            return self._generations.get(scope, 0)
+
+    def bump_generation(self, app_id: str, cur=None) -> None:
+        """
+        Bump the app's generation so every process drops its cached responses for it.
+
+        With `cur`, the bump runs in the caller's transaction (inside a savepoint, so a
+        failure never aborts the caller's write); otherwise on its own connection.
+        """
+        try:
+            if cur is not None:
+                cur.execute("SAVEPOINT analytics_cache")
+                try:
+                    cur.execute("SELECT bump_analytics_cache_generation(%s)", (app_id,))
+                    cur.execute("RELEASE SAVEPOINT analytics_cache")
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT analytics_cache")
+                    raise
+            else:
+                with get_postgres_connection() as conn:
+                    with conn.cursor() as own_cur:
+                        own_cur.execute("SELECT bump_analytics_cache_generation(%s)", (app_id,))
+        except Exception as e:
+            self._handle_error(f"invalidation for {app_id}", e)
+        self.drop_local(app_id)
+
+    def drop_local(self, app_id: str) -> None:
+        """Drop this process's entries for the app (and the all-apps ones) and force a generation re-read."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry.scope in (app_id, ALL_APPS)]:
+                del self._entries[key]
+            self._generations_loaded_at = 0.0
+            self._stats["invalidations"] += 1
+
+    # In-process layer
+
+    def get_local(self, key: str, generation: int) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != generation or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put_local(self, key: str, scope: str, generation: int, etag: str, body: bytes,
+                  ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = _Entry(scope, generation, expires_at, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Shared layer
+
+    def get_shared(self, key: str, generation: int) -> Optional[Tuple[str, bytes, float]]:
+        """Return (etag, body, remaining ttl seconds) from analytics_response_cache, or None."""
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        SELECT etag, body, EXTRACT(EPOCH FROM expires_at - NOW())
+                        FROM analytics_response_cache
+                        WHERE cache_key = %s AND generation = %s AND expires_at > NOW()
+                        """,
+                        (key, generation),
+                    )
+                    row = cur.fetchone()
+        except Exception as e:
+            self._handle_error("shared lookup", e)
+            return None
+        if row is None:
+            return None
+        return row[0], row[1].encode("utf-8"), float(row[2])
+
+    def set_shared(self, key: str, scope: str, generation: int, etag: str, body: bytes) -> None:
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO analytics_response_cache (cache_key, scope, generation, etag, body, expires_at)
+                        VALUES (%s, %s, %s, %s, %s, NOW() + %s * INTERVAL '1 second')
+                        ON CONFLICT (cache_key) DO UPDATE SET
+                            scope = EXCLUDED.scope,
+                            generation = EXCLUDED.generation,
+                            etag = EXCLUDED.etag,
+                            body = EXCLUDED.body,
+                            created_at = NOW(),
+                            expires_at = EXCLUDED.expires_at
+                        """,
+                        (key, scope, generation, etag, body.decode("utf-8"), self.ttl_seconds),
+                    )
+                    with self._lock:
+                        self._shared_stores_since_evict += 1
+                        due = self._shared_stores_since_evict >= self.evict_every
+                        if due:
+                            self._shared_stores_since_evict = 0
+                    if due:
+                        cur.execute("DELETE FROM analytics_response_cache WHERE expires_at <= NOW()")
+        except Exception as e:
+            self._handle_error("shared store", e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["shared_hits"]) / lookups, 4) if lookups else 0.0
+        stats["enabled"] = self.enabled
+        stats["shared"] = self.shared
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+analytics_cache = AnalyticsResponseCache(
+    enabled=os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+    ttl_seconds=int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "3600")),
+    max_entries=int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "2000")),
+    generation_check_seconds=float(os.getenv("ANALYTICS_CACHE_GENERATION_CHECK_SECONDS", "5")),
+    shared=os.getenv("ANALYTICS_CACHE_SHARED", "false").lower() in ("1", "true", "yes"),
+)
+
+
+def get_analytics_cache_stats() -> Dict[str, Any]:
+    """Return analytics response cache counters for this process."""
+    return analytics_cache.stats()
+
+
+def invalidate_analytics_cache(app_id: str, cur=None) -> None:
+    """Invalidate cached analytics responses for an app after new analysis data was written."""
+    analytics_cache.bump_generation(app_id, cur)
+
+
+def _json_response(request: Request, etag: str, body: bytes, cache_status: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        analytics_cache._incr("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_analytics_response(
+    request: Request,
+    endpoint: str,
+    app_id: str,
+    params: Dict[str, Any],
+    build: Callable[[], Awaitable[Any]],
+    app_scoped: bool = True,
+) -> Response:
+    """
+    Serve an analytics payload from the cache, building it with `build()` on a miss.
+
+    Args:
+        request: The incoming request (for If-None-Match)
+        endpoint: Endpoint name, part of the cache key
+        app_id: App the payload is for
+        params: Time range and filters, part of the cache key
+        build: Coroutine function returning the payload
+        app_scoped: False for endpoints whose aggregates span all apps, so writes for
+            any app invalidate them
+
+    Returns:
+        A JSON response with ETag, or 304 Not Modified
+    """
+    scope = app_id if app_scoped else ALL_APPS
+    generation = await analytics_cache.current_generation(scope) if analytics_cache.enabled else None
+    if generation is None:
+        body = encode_json(await build())
+        return _json_response(request, make_etag(body), body, "BYPASS")
+
+    key = analytics_cache.make_key(endpoint, app_id, params)
+
+    entry = analytics_cache.get_local(key, generation)
+    if entry is not None:
+        analytics_cache._incr("hits")
+        return _json_response(request, entry.etag, entry.body, "HIT")
+
+    if analytics_cache.shared:
+        shared = await run_db(analytics_cache.get_shared, key, generation)
+        if shared is not None:
+            etag, body, remaining = shared
+            analytics_cache._incr("shared_hits")
+            analytics_cache.put_local(key, scope, generation, etag, body, ttl_seconds=remaining)
+            return _json_response(request, etag, body, "HIT")
+
+    analytics_cache._incr("misses")
+    body = encode_json(await build())
+    etag = make_etag(body)
+    analytics_cache.put_local(key, scope, generation, etag, body)
+    if analytics_cache.shared:
+        await run_db(analytics_cache.set_shared, key, scope, generation, etag, body)
+    return _json_response(request, etag, body, "MISS")
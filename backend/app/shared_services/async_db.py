@@ -0,0 +1,177 @@
+"""
+Async database access for the FastAPI routers.
+
+psycopg2 is a blocking driver, so every query issued from an `async def`
+endpoint is handed to a dedicated, bounded thread pool instead of running on the
+event loop. The executor is never larger than the connection pool, so worker
+threads do not queue on the pool and concurrent dashboard requests overlap.
+
+Results come straight from the cursor as tuples or dicts of native Python values; no
+DataFrame is built on the request path. Large results can be read through a
+server-side cursor (`server_side=True`), which fetches DB_FETCH_ITERSIZE rows per
+round trip instead of buffering the whole result in libpq first, and open_row_stream()
+hands such a cursor's rows out batch by batch for streaming responses.
+"""
+import asyncio
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from .db import get_postgres_connection
+from .logger_setup import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the shared executor used for blocking database work, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                pool_size = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+                workers = min(int(os.getenv("DB_EXECUTOR_MAX_WORKERS", str(pool_size))), pool_size)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-worker")
+                logger.info(f"Created database executor with {workers} workers")
+    return _executor
+
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking database function in the DB executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+
+def _fetch_all(query: str, params: Optional[Sequence[Any]] = None,
+               server_side: bool = False) -> Tuple[List[str], List[tuple]]:
+    with get_postgres_connection() as conn:
+        if server_side:
+            # Named cursors stream the result in itersize batches; they need the
+            # surrounding transaction, which the connection context manager provides
+            cur = conn.cursor(name=f"fetch_{uuid.uuid4().hex}")
+            cur.itersize = int(os.getenv("DB_FETCH_ITERSIZE", "2000"))
+        else:
+            cur = conn.cursor()
+        with cur:
+            cur.execute(query, tuple(params) if params is not None else None)
+            rows = list(cur) if server_side else cur.fetchall()
+            columns = [desc[0] for desc in cur.description] if cur.description else []
+            return columns, rows
+
+
+async def fetch_all_async(query: str, params: Optional[Sequence[Any]] = None,
+                          server_side: bool = False) -> Tuple[List[str], List[tuple]]:
+    """Execute a query off the event loop and return (column names, rows as tuples)."""
+    return await run_db(_fetch_all, query, params, server_side)
+
+
+async def fetch_dicts_async(query: str, params: Optional[Sequence[Any]] = None,
+                            server_side: bool = False) -> List[Dict[str, Any]]:
+    """Execute a query off the event loop and return the rows as dicts keyed by column name."""
+    columns, rows = await fetch_all_async(query, params, server_side)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def fetch_one_async(query: str, params: Optional[Sequence[Any]] = None) -> Optional[Dict[str, Any]]:
+    """Execute a query off the event loop and return the first row as a dict (or None)."""
+    columns, rows = await fetch_all_async(query, params)
+    return dict(zip(columns, rows[0])) if rows else None
+
+
+async def fetch_value_async(query: str, params: Optional[Sequence[Any]] = None) -> Any:
+    """Execute a query off the event loop and return the first column of the first row (or None)."""
+    _, rows = await fetch_all_async(query, params)
+    return rows[0][0] if rows else None
+
+
+class RowStream:
+    """
+    Rows of a server-side (named) cursor, fetched DB_FETCH_ITERSIZE at a time.
+
+    Holds one pooled connection until the rows are exhausted or close() is called, so
+    memory stays constant however large the result is. Create with open_row_stream().
+    """
+
+    def __init__(self, query: str, params: Optional[Sequence[Any]], batch_size: Optional[int]):
+        self.query = query
+        self.params = tuple(params) if params is not None else None
+        self.batch_size = batch_size or int(os.getenv("DB_FETCH_ITERSIZE", "2000"))
+        self.columns: List[str] = []
+        self._conn = None
+        self._cur = None
+        self._first_batch: List[tuple] = []
+
+    def _open(self) -> None:
+        self._conn = get_postgres_connection()
+        try:
+            self._cur = self._conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+            self._cur.itersize = self.batch_size
+            self._cur.execute(self.query, self.params)
+            self._first_batch = self._cur.fetchmany(self.batch_size)
+            self.columns = [desc[0] for desc in self._cur.description] if self._cur.description else []
+        except Exception:
+            self._close()
+            raise
+
+    def _fetch(self) -> List[tuple]:
+        return self._cur.fetchmany(self.batch_size)
+
+    def _close(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            if self._cur is not None and not self._cur.closed:
+                self._cur.close()
+            self._conn.rollback()
+        except Exception as e:
+            logger.warning(f"Error closing row stream: {e}")
+        finally:
+            self._conn.close()
+            self._conn = None
+            self._cur = None
+
+    async def batches(self) -> AsyncIterator[List[tuple]]:
+        """Yield the rows in batches; the connection is released when iteration ends or is abandoned."""
+        try:
+            batch, self._first_batch = self._first_batch, []
+            while batch:
+                yield batch
+                batch = await run_db(self._fetch)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        await run_db(self._close)
+
+
+async def open_row_stream(query: str, params: Optional[Sequence[Any]] = None,
+                          batch_size: Optional[int] = None) -> RowStream:
+    """
+    Execute a query on a server-side cursor and return its RowStream. The query runs
+    (and its first batch is fetched) before this returns, so SQL errors surface here
+    rather than halfway through a streamed response.
+
+    The stream holds one of the DB_POOL_MAX_SIZE pooled connections until it is closed,
+    so callers that hand it to a client (see export_stream.stream_export) must bound how
+    many are open at once.
+    """
+    stream = RowStream(query, params, batch_size)
+    await run_db(stream._open)
+    return stream
+
+
+def shutdown_db_executor() -> None:
+    """Stop the DB executor. Called on application shutdown."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
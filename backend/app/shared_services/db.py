@@ -1,15 +1,18 @@
 import os
+import threading
+import time
+from collections import deque
 
 from typing import List, Dict, Any, Optional, TypedDict, Union
 from dotenv import load_dotenv
 
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import requests
 
 from psycopg2.extras import Json, RealDictCursor
 
-import numpy as np
-
 from .logger_setup import setup_logger
 
 # Load environment variables
@@ -18,15 +21,11 @@ load_dotenv()
 logger = setup_logger()
 
 
-def get_postgres_connection(table_name: str = None):
+def _get_connection_params() -> Dict[str, Any]:
     """
-    Establish and return a connection to the PostgreSQL database.
+    Read the database connection details from environment variables.
     Supports both local PostgreSQL and Neon cloud database.
-    
-    :param table_name: Optional. Name of the table to interact with (not used currently)
-    :return: Connection object
     """
-    # Get database connection details from environment variables
     db_host = os.getenv("PGHOST", "localhost")  # Default to localhost for local development
     db_password = os.getenv("PGPASSWORD", "xpchex_password")  # Default password
     db_port = os.getenv("PGPORT", "5432")  # Port with default value
@@ -39,18 +38,272 @@ def get_postgres_connection(table_name: str = None):
         logger.error(error_msg)
         raise ValueError(error_msg)
 
-    try:
-        # PostgreSQL connection with configurable SSL
-        conn = psycopg2.connect(
-            host=db_host,
-            database=db_name,
-            user=db_user,
-            password=db_password,
-            port=db_port,
-            sslmode=db_ssl_mode  # Configurable SSL mode
+    return {
+        "host": db_host,
+        "database": db_name,
+        "user": db_user,
+        "password": db_password,
+        "port": db_port,
+        "sslmode": db_ssl_mode,  # Configurable SSL mode
+    }
+
+
+class _LoggingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that logs (and counts) every physical connection it opens."""
+
+    def __init__(self, minconn: int, maxconn: int, max_idle: int, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(minconn, maxconn, **kwargs)
+        # psycopg2 closes returned connections once `minconn` are idle; keep up to
+        # `max_idle` warm instead so bursts don't reconnect on every checkout.
+        self.minconn = max(minconn, max_idle)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self._on_connect(conn)
+        return conn
+
+
+class PostgresConnectionPool:
+    """
+    Process-wide PostgreSQL connection pool.
+
+    Wraps psycopg2's ThreadedConnectionPool with a semaphore so that callers wait
+    (up to `timeout` seconds) for a free connection instead of failing immediately
+    when the pool is exhausted, and keeps counters for checkouts, waits and leaks.
+
+    Connections leaked by garbage-collected PooledConnections are queued lock-free
+    and returned to the pool on the next checkout (or stats() call).
+    """
+
+    def __init__(self, minconn: int, maxconn: int, max_idle: int, timeout: float, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "connections_opened": 0,
+            "checkouts": 0,
+            "returns": 0,
+            "waits": 0,
+            "wait_time_total_ms": 0.0,
+            "timeouts": 0,
+            "leaked": 0,
+            "discarded": 0,
+        }
+        self._leaked_conns: deque = deque()
+        self._pool = _LoggingConnectionPool(minconn, maxconn, max_idle, self._on_connect, **connect_kwargs)
+
+    def _on_connect(self, conn) -> None:
+        self._incr("connections_opened")
+        logger.info(
+            f"Opened pooled database connection to {conn.info.dbname} as user {conn.info.user} "
+            f"at {conn.info.host}:{conn.info.port}"
         )
-        logger.info(f"Successfully connected to database: {db_name} as user {db_user} at {db_host}:{db_port}")
+
+    def _incr(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def defer_leaked(self, conn) -> None:
+        """
+        Queue a leaked connection for return. Called from PooledConnection.__del__, which
+        may run on a thread already holding one of the pool's locks, so this takes none.
+        """
+        self._leaked_conns.append(conn)
+
+    def _reclaim_leaked(self) -> None:
+        while True:
+            try:
+                conn = self._leaked_conns.popleft()
+            except IndexError:
+                return
+            logger.warning("Database connection was garbage collected without being closed; returning it to the pool")
+            self.putconn(conn, leaked=True)
+
+    def getconn(self):
+        """Check out a raw connection, waiting for a free slot if the pool is exhausted."""
+        self._reclaim_leaked()
+        if not self._slots.acquire(blocking=False):
+            self._incr("waits")
+            started = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            self._incr("wait_time_total_ms", (time.monotonic() - started) * 1000)
+            if not acquired:
+                self._incr("timeouts")
+                raise psycopg2.pool.PoolError(
+                    f"Timed out after {self.timeout}s waiting for a database connection "
+                    f"(pool max size {self.maxconn})"
+                )
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                # Server went away while the connection was idle - replace it
+                self._pool.putconn(conn, close=True)
+                self._incr("discarded")
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        self._incr("checkouts")
         return conn
+
+    def putconn(self, conn, leaked: bool = False) -> None:
+        """Return a raw connection to the pool, rolling back any open transaction."""
+        try:
+            discard = bool(conn.closed)
+            if not discard:
+                try:
+                    if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+                except psycopg2.Error:
+                    discard = True
+            if discard:
+                self._incr("discarded")
+            self._pool.putconn(conn, close=discard)
+        finally:
+            self._slots.release()
+            self._incr("returns")
+            if leaked:
+                self._incr("leaked")
+
+    def stats(self) -> Dict[str, Any]:
+        self._reclaim_leaked()
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["min_size"] = self.minconn
+        stats["max_size"] = self.maxconn
+        stats["max_idle"] = self.max_idle
+        stats["in_use"] = stats["checkouts"] - stats["returns"]
+        stats["idle"] = len(self._pool._pool)
+        return stats
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled psycopg2 connection.
+
+    Behaves like a regular psycopg2 connection (cursor, commit, rollback, attribute
+    access) but `close()` hands the connection back to the pool instead of closing it.
+    Used as a context manager it commits or rolls back and then releases the
+    connection, so `with get_postgres_connection() as conn:` no longer leaks.
+    Connections that are garbage collected without being released are counted as
+    leaked and handed back to the pool (see PostgresConnectionPool.defer_leaked).
+    """
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn, pool: PostgresConnectionPool):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    @property
+    def closed(self) -> int:
+        conn = object.__getattribute__(self, "_conn")
+        return 1 if conn is None else conn.closed
+
+    def close(self) -> None:
+        """Return the connection to the pool. Safe to call more than once."""
+        self._release(leaked=False)
+
+    def _release(self, leaked: bool) -> None:
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            return
+        object.__setattr__(self, "_conn", None)
+        object.__getattribute__(self, "_pool").putconn(conn, leaked=leaked)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if self._conn is not None and not self._conn.closed:
+                if exc_type is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self.close()
+
+    def __del__(self):
+        # No locks, logging or pool calls here: the finalizer can run on a thread that
+        # already holds the pool's locks. The pool returns the connection later.
+        try:
+            conn = object.__getattribute__(self, "_conn")
+            if conn is not None:
+                object.__setattr__(self, "_conn", None)
+                object.__getattribute__(self, "_pool").defer_leaked(conn)
+        except Exception:
+            pass
+
+
+_pool: Optional[PostgresConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> PostgresConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Sized by DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE (DB_POOL_MAX_IDLE connections are
+    kept open between requests); callers wait up to DB_POOL_TIMEOUT seconds for a
+    free connection. A forked child process
+    gets its own pool rather than sharing the parent's sockets.
+    """
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            minconn = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+            maxconn = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+            max_idle = int(os.getenv("DB_POOL_MAX_IDLE", str(maxconn)))
+            timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+            try:
+                _pool = PostgresConnectionPool(minconn, maxconn, max_idle, timeout, **_get_connection_params())
+                _pool_pid = os.getpid()
+            except psycopg2.OperationalError as e:
+                logger.error(f"Unable to connect to database. Error: {e}")
+                raise
+            logger.info(f"Created database connection pool (min={minconn}, max={maxconn}, max_idle={max_idle}, timeout={timeout}s)")
+    return _pool
+
+
+def get_postgres_connection(table_name: str = None) -> PooledConnection:
+    """
+    Check out a connection to the PostgreSQL database from the process-wide pool.
+    Supports both local PostgreSQL and Neon cloud database.
+
+    The returned connection can be used exactly like a psycopg2 connection;
+    calling `close()` (or leaving a `with` block) returns it to the pool.
+
+    :param table_name: Optional. Name of the table to interact with (not used currently)
+    :return: Connection object
+    """
+    try:
+        pool = get_connection_pool()
+        return PooledConnection(pool.getconn(), pool)
+    except psycopg2.pool.PoolError as e:
+        logger.error(f"Unable to get a database connection from the pool. Error: {e}")
+        raise
     except psycopg2.OperationalError as e:
         logger.error(f"Unable to connect to database. Error: {e}")
         raise
@@ -58,3 +311,20 @@ def get_postgres_connection(table_name: str = None):
         logger.error(f"An unexpected error occurred while connecting to database: {e}")
         raise
 
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return connection pool statistics (checkouts, waits, leaked connections, ...)."""
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+
+def close_connection_pool() -> None:
+    """Close every connection held by the pool. Called on application shutdown."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None:
+            logger.info(f"Closing database connection pool. Final stats: {_pool.stats()}")
+            _pool.closeall()
+            _pool = None
+            _pool_pid = None
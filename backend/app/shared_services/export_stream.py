@@ -0,0 +1,170 @@
+"""
+Streaming NDJSON/CSV exports of large query results.
+
+Rows are read from a server-side cursor (async_db.open_row_stream) and encoded one
+batch at a time into a StreamingResponse, so an export holds at most one batch in
+memory however many rows it returns. Responses are gzip-compressed on the fly when the
+client sends `Accept-Encoding: gzip`.
+
+Each export holds a pooled connection until the client has downloaded it, so at most
+EXPORT_MAX_CONCURRENT exports run at once (a quarter of DB_POOL_MAX_SIZE by default);
+beyond that the API answers 503 with Retry-After rather than letting slow downloads
+starve the other endpoints of connections.
+"""
+import asyncio
+import csv
+import io
+import os
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from .async_db import RowStream, open_row_stream
+from .serialization import encode_json
+
+
+MAX_CONCURRENT_EXPORTS = int(os.getenv(
+    "EXPORT_MAX_CONCURRENT", str(max(1, int(os.getenv("DB_POOL_MAX_SIZE", "10")) // 4))
+))
+EXPORT_RETRY_AFTER_SECONDS = 5
+
+_export_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode("utf-8")
+    return value
+
+
+def encode_ndjson(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """One JSON object per row, newline-terminated."""
+    return b"".join(encode_json(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    """CSV lines for the rows; JSON values are written as JSON text, NULLs as empty fields."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def _encode(stream: RowStream, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.CSV:
+        yield encode_csv([stream.columns])
+        async for rows in stream.batches():
+            yield encode_csv(rows)
+    else:
+        async for rows in stream.batches():
+            yield encode_ndjson(stream.columns, rows)
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _ExportLease:
+    """An export slot and the row stream holding its connection; released exactly once."""
+
+    def __init__(self, stream: RowStream):
+        self.stream = stream
+        self._released = False
+
+    async def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        try:
+            await self.stream.close()
+        finally:
+            _export_slots.release()
+
+
+async def _leased(chunks: AsyncIterator[bytes], lease: _ExportLease) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await lease.release()
+
+
+def accepts_gzip(request: Request) -> bool:
+    return any(
+        encoding.split(";")[0].strip() == "gzip"
+        for encoding in request.headers.get("accept-encoding", "").split(",")
+    )
+
+
+async def stream_export(request: Request, query: str, params: Optional[Sequence[Any]],
+                        export_format: ExportFormat, filename: str) -> StreamingResponse:
+    """
+    Run `query` on a server-side cursor and build a StreamingResponse that writes its rows
+    as NDJSON or CSV, gzip-compressed if the client accepts it. `filename` is the download
+    name without extension.
+
+    Raises HTTPException(503) when MAX_CONCURRENT_EXPORTS exports are already running.
+    The query runs before this returns, so SQL errors surface here rather than halfway
+    through the response.
+    """
+    if _export_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many exports in progress, please retry shortly",
+            headers={"Retry-After": str(EXPORT_RETRY_AFTER_SECONDS)}
+        )
+    await _export_slots.acquire()
+    try:
+        stream = await open_row_stream(query, params)
+    except BaseException:
+        _export_slots.release()
+        raise
+
+    # Released when the body is exhausted or abandoned; the background task covers a
+    # response whose body never started (e.g. the client went away first)
+    lease = _ExportLease(stream)
+    chunks = _leased(_encode(stream, export_format), lease)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request):
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=_MEDIA_TYPES[export_format], headers=headers,
+                             background=BackgroundTask(lease.release))
+
+
+def export_filename(*parts: Any) -> str:
+    """Join parts into a download-safe filename stem."""
+    stem = "_".join(str(part.value if isinstance(part, Enum) else part) for part in parts if part)
+    return "".join(c if c.isalnum() or c in "._-" else "_" for c in stem)
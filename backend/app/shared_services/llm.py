@@ -1,18 +1,26 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import asyncio
+import threading
+import weakref
 from typing import List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import instructor
-from groq import Groq
+from groq import Groq, AsyncGroq
+import httpx
 #from google.generativeai import configure, GenerativeModel
 #import google.generativeai as genai
 from instructor import patch
 import logging
 
+from .llm_cache import cached_llm_call
+
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Initialize OpenAI client with instructor for structured outputs
@@ -21,6 +29,7 @@ openai_client = instructor.patch(OpenAI(api_key=OPENAI_API_KEY), mode=instructor
 # Configure Google Gemini
 # genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+@cached_llm_call
 def call_llm_api_openai(messages: List[Dict[str, str]], 
                 model: str = "gpt-4o",
                 response_format: Optional[BaseModel] = None,
@@ -59,6 +68,7 @@ def call_llm_api_openai(messages: List[Dict[str, str]],
 # Patch Groq() with instructor, this is where the magic happens!
 groq_client = instructor.from_groq(Groq(api_key=os.getenv("GROQ_API_KEY")), mode=instructor.Mode.JSON)
 
+@cached_llm_call
 def call_llm_api_1(messages: List[Dict[str, str]],
                 model: str = "llama3-70b-8192",
                 response_format: Optional[BaseModel] = None,
@@ -105,6 +115,7 @@ openrouter_client = OpenAI(
 # Patch OpenRouter client with instructor for structured outputs
 openrouter_client = instructor.patch(openrouter_client, mode=instructor.Mode.JSON)
 
+@cached_llm_call
 def call_llm_api(messages: List[Dict[str, str]],
                 model: str = "google/gemini-2.5-flash-lite-preview-06-17",
                 response_format: Optional[BaseModel] = None,
@@ -153,6 +164,173 @@ def call_llm_api(messages: List[Dict[str, str]],
         raise
 
 
+# Async clients
+#
+# Async variants of the calls above, for use from async graph nodes and batch jobs so
+# an LLM round-trip doesn't block the event loop. All async clients of an event loop share
+# one keep-alive HTTP connection pool, so concurrent requests reuse TLS connections
+# instead of opening a new one per call. The pool is bound to the loop that first uses it,
+# so the clients are created lazily per running loop: batch CLIs that call asyncio.run()
+# more than once per process get fresh clients on each run.
+
+class _AsyncLLMClients:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop_ref = weakref.ref(loop)
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", "120")), connect=10.0),
+        )
+        self.openai = instructor.patch(
+            AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=self.http_client),
+            mode=instructor.Mode.JSON
+        )
+        self.groq = instructor.from_groq(
+            AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=self.http_client),
+            mode=instructor.Mode.JSON
+        )
+        self.openrouter = instructor.patch(
+            AsyncOpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                api_key=os.getenv("OPENROUTER_API_KEY"),
+                http_client=self.http_client,
+            ),
+            mode=instructor.Mode.JSON
+        )
+
+
+# id(loop) -> clients of that loop
+_async_clients: Dict[int, _AsyncLLMClients] = {}
+_async_clients_lock = threading.Lock()
+
+
+def _get_async_clients() -> _AsyncLLMClients:
+    """The async clients of the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.get(id(loop))
+        # A closed loop's id can be reused by a new loop, so check the entry's own loop too
+        if clients is None or clients.loop_ref() is not loop:
+            # Connections of closed loops can't be closed any more; just drop them
+            for key, stale in list(_async_clients.items()):
+                stale_loop = stale.loop_ref()
+                if stale_loop is None or stale_loop.is_closed():
+                    del _async_clients[key]
+            clients = _async_clients[id(loop)] = _AsyncLLMClients(loop)
+        return clients
+
+
+@cached_llm_call
+async def call_llm_api_openai_async(messages: List[Dict[str, str]],
+                model: str = "gpt-4o",
+                response_format: Optional[BaseModel] = None,
+                temperature: float = 0.3) -> Any:
+    """
+    Async version of call_llm_api_openai.
+    """
+    try:
+        if response_format:
+            return await _get_async_clients().openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                response_model=response_format,
+                max_retries=3
+            )
+        response = await _get_async_clients().openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_retries=3
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in OpenAI API call: {e}")
+        raise
+
+
+@cached_llm_call
+async def call_llm_api_1_async(messages: List[Dict[str, str]],
+                model: str = "llama3-70b-8192",
+                response_format: Optional[BaseModel] = None,
+                max_tokens: int = 2000,
+                temperature: float = 0.3) -> Any:
+    """
+    Async version of call_llm_api_1 (Groq).
+    """
+    try:
+        if response_format:
+            return await _get_async_clients().groq.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                response_model=response_format,
+                max_retries=3
+            )
+        response = await _get_async_clients().groq.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            max_retries=3
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in Groq API call: {e}")
+        raise
+
+
+@cached_llm_call
+async def call_llm_api_async(messages: List[Dict[str, str]],
+                model: str = "google/gemini-2.5-flash-lite-preview-06-17",
+                response_format: Optional[BaseModel] = None,
+                max_tokens: int = 8000,
+                temperature: float = 0.3) -> Any:
+    """
+    Async version of call_llm_api (OpenRouter), with the same arguments and return value.
+    """
+    try:
+        if response_format:
+            return await _get_async_clients().openrouter.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                response_model=response_format,
+                max_retries=3,
+                extra_headers={
+                    "HTTP-Referer": "https://mwalimu.ai",
+                    "X-Title": "Mwalimu",
+                }
+            )
+        response = await _get_async_clients().openrouter.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            max_retries=3
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in OpenRouter API call: {e}")
+        raise
+
+
+async def close_async_llm_clients() -> None:
+    """Close the running event loop's async HTTP connection pool. Called on application shutdown."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.get(id(loop))
+        if clients is None or clients.loop_ref() is not loop:
+            return
+        del _async_clients[id(loop)]
+    await clients.http_client.aclose()
+
+
 # Patch instructor with gemini
 
 # gemini_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
@@ -195,4 +373,3 @@ def call_llm_api(messages: List[Dict[str, str]],
 #     except Exception as e:
 #         print(f"Error in Gemini API call: {e}, now falling back to OpenAI API")
 #         return call_llm_api(messages, model="gpt-4o-mini", response_format=response_format, temperature=temperature)
-
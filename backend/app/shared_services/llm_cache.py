@@ -0,0 +1,257 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Responses are stored in the `llm_response_cache` table
+(app/db/migrations/create_llm_response_cache.sql), keyed on a hash of the model,
+the prompt messages, the response_model schema, temperature and max_tokens, so a
+rerun over the same reviews (or the same statement seen again) doesn't pay for the
+LLM call twice. Entries expire after LLM_CACHE_TTL_SECONDS, and the table is
+trimmed to LLM_CACHE_MAX_ENTRIES (least recently used first).
+
+A cache failure never fails the LLM call - it is logged and the call goes through.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+import psycopg2.errors
+from dotenv import load_dotenv
+from psycopg2.extras import Json
+from pydantic import BaseModel
+
+from .async_db import run_db
+from .db import get_postgres_connection
+from .logger_setup import setup_logger
+
+load_dotenv()
+
+logger = setup_logger()
+
+
+@functools.lru_cache(maxsize=None)
+def _response_schema(response_format: type) -> Dict[str, Any]:
+    """JSON schema of a response model, built once per class (make_key runs on every cached call)."""
+    return response_format.model_json_schema()
+
+
+class LLMResponseCache:
+    """Postgres-backed LLM response cache with TTL, size-based eviction and hit/miss counters."""
+
+    def __init__(self, enabled: bool, ttl_seconds: int, max_entries: int, evict_every: int):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.evict_every = max(1, evict_every)
+        self._lock = threading.Lock()
+        self._stores_since_evict = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], response_format: Optional[type],
+                 temperature: Optional[float], max_tokens: Optional[int],
+                 prompt_version: Optional[str] = None) -> str:
+        """Hash everything that determines the LLM's answer into a cache key."""
+        schema = _response_schema(response_format) if response_format else None
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "schema": schema,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "prompt_version": prompt_version,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _handle_error(self, action: str, e: Exception) -> None:
+        self._incr("errors")
+        if isinstance(e, psycopg2.errors.UndefinedTable):
+            logger.warning("llm_response_cache table not found - disabling LLM response cache "
+                           "(run app/db/migrations/create_llm_response_cache.sql)")
+            self.enabled = False
+        else:
+            logger.warning(f"LLM cache {action} failed: {e}")
+
+    def get(self, key: str, response_format: Optional[type] = None) -> Any:
+        """Return the cached response for `key` (as `response_format` if given), or None on a miss."""
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        UPDATE llm_response_cache
+                        SET hit_count = hit_count + 1, last_accessed_at = NOW()
+                        WHERE cache_key = %s AND expires_at > NOW()
+                        RETURNING response
+                        """,
+                        (key,),
+                    )
+                    row = cur.fetchone()
+        except Exception as e:
+            self._handle_error("lookup", e)
+            return None
+
+        if row is None:
+            self._incr("misses")
+            return None
+
+        self._incr("hits")
+        data = row[0]
+        if response_format is not None:
+            return response_format.model_validate(data)
+        return data
+
+    def set(self, key: str, model: str, response: Any, response_format: Optional[type] = None,
+            prompt_version: Optional[str] = None) -> None:
+        """Store a response under `key`, replacing any existing entry."""
+        data = response.model_dump(mode="json") if isinstance(response, BaseModel) else response
+        size_bytes = len(json.dumps(data, default=str))
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO llm_response_cache
+                            (cache_key, model, response_schema, prompt_version, response, size_bytes, expires_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, NOW() + %s * INTERVAL '1 second')
+                        ON CONFLICT (cache_key) DO UPDATE SET
+                            response = EXCLUDED.response,
+                            size_bytes = EXCLUDED.size_bytes,
+                            created_at = NOW(),
+                            last_accessed_at = NOW(),
+                            expires_at = EXCLUDED.expires_at
+                        """,
+                        (key, model, response_format.__name__ if response_format else None,
+                         prompt_version, Json(data), size_bytes, self.ttl_seconds),
+                    )
+        except Exception as e:
+            self._handle_error("store", e)
+            return
+
+        self._incr("stores")
+        with self._lock:
+            self._stores_since_evict += 1
+            due = self._stores_since_evict >= self.evict_every
+            if due:
+                self._stores_since_evict = 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete expired entries, then the least recently used ones beyond max_entries."""
+        try:
+            with get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM llm_response_cache WHERE expires_at <= NOW()")
+                    evicted = cur.rowcount
+                    cur.execute(
+                        """
+                        DELETE FROM llm_response_cache
+                        WHERE cache_key IN (
+                            SELECT cache_key FROM llm_response_cache
+                            ORDER BY last_accessed_at DESC
+                            OFFSET %s
+                        )
+                        """,
+                        (self.max_entries,),
+                    )
+                    evicted += cur.rowcount
+        except Exception as e:
+            self._handle_error("eviction", e)
+            return 0
+
+        if evicted:
+            self._incr("evicted", evicted)
+            logger.info(f"Evicted {evicted} entries from the LLM response cache")
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["enabled"] = self.enabled
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+llm_cache = LLMResponseCache(
+    enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000")),
+    evict_every=int(os.getenv("LLM_CACHE_EVICT_EVERY", "200")),
+)
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Return LLM cache hit/miss counters for this process."""
+    return llm_cache.stats()
+
+
+def cached_llm_call(func: Callable) -> Callable:
+    """
+    Decorator for the call_llm_api* functions: serve the response from llm_cache when
+    the same request has been made before, and store fresh responses.
+
+    The wrapped function accepts two extra keywords: `use_cache=False` forces a live call,
+    and `prompt_version` (from app.prompts.registry) is stored with the entry and made
+    part of the key, so results can be traced to (and purged by) the prompt that produced them.
+    """
+    signature = inspect.signature(func)
+
+    def _request(args, kwargs, prompt_version):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        request = bound.arguments
+        key = llm_cache.make_key(
+            request["model"],
+            request["messages"],
+            request.get("response_format"),
+            request.get("temperature"),
+            request.get("max_tokens"),
+            prompt_version,
+        )
+        return key, request["model"], request.get("response_format")
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, use_cache: bool = True, prompt_version: Optional[str] = None, **kwargs):
+            if not (use_cache and llm_cache.enabled):
+                return await func(*args, **kwargs)
+            key, model, response_format = _request(args, kwargs, prompt_version)
+            cached = await run_db(llm_cache.get, key, response_format)
+            if cached is not None:
+                return cached
+            response = await func(*args, **kwargs)
+            await run_db(llm_cache.set, key, model, response, response_format, prompt_version)
+            return response
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, use_cache: bool = True, prompt_version: Optional[str] = None, **kwargs):
+        if not (use_cache and llm_cache.enabled):
+            return func(*args, **kwargs)
+        key, model, response_format = _request(args, kwargs, prompt_version)
+        cached = llm_cache.get(key, response_format)
+        if cached is not None:
+            return cached
+        response = func(*args, **kwargs)
+        llm_cache.set(key, model, response, response_format, prompt_version)
+        return response
+
+    return wrapper
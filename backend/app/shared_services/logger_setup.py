@@ -1,7 +1,18 @@
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
-from datetime import datetime
+import threading
+from typing import Dict, Optional
+
+ROOT_LOGGER_NAME = "QueryStateLogger"
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
 
 def truncate_for_logging(obj, max_length=500):
     """Truncate long strings/objects for logging.
@@ -18,9 +29,173 @@ def truncate_for_logging(obj, max_length=500):
         return string_repr
     return f"{string_repr[:max_length]}... [truncated, total length: {len(string_repr)}]"
 
-def setup_logger(name: str = "QueryStateLogger") -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def _make_formatter(log_format: str) -> logging.Formatter:
+    """"json" for structured output, plain text otherwise"""
+    if log_format.lower() == "json":
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that never blocks the caller: when the queue is
+    full, records below ERROR are dropped (and counted); errors wait briefly for room.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=1)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_install_lock = threading.Lock()
+_queue_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def install_logging() -> None:
     """
-    Set up a logger with proper Unicode handling.
+    Install the process-wide logging pipeline (idempotent; called by setup_logger, so
+    both the API and the batch CLIs get it on first import).
+
+    Every logger hands records to one QueueHandler on the root logger, so the calling
+    thread (or event loop) only appends to an in-memory queue of at most LOG_QUEUE_SIZE
+    records. A QueueListener thread does the actual console and file I/O. The log file
+    rotates at midnight (query_state_log.log.YYYY-MM-DD, LOG_BACKUP_DAYS kept), even in
+    long-running processes. The file is written as JSON lines unless LOG_FILE_FORMAT=text;
+    the console follows LOG_FORMAT.
+    """
+    global _queue_handler, _listener
+    with _install_lock:
+        if _queue_handler is not None:
+            return
+
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+
+        # Console handler with UTF-8 encoding
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_make_formatter(os.getenv("LOG_FORMAT", "text")))
+
+        # File handler with UTF-8 encoding, rotated daily
+        logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
+        os.makedirs(logs_dir, exist_ok=True)
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            os.path.join(logs_dir, 'query_state_log.log'),
+            when='midnight',
+            backupCount=int(os.getenv("LOG_BACKUP_DAYS", "14")),
+            encoding='utf-8',
+            delay=True
+        )
+        file_handler.setFormatter(_make_formatter(os.getenv("LOG_FILE_FORMAT", "json")))
+
+        log_queue: "queue.Queue" = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        # Replace any handlers installed earlier (e.g. by logging.basicConfig)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+        logging.getLogger(ROOT_LOGGER_NAME).setLevel(level)
+        configure_log_levels()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread (registered with atexit)."""
+    global _listener
+    with _install_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Queue depth and number of records dropped because the queue was full."""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+def _parse_log_levels(spec: str) -> Dict[str, int]:
+    """Parse LOG_LEVELS, e.g. "app.routers=WARNING,QueryStateLogger.reviews=DEBUG"."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def configure_log_levels() -> None:
+    """
+    Apply per-subsystem levels from LOG_LEVELS. Names are logger prefixes, so
+    "app.routers" covers every router module and "QueryStateLogger.reviews" the
+    review fetch path (see get_subsystem_logger).
+    """
+    for name, level in _parse_log_levels(os.getenv("LOG_LEVELS", "")).items():
+        if isinstance(level, int):
+            logging.getLogger(name).setLevel(level)
+
+
+class LogSampler:
+    """
+    Deterministic 1-in-N sampler for per-row debug output.
+
+    `sample()` is a counter increment, so hot loops can call
+    `if logger.isEnabledFor(logging.DEBUG) and sampler.sample():` without cost when
+    DEBUG is off. The rate defaults to LOG_ROW_SAMPLE_EVERY (100).
+    """
+
+    def __init__(self, every: int = None):
+        self.every = max(1, every or int(os.getenv("LOG_ROW_SAMPLE_EVERY", "100")))
+        self._counter = itertools.count()
+
+    def sample(self) -> bool:
+        return next(self._counter) % self.every == 0
+
+
+def get_subsystem_logger(subsystem: str) -> logging.Logger:
+    """
+    Child logger of the shared QueryStateLogger whose level can be set
+    on its own via LOG_LEVELS, e.g. LOG_LEVELS=QueryStateLogger.reviews=DEBUG.
+    """
+    setup_logger()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+def setup_logger(name: str = ROOT_LOGGER_NAME) -> logging.Logger:
+    """
+    Get a logger that writes through the shared queue-based pipeline (see install_logging).
     
     Args:
         name: Name of the logger
@@ -28,30 +203,5 @@ def setup_logger(name: str = "QueryStateLogger") -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance
     """
-    logger = logging.getLogger(name)
-    
-    if not logger.handlers:
-        logger.setLevel(logging.INFO)
-        
-        # Console handler with UTF-8 encoding
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        
-        # File handler with UTF-8 encoding
-        logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
-        os.makedirs(logs_dir, exist_ok=True)
-        
-        log_file = os.path.join(logs_dir, f'query_state_log_{datetime.now().strftime("%Y-%m-%d")}.log')
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
-        
-        # Add handlers
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+    install_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,82 @@
+"""
+JSON-safe conversion of query results for the routers.
+
+Rows come straight from the cursor (app/shared_services/async_db.py) as native Python
+values, so conversion is one pass per row with a converter chosen once per column: date
+columns are formatted as YYYY-MM-DD and Decimals (Postgres NUMERIC) become floats.
+encode_json() is the orjson encoder used for the routers' responses and for cached
+analytics payloads.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+DATE_FORMAT = "%Y-%m-%d"
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a response payload with orjson; types orjson doesn't know go through FastAPI's encoder."""
+    return orjson.dumps(payload, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+
+def _format_date(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
+
+
+def _native(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _chart_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _converters(columns: Sequence[str], date_columns: Iterable[str],
+                default: Callable[[Any], Any]) -> List[Callable[[Any], Any]]:
+    date_columns = set(date_columns)
+    return [_format_date if col in date_columns else default for col in columns]
+
+
+def rows_to_records(columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                    date_columns: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Convert cursor rows to a list of row dicts.
+
+    `date_columns` are formatted as YYYY-MM-DD and Decimals become floats; other values
+    are kept as they are.
+    """
+    converters = _converters(columns, date_columns, _native)
+    return [
+        {col: convert(value) for col, convert, value in zip(columns, converters, row)}
+        for row in rows
+    ]
+
+
+def rows_to_columns(columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                    date_columns: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+    """
+    Convert cursor rows to the column-oriented {column: {"0": value, "1": value, ...}}
+    shape the dashboard charts expect.
+
+    `date_columns` are formatted as YYYY-MM-DD, numbers stay numbers (Decimals become
+    floats), any other value is converted to a string, and NULLs stay None.
+    """
+    converters = _converters(columns, date_columns, _chart_value)
+    positions = [str(i) for i in range(len(rows))]
+    return {
+        col: dict(zip(positions, [convert(row[index]) for row in rows]))
+        for index, (col, convert) in enumerate(zip(columns, converters))
+    }
@@ -0,0 +1,302 @@
+"""
+Word and phrase frequencies of review segments for the word cloud (/sentiments/word_cloud).
+
+Segment texts are tokenized one at a time (lowercased words, stop words dropped, plus
+two-word phrases of adjacent kept words) and counted per day and sentiment label. The
+counts are persisted in review_segment_term_counts
+(app/db/migrations/create_review_segment_term_counts.sql), keeping the top
+WORD_CLOUD_TERMS_PER_DAY terms per day and label, so a request only counts the days
+that are new or changed since they were last counted and sums stored rows for the rest.
+The top terms of the range are picked with a bounded heap per label.
+
+Keeping only each day's top terms makes the long tail of a multi-day range approximate:
+a term's total is the sum of the days it made the cut. The top of the cloud is exact in
+practice, which is all the chart shows.
+
+If the tables haven't been created yet, the segments are counted on the fly instead.
+"""
+import heapq
+import os
+import re
+import uuid
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+import psycopg2
+import psycopg2.errors
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+from .async_db import open_row_stream, run_db
+from .db import get_postgres_connection
+from .logger_setup import setup_logger
+
+load_dotenv()
+
+logger = setup_logger()
+
+TERMS_PER_DAY = int(os.getenv("WORD_CLOUD_TERMS_PER_DAY", "500"))
+
+# Words, including contractions ("don't", "it's"); digits and underscores split tokens
+_TOKEN_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been
+before being below between both but by can can't cannot could couldn't did didn't do does
+doesn't doing don't down during each even ever every few for from further get gets getting
+got had hadn't has hasn't have haven't having he he'd he'll he's her here here's hers herself
+him himself his how how's however i i'd i'll i'm i've if in into is isn't it it's its itself
+just let's like me more most much mustn't my myself no nor not now of off oh ok okay on once
+one only or other ought our ours ourselves out over own really same shan't she she'd she'll
+she's should shouldn't so some still such than that that's the their theirs them themselves
+then there there's these they they'd they'll they're they've this those though through to
+too under until up upon us very was wasn't we we'd we'll we're we've were weren't what what's
+when when's where where's which while who who's whom why why's will with won't would
+wouldn't yet you you'd you'll you're you've your yours yourself yourselves
+app apps application thing things lot
+""".split()) | frozenset(
+    word.strip().lower()
+    for word in os.getenv("WORD_CLOUD_EXTRA_STOP_WORDS", "").split(",")
+    if word.strip()
+)
+
+
+def iter_terms(text: Optional[str], phrases: bool = True) -> Iterator[str]:
+    """
+    Yield the terms of one text: each kept word and, if `phrases`, each pair of adjacent
+    kept words ("battery drain"). Stop words and single letters are dropped and break
+    phrases, so "not working at all" yields "working" but no phrase across "at".
+    """
+    if not text:
+        return
+    previous = None
+    for match in _TOKEN_RE.finditer(text.lower()):
+        word = match.group().replace("’", "'")
+        if len(word) < 2 or word in STOP_WORDS:
+            previous = None
+            continue
+        yield word
+        if phrases and previous is not None:
+            yield f"{previous} {word}"
+        previous = word
+
+
+def top_terms(counts: Mapping[str, int], k: int) -> List[Tuple[str, int]]:
+    """The k most frequent terms, highest count first (ties broken alphabetically)."""
+    return heapq.nsmallest(k, counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+class _TopK:
+    """
+    Bounded min-heap keeping the k most frequent terms seen, with the same tie-breaking
+    as top_terms(): among equal counts, terms that sort earlier are kept.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        # The root is the entry to evict first: lowest count, then the latest term
+        self._heap: List[Tuple[int, _ReverseStr]] = []
+
+    def push(self, term: str, count: int) -> None:
+        entry = (count, _ReverseStr(term))
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Tuple[str, int]]:
+        return [(entry.term, count) for count, entry in sorted(self._heap, reverse=True)]
+
+
+class _ReverseStr:
+    """A term that compares in reverse alphabetical order."""
+
+    __slots__ = ("term",)
+
+    def __init__(self, term: str):
+        self.term = term
+
+    def __lt__(self, other: "_ReverseStr") -> bool:
+        return self.term > other.term
+
+    def __gt__(self, other: "_ReverseStr") -> bool:
+        return self.term < other.term
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ReverseStr) and self.term == other.term
+
+
+# Days whose stored counts are missing or were counted from different segments.
+# params: app_id, start date, end date, app_id, start date, end date
+_STALE_DAYS_QUERY = """
+WITH segment_days AS (
+    SELECT review_created_at::date AS day, COUNT(*) AS segment_count, MAX(id) AS max_segment_id
+    FROM review_segments
+    WHERE app_id = %s AND review_created_at >= %s::date AND review_created_at < %s::date + 1
+    GROUP BY 1
+),
+counted AS (
+    SELECT day, segment_count, max_segment_id
+    FROM review_segment_term_days
+    WHERE app_id = %s AND day >= %s::date AND day <= %s::date
+)
+SELECT COALESCE(segment_days.day, counted.day) AS day
+FROM segment_days
+FULL JOIN counted ON counted.day = segment_days.day
+WHERE segment_days.day IS NULL OR counted.day IS NULL
+   OR counted.segment_count <> segment_days.segment_count
+   OR counted.max_segment_id <> segment_days.max_segment_id
+ORDER BY 1
+"""
+
+# params: app_id, start date, end date (+ day list when counting selected days)
+_SEGMENT_TEXTS_QUERY = """
+SELECT id, review_created_at::date AS day, COALESCE(sentiment_label, '') AS sentiment_label, text
+FROM review_segments
+WHERE app_id = %s AND review_created_at >= %s::date AND review_created_at < %s::date + 1
+"""
+
+_persist_enabled = True
+
+
+def _flush_day(cur, app_id: str, day: date, counts: Dict[str, Counter],
+               segment_count: int, max_segment_id: int) -> None:
+    rows = [
+        (app_id, day, label, term, count)
+        for label, label_counts in counts.items()
+        for term, count in top_terms(label_counts, TERMS_PER_DAY)
+    ]
+    if rows:
+        execute_values(
+            cur,
+            "INSERT INTO review_segment_term_counts (app_id, day, sentiment_label, term, term_count) VALUES %s",
+            rows,
+            page_size=1000
+        )
+    cur.execute(
+        """
+        INSERT INTO review_segment_term_days (app_id, day, segment_count, max_segment_id)
+        VALUES (%s, %s, %s, %s)
+        """,
+        (app_id, day, segment_count, max_segment_id)
+    )
+
+
+def refresh_term_counts(app_id: str, start_date: date, end_date: date) -> int:
+    """
+    Count the app's days in [start_date, end_date] that are new or whose segments changed
+    since they were counted, replacing their stored rows. Segments are read through a
+    server-side cursor in day order, so only one day's counts are held in memory.
+    Returns the number of days recounted.
+    """
+    with get_postgres_connection() as conn:
+        with conn.cursor() as cur:
+            # One refresh per app at a time; a concurrent request waits and then finds nothing stale
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"review_segment_terms:{app_id}",))
+            cur.execute(_STALE_DAYS_QUERY, (app_id, start_date, end_date) * 2)
+            stale_days = [row[0] for row in cur.fetchall()]
+            if not stale_days:
+                return 0
+
+            cur.execute(
+                "DELETE FROM review_segment_term_counts WHERE app_id = %s AND day = ANY(%s::date[])",
+                (app_id, stale_days)
+            )
+            cur.execute(
+                "DELETE FROM review_segment_term_days WHERE app_id = %s AND day = ANY(%s::date[])",
+                (app_id, stale_days)
+            )
+
+            segments = conn.cursor(name=f"terms_{uuid.uuid4().hex}")
+            segments.itersize = int(os.getenv("DB_FETCH_ITERSIZE", "2000"))
+            segments.execute(
+                _SEGMENT_TEXTS_QUERY + " AND review_created_at::date = ANY(%s::date[]) ORDER BY review_created_at",
+                (app_id, stale_days[0], stale_days[-1], stale_days)
+            )
+
+            current_day = None
+            counts: Dict[str, Counter] = defaultdict(Counter)
+            segment_count = max_segment_id = 0
+            for segment_id, day, label, text in segments:
+                if day != current_day:
+                    if current_day is not None:
+                        _flush_day(cur, app_id, current_day, counts, segment_count, max_segment_id)
+                    current_day = day
+                    counts = defaultdict(Counter)
+                    segment_count = max_segment_id = 0
+                counts[label].update(iter_terms(text))
+                segment_count += 1
+                max_segment_id = max(max_segment_id, segment_id)
+            if current_day is not None:
+                _flush_day(cur, app_id, current_day, counts, segment_count, max_segment_id)
+            segments.close()
+
+    logger.info(f"Counted segment terms for {len(stale_days)} day(s) of app_id={app_id}")
+    return len(stale_days)
+
+
+async def _merge_stored_counts(app_id: str, start_date: date, end_date: date,
+                               top_k: int, phrases: bool) -> Tuple[Dict[str, List[Tuple[str, int]]], int]:
+    query = """
+    SELECT sentiment_label, term, SUM(term_count) AS term_count
+    FROM review_segment_term_counts
+    WHERE app_id = %s AND day >= %s::date AND day <= %s::date
+    """
+    if not phrases:
+        query += " AND position(' ' in term) = 0"
+    query += " GROUP BY sentiment_label, term"
+
+    heaps: Dict[str, _TopK] = defaultdict(lambda: _TopK(top_k))
+    stream = await open_row_stream(query, (app_id, start_date, end_date))
+    async for rows in stream.batches():
+        for label, term, count in rows:
+            heaps[label].push(term, int(count))
+
+    segment_count = await run_db(_fetch_segment_count, app_id, start_date, end_date)
+    return {label: heap.items() for label, heap in heaps.items()}, segment_count
+
+
+def _fetch_segment_count(app_id: str, start_date: date, end_date: date) -> int:
+    with get_postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT COALESCE(SUM(segment_count), 0)::int
+                FROM review_segment_term_days
+                WHERE app_id = %s AND day >= %s::date AND day <= %s::date
+                """,
+                (app_id, start_date, end_date)
+            )
+            return cur.fetchone()[0]
+
+
+async def _count_on_the_fly(app_id: str, start_date: date, end_date: date,
+                            top_k: int, phrases: bool) -> Tuple[Dict[str, List[Tuple[str, int]]], int]:
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    segment_count = 0
+    stream = await open_row_stream(_SEGMENT_TEXTS_QUERY, (app_id, start_date, end_date))
+    async for rows in stream.batches():
+        for _, _, label, text in rows:
+            counts[label].update(iter_terms(text, phrases))
+        segment_count += len(rows)
+    return {label: top_terms(label_counts, top_k) for label, label_counts in counts.items()}, segment_count
+
+
+async def get_term_frequencies(app_id: str, start_date: date, end_date: date, top_k: int = 50,
+                               phrases: bool = True) -> Tuple[Dict[str, List[Tuple[str, int]]], int]:
+    """
+    Return ({sentiment_label: [(term, count), ...]}, segment_count) for the app's segments
+    in [start_date, end_date], with at most `top_k` terms per label, most frequent first.
+    Segments without a label are reported under ''.
+    """
+    global _persist_enabled
+    if _persist_enabled:
+        try:
+            await run_db(refresh_term_counts, app_id, start_date, end_date)
+            return await _merge_stored_counts(app_id, start_date, end_date, top_k, phrases)
+        except psycopg2.errors.UndefinedTable:
+            logger.warning("review_segment_term_counts table not found - counting word cloud terms per request "
+                           "(run app/db/migrations/create_review_segment_term_counts.sql)")
+            _persist_enabled = False
+    return await _count_on_the_fly(app_id, start_date, end_date, top_k, phrases)
@@ -9,11 +9,18 @@ from app.routers import issues_router
 from app.routers import positives_router
 from app.routers import actions_router
 from app.routers import sentiments_router
+from app.shared_services.db import get_pool_stats, close_connection_pool
+from app.shared_services.async_db import shutdown_db_executor
+from app.shared_services.llm import close_async_llm_clients
+from app.shared_services.llm_cache import get_llm_cache_stats
+from app.shared_services.analytics_cache import get_analytics_cache_stats
+from app.prompts.registry import get_prompt_versions
+from app.shared_services.logger_setup import install_logging, get_logging_stats
 # import CORS
 from fastapi.middleware.cors import CORSMiddleware
 
-# Configure Logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Configure Logging (queue-based; see app/shared_services/logger_setup.py)
+install_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -54,10 +61,39 @@ app.include_router(positives_router.router)
 app.include_router(actions_router.router)
 app.include_router(sentiments_router.router)
 
+@app.on_event("shutdown")
+def shutdown_db_pool():
+    shutdown_db_executor()
+    close_connection_pool()
+
+@app.on_event("shutdown")
+async def shutdown_llm_clients():
+    await close_async_llm_clients()
+
 @app.get("/")
 async def read_root():
     return {"message": "Reviews Service is running!"}
 
+@app.get("/health/db_pool")
+async def db_pool_health():
+    return {"status": "success", "data": get_pool_stats()}
+
+@app.get("/health/llm_cache")
+async def llm_cache_health():
+    return {"status": "success", "data": get_llm_cache_stats()}
+
+@app.get("/health/analytics_cache")
+async def analytics_cache_health():
+    return {"status": "success", "data": get_analytics_cache_stats()}
+
+@app.get("/health/logging")
+async def logging_health():
+    return {"status": "success", "data": get_logging_stats()}
+
+@app.get("/health/prompts")
+async def prompt_versions():
+    return {"status": "success", "data": get_prompt_versions()}
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,157 @@
+"""
+Benchmark the analytics response path (app/shared_services/serialization.py) against
+the pandas-based one the routers used before.
+
+Builds synthetic aggregation rows the way psycopg2 returns them (datetimes, ints,
+Decimals, strings, parsed JSONB and NULLs), shaped like the issues/positives
+(column-oriented) and actions/sentiments (records) queries. The legacy path builds a
+DataFrame from those rows as pd.read_sql did and runs the old per-cell conversion; the
+current path converts the cursor rows directly. The script checks that both produce
+the same payload, then times conversion and JSON encoding.
+
+pandas is only needed for the legacy side of this script, not by the API.
+
+Usage (from backend/):
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --years 5 --repeat 20
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.shared_services.serialization import encode_json, rows_to_columns, rows_to_records  # noqa: E402
+
+
+def legacy_read_sql(columns: List[str], rows: List[tuple]) -> pd.DataFrame:
+    """What pd.read_sql built from the same cursor rows (coerce_float=True)."""
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def legacy_frame_to_columns(data: pd.DataFrame, period_column: str) -> dict:
+    """The conversion loop previously inlined in the issues and positives routers."""
+    result = {}
+    for col in data.columns:
+        column_data = {}
+        for i in range(len(data)):
+            value = data[col].iloc[i]
+            if pd.isna(value):
+                column_data[str(i)] = None
+            elif col == period_column:
+                if hasattr(value, 'strftime'):
+                    column_data[str(i)] = value.strftime('%Y-%m-%d')
+                else:
+                    column_data[str(i)] = str(value)
+            else:
+                try:
+                    if isinstance(value, (int, float)):
+                        column_data[str(i)] = float(value)
+                    elif hasattr(value, 'item'):
+                        column_data[str(i)] = value.item()
+                    else:
+                        column_data[str(i)] = str(value)
+                except (ValueError, TypeError):
+                    column_data[str(i)] = str(value)
+        result[col] = column_data
+    return result
+
+
+def legacy_frame_to_records(data: pd.DataFrame, period_column: str) -> list:
+    """The conversion loop previously inlined in the actions and sentiments routers."""
+    records = data.to_dict('records')
+    for record in records:
+        if period_column in record and record[period_column] is not None:
+            if hasattr(record[period_column], 'strftime'):
+                record[period_column] = record[period_column].strftime('%Y-%m-%d')
+            else:
+                record[period_column] = str(record[period_column])
+    return records
+
+
+def make_rows(days: int, period_column: str, seed: int = 0) -> Tuple[List[str], List[tuple]]:
+    """Daily aggregation rows with counts, NUMERIC averages, a text column and a JSONB breakdown."""
+    rng = random.Random(seed)
+    counts = ["total", "critical", "high", "medium", "low", "promoters", "detractors", "nps_total"]
+    columns = [period_column] + [f"{name}_count" for name in counts] + ["avg_impact", "avg_score",
+                                                                       "top_category", "breakdown"]
+    start = datetime(2020, 1, 1)
+    rows = []
+    for day in range(days):
+        averages = [None if rng.random() < 0.05 else Decimal(f"{rng.random() * 5:.4f}") for _ in range(2)]
+        n = rng.randrange(100)
+        rows.append((
+            start + timedelta(days=day),
+            *[rng.randrange(500) for _ in counts],
+            *averages,
+            rng.choice(["login", "payments", "performance", None]),
+            {"positive": n, "negative": n // 2},
+        ))
+    return columns, rows
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(label: str, legacy: float, current: float) -> None:
+    print(f"  {label:<34} {legacy * 1000:>10.2f} ms {current * 1000:>10.2f} ms {legacy / current:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark analytics response serialization")
+    parser.add_argument("--years", type=int, default=5, help="Years of daily periods (all-time/daily worst case)")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    days = args.years * 365
+    columns, rows = make_rows(days, "issue_period")
+    record_columns, record_rows = make_rows(days, "sentiment_period")
+    print(f"{days} daily periods x {len(columns)} columns, best of {args.repeat}\n")
+
+    legacy_columns = legacy_frame_to_columns(legacy_read_sql(columns, rows), "issue_period")
+    current_columns = rows_to_columns(columns, rows, date_columns=["issue_period"])
+    assert current_columns == legacy_columns, "rows_to_columns differs from the legacy conversion"
+
+    legacy_records = legacy_frame_to_records(legacy_read_sql(record_columns, record_rows), "sentiment_period")
+    records = rows_to_records(record_columns, record_rows, date_columns=["sentiment_period"])
+    assert len(records) == len(legacy_records)
+    for new, old in zip(records, legacy_records):
+        assert new.keys() == old.keys()
+        for key, value in new.items():
+            missing = old[key] is None or (isinstance(old[key], float) and math.isnan(old[key]))
+            assert value == old[key] or (value is None and missing), (key, value, old[key])
+
+    payload = {"status": "success", "data": current_columns}
+
+    print(f"  {'':<34} {'legacy':>13} {'current':>13} {'speedup':>9}")
+    report("column-oriented conversion",
+           best_of(args.repeat, lambda: legacy_frame_to_columns(legacy_read_sql(columns, rows), "issue_period")),
+           best_of(args.repeat, lambda: rows_to_columns(columns, rows, date_columns=["issue_period"])))
+    report("records conversion",
+           best_of(args.repeat, lambda: legacy_frame_to_records(legacy_read_sql(record_columns, record_rows),
+                                                                "sentiment_period")),
+           best_of(args.repeat, lambda: rows_to_records(record_columns, record_rows,
+                                                        date_columns=["sentiment_period"])))
+    report("JSON encoding (json vs orjson)",
+           best_of(args.repeat, lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")),
+           best_of(args.repeat, lambda: encode_json(payload)))
+
+
+if __name__ == "__main__":
+    main()
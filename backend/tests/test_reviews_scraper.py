@@ -0,0 +1,80 @@
+"""
+Resuming Play Store scrapes from a saved checkpoint (app/google_reviews/reviews_scraper.py).
+
+Run from backend/:
+    python -m pytest tests
+"""
+from datetime import datetime, timezone
+from urllib.parse import unquote
+
+import pytest
+
+pytest.importorskip("google_play_scraper")
+reviews_scraper = pytest.importorskip("app.google_reviews.reviews_scraper")
+
+from google_play_scraper.constants.request import Formats  # noqa: E402
+
+ReviewScraper = reviews_scraper.ReviewScraper
+ScrapeInterrupted = reviews_scraper.ScrapeInterrupted
+
+
+def _review(review_id: str) -> dict:
+    return {"reviewId": review_id, "at": datetime(2025, 1, 1), "content": "ok"}
+
+
+def _token(token):
+    return ReviewScraper._restore_continuation_token(token, "en", "ke", 100)
+
+
+def test_restored_token_builds_a_valid_paginated_request():
+    token = _token("saved-token")
+
+    body = unquote(Formats.Reviews.build_body(
+        "com.example.app", token.sort, token.count, "null", "null", token.token
+    ).decode())
+
+    assert "[2,2,[100,null," in body  # Sort.NEWEST is sent as its value, 2
+    assert "Sort.NEWEST" not in body
+    assert "saved-token" in body
+
+
+def _fake_reviews(pages):
+    """Replace google_play_scraper.reviews with one that returns `pages` in order."""
+    calls = iter(pages)
+
+    def fake_reviews(app_id, lang, country, count, sort, continuation_token):
+        result, token = next(calls)
+        return result, _token(token)
+
+    return fake_reviews
+
+
+def test_paging_completes_when_the_last_page_has_no_token(monkeypatch):
+    monkeypatch.setattr(reviews_scraper, "reviews", _fake_reviews([
+        ([_review("a")], "page-2"),
+        ([_review("b")], None),
+    ]))
+
+    batches = list(ReviewScraper.iter_review_batches("com.example.app", rate_limiter=_NoLimit()))
+
+    assert [len(batch) for _, batch, _ in batches] == [1, 1]
+    assert batches[-1][2].token is None
+
+
+def test_unexpected_empty_page_interrupts_after_the_last_good_page(monkeypatch):
+    monkeypatch.setattr(reviews_scraper, "reviews", _fake_reviews([
+        ([_review("a")], "page-2"),
+        ([], None),  # throttled: the library returns an empty page and no token
+    ]))
+
+    batches = ReviewScraper.iter_review_batches("com.example.app", rate_limiter=_NoLimit(),
+                                                cutoff_date=datetime(2020, 1, 1, tzinfo=timezone.utc))
+    batch_number, batch, token = next(batches)
+    assert token.token == "page-2"
+    with pytest.raises(ScrapeInterrupted):
+        next(batches)
+
+
+class _NoLimit:
+    def acquire(self, tokens: float = 1.0) -> None:
+        pass